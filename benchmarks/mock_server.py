@@ -0,0 +1,377 @@
+"""
+A local stand-in for the Amazon Location Service v2 Places and Routes
+endpoints used by the plugin.
+
+The server replays the recorded payloads in benchmarks/payloads, scaled to a
+requested size, with configurable latency and error injection. It only uses
+the standard library so it can run outside of QGIS:
+
+    python benchmarks/mock_server.py --port 8765 --latency-ms 50 --error-rate 0.05
+"""
+
+import argparse
+import copy
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+PAYLOAD_DIRECTORY = os.path.join(os.path.dirname(__file__), "payloads")
+FLEXIBLE_POLYLINE_ALPHABET = (
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+)
+FLEXIBLE_POLYLINE_PRECISION = 6
+
+
+def load_payload(name: str) -> Dict[str, Any]:
+    """
+    Loads a recorded response.
+
+    Args:
+        name (str): File name without extension, "search_text" or "routes".
+
+    Returns:
+        Dict[str, Any]: The decoded payload.
+    """
+    with open(os.path.join(PAYLOAD_DIRECTORY, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def scaled_search_text(count: int) -> Dict[str, Any]:
+    """
+    Builds a search-text response with the given number of result items by
+    repeating and shifting the recorded items.
+
+    Args:
+        count (int): Number of result items.
+
+    Returns:
+        Dict[str, Any]: The response payload.
+    """
+    recorded = load_payload("search_text")["ResultItems"]
+    items = []
+    for index in range(count):
+        item = copy.deepcopy(recorded[index % len(recorded)])
+        offset = (index // len(recorded)) * 1e-4
+        item["Position"] = [item["Position"][0] + offset, item["Position"][1] + offset]
+        item["PlaceId"] = f"{item['PlaceId']}-{index}"
+        items.append(item)
+    return {"ResultItems": items}
+
+
+def encode_flexible_polyline(coordinates: Sequence[Sequence[float]]) -> str:
+    """
+    Encodes [lon, lat] positions as a two-dimensional flexible polyline.
+
+    Args:
+        coordinates (Sequence[Sequence[float]]): The positions.
+
+    Returns:
+        str: The encoded polyline.
+    """
+    output: List[str] = []
+
+    def encode_unsigned(value: int) -> None:
+        while value > 0x1F:
+            output.append(FLEXIBLE_POLYLINE_ALPHABET[(value & 0x1F) | 0x20])
+            value >>= 5
+        output.append(FLEXIBLE_POLYLINE_ALPHABET[value])
+
+    def encode_signed(value: int) -> None:
+        encode_unsigned(~(value << 1) if value < 0 else value << 1)
+
+    encode_unsigned(1)
+    encode_unsigned(FLEXIBLE_POLYLINE_PRECISION)
+    factor = 10**FLEXIBLE_POLYLINE_PRECISION
+    last_lat = 0
+    last_lon = 0
+    for lon, lat in coordinates:
+        lat_value = round(lat * factor)
+        lon_value = round(lon * factor)
+        encode_signed(lat_value - last_lat)
+        encode_signed(lon_value - last_lon)
+        last_lat = lat_value
+        last_lon = lon_value
+    return "".join(output)
+
+
+def scaled_routes(
+    legs: int, vertices: int = 100, flexible: bool = False
+) -> Dict[str, Any]:
+    """
+    Builds a routes response with the given number of legs, each carrying
+    the given number of vertices along the recorded leg.
+
+    Args:
+        legs (int): Number of legs.
+        vertices (int): Vertices per leg.
+        flexible (bool): Encode the geometry as FlexiblePolyline instead of
+            a Simple LineString.
+
+    Returns:
+        Dict[str, Any]: The response payload.
+    """
+    recorded = load_payload("routes")
+    route = recorded["Routes"][0]
+    template = route["Legs"][0]
+    line = template["Geometry"]["LineString"]
+    (start_lon, start_lat), (end_lon, end_lat) = line[0], line[-1]
+    leg_list = []
+    for index in range(legs):
+        shift = index * 1e-3
+        coordinates = [
+            [
+                start_lon + (end_lon - start_lon) * step / max(1, vertices - 1) + shift,
+                start_lat + (end_lat - start_lat) * step / max(1, vertices - 1),
+            ]
+            for step in range(vertices)
+        ]
+        leg = copy.deepcopy(template)
+        if flexible:
+            leg["Geometry"] = {"Polyline": encode_flexible_polyline(coordinates)}
+        else:
+            leg["Geometry"] = {"LineString": coordinates}
+        leg_list.append(leg)
+    payload = copy.deepcopy(recorded)
+    payload["LegGeometryFormat"] = "FlexiblePolyline" if flexible else "Simple"
+    payload["Routes"][0]["Legs"] = leg_list
+    return payload
+
+
+class MockSettings:
+    """
+    Behaviour of the mock server, shared by all handler threads.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        route_legs: int = 1,
+        route_vertices: int = 100,
+        keep_alive: bool = False,
+        compress: bool = False,
+    ) -> None:
+        """
+        Initializes the settings.
+
+        Args:
+            latency_ms (float): Delay added before every response.
+            error_rate (float): Share of requests answered with HTTP 500.
+            throttle_rate (float): Share of requests answered with HTTP 429.
+            retry_after_seconds (int): Retry-After value of throttled replies.
+            route_legs (int): Legs per routes response.
+            route_vertices (int): Vertices per route leg.
+            keep_alive (bool): Speak HTTP/1.1 and keep connections open
+                between requests instead of closing them after each reply.
+            compress (bool): Gzip replies for clients that accept it.
+        """
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.route_legs = route_legs
+        self.route_vertices = route_vertices
+        self.keep_alive = keep_alive
+        self.compress = compress
+        self.requests = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+class MockLocationHandler(BaseHTTPRequestHandler):
+    """
+    Answers search-text and routes POST requests.
+    """
+
+    server_version = "MockLocationService/1.0"
+    settings = MockSettings()
+    _cache: ClassVar[Dict[Tuple[Any, ...], bytes]] = {}
+    _gzip_cache: ClassVar[Dict[Tuple[Any, ...], bytes]] = {}
+
+    def setup(self) -> None:
+        """
+        Counts the accepted connections.
+        """
+        super().setup()
+        with self.settings.lock:
+            self.settings.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Silences the per-request log lines.
+        """
+
+    def do_POST(self) -> None:
+        """
+        Dispatches a POST request by path.
+        """
+        settings = self.settings
+        with settings.lock:
+            settings.requests += 1
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"Message": "Malformed JSON"})
+            return
+        if settings.latency_ms > 0:
+            time.sleep(settings.latency_ms / 1000.0)
+        roll = random.random()
+        if roll < settings.throttle_rate:
+            self._send_json(
+                429,
+                {"Message": "Rate exceeded"},
+                {"Retry-After": str(settings.retry_after_seconds)},
+            )
+            return
+        if roll < settings.throttle_rate + settings.error_rate:
+            self._send_json(500, {"Message": "Injected failure"})
+            return
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/v2/search-text"):
+            key: Tuple[Any, ...] = ("places", int(body.get("MaxResults", 10)))
+            payload_factory = lambda: scaled_search_text(key[1])  # noqa: E731
+        elif path.endswith("/v2/routes"):
+            flexible = body.get("LegGeometryFormat") == "FlexiblePolyline"
+            key = ("routes", settings.route_legs, settings.route_vertices, flexible)
+            payload_factory = lambda: scaled_routes(*key[1:])  # noqa: E731
+        else:
+            self._send_json(404, {"Message": f"Unknown path {path}"})
+            return
+        encoded = self._cache.get(key)
+        if encoded is None:
+            encoded = json.dumps(payload_factory()).encode("utf-8")
+            self._cache[key] = encoded
+        if settings.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            compressed = self._gzip_cache.get(key)
+            if compressed is None:
+                compressed = gzip.compress(encoded, compresslevel=6)
+                self._gzip_cache[key] = compressed
+            self._send_bytes(200, compressed, {"Content-Encoding": "gzip"})
+            return
+        self._send_bytes(200, encoded)
+
+    def _send_json(
+        self,
+        status: int,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Writes a JSON response.
+        """
+        self._send_bytes(status, json.dumps(payload).encode("utf-8"), headers)
+
+    def _send_bytes(
+        self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Writes a response with an encoded JSON body.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.settings.lock:
+            self.settings.bytes_sent += len(body)
+
+
+class MockLocationServer:
+    """
+    Runs the mock endpoints on a background thread.
+    """
+
+    def __init__(self, port: int = 0, settings: Optional[MockSettings] = None) -> None:
+        """
+        Binds the server to localhost.
+
+        Args:
+            port (int): Port to listen on; zero picks a free one.
+            settings (Optional[MockSettings]): Behaviour of the server.
+        """
+        settings = settings or MockSettings()
+        handler = type(
+            "BoundMockLocationHandler",
+            (MockLocationHandler,),
+            {
+                "settings": settings,
+                "_cache": {},
+                "_gzip_cache": {},
+                "protocol_version": "HTTP/1.1" if settings.keep_alive else "HTTP/1.0",
+            },
+        )
+        self.settings = handler.settings
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns the scheme, host and port of the server.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLocationServer":
+        """
+        Starts serving on a daemon thread.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and closes its socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    """
+    Runs the mock server in the foreground.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--route-legs", type=int, default=1)
+    parser.add_argument("--route-vertices", type=int, default=100)
+    parser.add_argument("--keep-alive", action="store_true")
+    parser.add_argument("--compress", action="store_true")
+    args = parser.parse_args()
+    settings = MockSettings(
+        args.latency_ms,
+        args.error_rate,
+        args.throttle_rate,
+        route_legs=args.route_legs,
+        route_vertices=args.route_vertices,
+        keep_alive=args.keep_alive,
+        compress=args.compress,
+    )
+    server = MockLocationServer(args.port, settings)
+    print(f"Serving mock Amazon Location Service on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
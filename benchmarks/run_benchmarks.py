@@ -0,0 +1,608 @@
+"""
+Benchmarks the plugin's hot paths against a local mock of the Amazon
+Location Service endpoints.
+
+Run it with the QGIS Python interpreter from the repository root:
+
+    make benchmark
+    python -m benchmarks.run_benchmarks --sizes 10,1000,100000 --output results.json
+    python -m benchmarks.run_benchmarks --baseline results.json --threshold 0.2
+    python -m benchmarks.run_benchmarks --only startup
+    python -m benchmarks.run_benchmarks --only memory --sizes 1000,100000
+    python -m benchmarks.run_benchmarks --only transport --route-vertices 5000
+
+Each benchmark reports its best wall time over the repeats and the peak
+memory allocated by Python during one run. The memory suite also reports
+how much of it stays allocated while the decoded result is kept, and the
+transport suite the reply bytes on the wire per request. With --baseline
+the script exits with status 1 when any benchmark got slower than the
+allowed threshold, so it can gate CI.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5 import QtWidgets, uic
+from PyQt5.QtCore import QCoreApplication
+from qgis.core import QgsApplication
+
+from location_service.functions.places import PlacesFunctions
+from location_service.functions.routes import RoutesFunctions
+from location_service.location_service import LocationService
+from location_service.utils.configuration_handler import ConfigurationHandler
+from location_service.utils.external_api_handler import ApiRequestError
+from location_service.utils.request_pool import RequestPool
+from location_service.utils.result_models import PlaceItem, RouteLeg, decode_json
+
+from .mock_server import (
+    MockLocationServer,
+    MockSettings,
+    scaled_routes,
+    scaled_search_text,
+)
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+DEFAULT_REPEATS = 3
+MOCK_REGION = "mock"
+SETTINGS_ORGANIZATION = "location_service_benchmarks"
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UI_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, "location_service", "ui")
+STANDALONE_COMPONENTS = ("config", "maps", "stats")
+FRESH_IMPORT_SCRIPT = """
+import json, sys, time, tracemalloc
+import PyQt5.QtWidgets, qgis.core
+tracemalloc.start()
+started = time.perf_counter()
+import location_service.location_service
+seconds = time.perf_counter() - started
+_, peak = tracemalloc.get_traced_memory()
+modules = [name for name in sys.modules if name.startswith("location_service.")]
+print(json.dumps({"seconds": seconds, "peak_bytes": peak, "modules": len(modules)}))
+"""
+TRANSPORT_VARIANTS = (
+    ("close", False, False),
+    ("keep-alive", True, False),
+    ("keep-alive-gzip", True, True),
+)
+
+Results = Dict[str, Dict[str, float]]
+
+
+def measure(
+    function: Callable[[], Any], repeats: int, operations: int = 1
+) -> Dict[str, float]:
+    """
+    Times a function and records the peak memory of one run.
+
+    Args:
+        function (Callable[[], Any]): The code under test.
+        repeats (int): Number of timed runs; the fastest one is reported.
+        operations (int): Work items per run, used for the throughput.
+
+    Returns:
+        Dict[str, float]: Seconds, operations per second and peak bytes.
+    """
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return {
+        "seconds": best,
+        "ops_per_second": operations / best if best > 0 else 0.0,
+        "peak_bytes": float(peak),
+    }
+
+
+def measure_retained(
+    function: Callable[[], Any], repeats: int, operations: int = 1
+) -> Dict[str, float]:
+    """
+    Times a function like measure and also records the memory still
+    allocated while its return value is kept alive.
+
+    Args:
+        function (Callable[[], Any]): Code returning the decoded result.
+        repeats (int): Number of timed runs; the fastest one is reported.
+        operations (int): Work items per run, used for the throughput.
+
+    Returns:
+        Dict[str, float]: The measure result plus retained bytes.
+    """
+    tracemalloc.start()
+    kept = function()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    result = measure(function, repeats, operations)
+    result["retained_bytes"] = float(retained)
+    return result
+
+
+def redirect(url: str, base_url: str) -> str:
+    """
+    Points a request URL built by the plugin at the mock server.
+
+    Args:
+        url (str): URL targeting an amazonaws.com endpoint.
+        base_url (str): Scheme, host and port of the mock server.
+
+    Returns:
+        str: The same path and query on the mock server.
+    """
+    path = url.split(".amazonaws.com", 1)[1]
+    return f"{base_url}{path}"
+
+
+def configure_settings() -> None:
+    """
+    Stores settings for an isolated benchmark profile: a fake region and
+    API key, no response cache and no request coalescing, so every call
+    reaches the mock server.
+    """
+    settings = ConfigurationHandler()
+    for key, value in (
+        ("region_value", MOCK_REGION),
+        ("apikey_value", "benchmark"),
+        ("cache_enabled", "false"),
+        ("coalesce_requests", "false"),
+    ):
+        settings.store_setting(key, value)
+
+
+def bench_parsing(sizes: List[int], repeats: int) -> Results:
+    """
+    Measures json.loads of search-text and routes payloads.
+    """
+    results: Results = {}
+    for size in sizes:
+        places = json.dumps(scaled_search_text(size))
+        results[f"parse/search-text/{size}"] = measure(
+            lambda payload=places: json.loads(payload), repeats, size
+        )
+        routes = json.dumps(scaled_routes(1, size))
+        results[f"parse/routes-simple/{size}"] = measure(
+            lambda payload=routes: json.loads(payload), repeats, size
+        )
+    return results
+
+
+def bench_feature_building(sizes: List[int], repeats: int) -> Results:
+    """
+    Measures feature construction from decoded payloads. Place sizes count
+    result items; route sizes count the vertices of a single long leg.
+    """
+    places = PlacesFunctions()
+    routes = RoutesFunctions()
+    place_fields = places.create_fields()
+    route_fields = routes.create_fields()
+    results: Results = {}
+    for size in sizes:
+        data = scaled_search_text(size)
+        results[f"build/places/{size}"] = measure(
+            lambda data=data: places.build_features(place_fields, data),
+            repeats,
+            size,
+        )
+        for flexible in (False, True):
+            data = scaled_routes(1, size, flexible)
+            name = "flexible" if flexible else "simple"
+            results[f"build/routes-{name}/{size}"] = measure(
+                lambda data=data: routes.build_features(route_fields, data),
+                repeats,
+                size,
+            )
+    return results
+
+
+def bench_memory(sizes: List[int], repeats: int) -> Results:
+    """
+    Compares keeping decoded replies as full dict trees with decoding only
+    the used fields and converting them to slotted result models. Place
+    sizes count result items; route sizes count legs of 100 vertices.
+    """
+    results: Results = {}
+    for size in sizes:
+        places = json.dumps(scaled_search_text(size)).encode("utf-8")
+        results[f"memory/places-dict/{size}"] = measure_retained(
+            lambda body=places: json.loads(body), repeats, size
+        )
+        results[f"memory/places-filtered/{size}"] = measure_retained(
+            lambda body=places: decode_json(body, PlaceItem.FIELDS), repeats, size
+        )
+        results[f"memory/places-items/{size}"] = measure_retained(
+            lambda body=places: PlaceItem.from_response(
+                decode_json(body, PlaceItem.FIELDS)
+            ),
+            repeats,
+            size,
+        )
+        routes = json.dumps(scaled_routes(size, 100, True)).encode("utf-8")
+        results[f"memory/routes-dict/{size}"] = measure_retained(
+            lambda body=routes: json.loads(body), repeats, size
+        )
+        results[f"memory/routes-legs/{size}"] = measure_retained(
+            lambda body=routes: RouteLeg.from_response(
+                decode_json(body, RouteLeg.FIELDS)
+            ),
+            repeats,
+            size,
+        )
+    return results
+
+
+def bench_requests(
+    server: MockLocationServer, request_count: int, concurrency: int, repeats: int
+) -> Results:
+    """
+    Measures request throughput through ExternalApiHandler and RequestPool.
+    """
+    places = PlacesFunctions()
+    routes = RoutesFunctions()
+    base_url = server.base_url
+    counter = iter(range(1 << 62))
+
+    def search_request() -> Any:
+        url, data = places.build_search_text_request(
+            f"query {next(counter)}", 141.35, 43.06
+        )
+        return redirect(url, base_url), data
+
+    def blocking_search() -> None:
+        for _ in range(request_count):
+            with contextlib.suppress(ApiRequestError):
+                places.api_handler.send_json_post_request(*search_request())
+
+    def pooled(build: Callable[[], Any], handler: Any) -> Callable[[], None]:
+        def run() -> None:
+            pool = RequestPool(handler, concurrency, max_retries=0)
+            for _ in range(request_count):
+                url, data = build()
+                pool.submit(url, data, lambda result: None, lambda error: None)
+            pool.wait()
+
+        return run
+
+    def route_request() -> Any:
+        url, data = routes.build_routes_request(141.35, 43.06, 141.36, 43.05)
+        data["Destination"] = [141.36, 43.05 + next(counter) * 1e-7]
+        return redirect(url, base_url), data
+
+    return {
+        f"requests/search-text/blocking/{request_count}": measure(
+            blocking_search, repeats, request_count
+        ),
+        f"requests/search-text/pool-{concurrency}/{request_count}": measure(
+            pooled(search_request, places.api_handler), repeats, request_count
+        ),
+        f"requests/routes/pool-{concurrency}/{request_count}": measure(
+            pooled(route_request, routes.api_handler), repeats, request_count
+        ),
+    }
+
+
+def bench_transport(
+    latency_ms: float,
+    request_count: int,
+    concurrency: int,
+    repeats: int,
+    legs: int,
+    vertices: int,
+) -> Results:
+    """
+    Measures large routes replies through ExternalApiHandler against mock
+    servers that close every connection, keep connections alive, or keep
+    them alive and gzip the replies. Qt negotiates the compression itself,
+    so the requests are the same in every variant.
+    """
+    routes = RoutesFunctions()
+    results: Results = {}
+    for name, keep_alive, compress in TRANSPORT_VARIANTS:
+        server = MockLocationServer(
+            settings=MockSettings(
+                latency_ms,
+                route_legs=legs,
+                route_vertices=vertices,
+                keep_alive=keep_alive,
+                compress=compress,
+            )
+        ).start()
+        try:
+            for geometry_format in ("Simple", "FlexiblePolyline"):
+                url, data = routes.build_routes_request(141.35, 43.06, 141.36, 43.05)
+                url = redirect(url, server.base_url)
+                data["LegGeometryFormat"] = geometry_format
+
+                def run(url: str = url, data: Dict[str, Any] = data) -> None:
+                    pool = RequestPool(routes.api_handler, concurrency, max_retries=0)
+                    for _ in range(request_count):
+                        pool.submit(url, data, lambda result: None, lambda error: None)
+                    pool.wait()
+
+                server.settings.requests = server.settings.bytes_sent = 0
+                server.settings.connections = 0
+                result = measure(run, repeats, request_count)
+                settings = server.settings
+                result["wire_bytes"] = settings.bytes_sent / max(1, settings.requests)
+                result["connections"] = settings.connections / (repeats + 1)
+                label = "simple" if geometry_format == "Simple" else "flexible"
+                results[f"transport/routes-{label}/{name}/{request_count}"] = result
+        finally:
+            server.stop()
+    return results
+
+
+class HeadlessInterface:
+    """
+    The part of QgisInterface used while the plugin loads and unloads,
+    backed by a hidden main window.
+    """
+
+    def __init__(self) -> None:
+        """
+        Creates the hidden main window.
+        """
+        self.window = QtWidgets.QMainWindow()
+
+    def mainWindow(self) -> QtWidgets.QMainWindow:
+        """
+        Returns the hidden main window.
+        """
+        return self.window
+
+    def addToolBar(self, name: str) -> QtWidgets.QToolBar:
+        """
+        Adds a toolbar to the hidden main window.
+        """
+        return self.window.addToolBar(name)
+
+    def addPluginToMenu(self, name: str, action: QtWidgets.QAction) -> None:
+        """
+        Ignores plugin menu entries.
+        """
+
+    def removePluginMenu(self, name: str, action: QtWidgets.QAction) -> None:
+        """
+        Ignores plugin menu entries.
+        """
+
+    def removeToolBarIcon(self, action: QtWidgets.QAction) -> None:
+        """
+        Ignores toolbar removals.
+        """
+
+    def addDockWidget(self, area: Any, widget: QtWidgets.QDockWidget) -> None:
+        """
+        Docks a panel in the hidden main window.
+        """
+        self.window.addDockWidget(area, widget)
+
+    def removeDockWidget(self, widget: QtWidgets.QDockWidget) -> None:
+        """
+        Undocks a panel from the hidden main window.
+        """
+        self.window.removeDockWidget(widget)
+
+
+def measure_fresh_import(repeats: int) -> Dict[str, float]:
+    """
+    Times importing the plugin module in a new interpreter, where none of
+    the plugin's modules are loaded yet. PyQt5 and QGIS are imported before
+    the clock starts, as they are already loaded when QGIS loads a plugin.
+
+    Args:
+        repeats (int): Number of interpreters started; the fastest import
+            is reported.
+
+    Returns:
+        Dict[str, float]: Seconds, peak bytes and the number of plugin
+        modules the import loaded.
+    """
+    best: Dict[str, float] = {}
+    for _ in range(max(1, repeats)):
+        output = subprocess.run(
+            [sys.executable, "-c", FRESH_IMPORT_SCRIPT],
+            cwd=REPOSITORY_DIRECTORY,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        if not best or run["seconds"] < best["seconds"]:
+            best = {key: float(value) for key, value in run.items()}
+    best["ops_per_second"] = 1.0 / best["seconds"] if best["seconds"] > 0 else 0.0
+    return best
+
+
+def bench_startup(repeats: int) -> Results:
+    """
+    Measures importing the plugin in a fresh interpreter, plugin loading
+    with lazily built dialogs against building the dialogs eagerly, and
+    loading each .ui file by parsing its XML against running the module
+    precompiled from it. Apart from the fresh import, the plugin modules
+    are already imported by this script when these run.
+    """
+    iface = HeadlessInterface()
+
+    def load_plugin() -> None:
+        plugin = LocationService(iface)
+        plugin.initGui()
+        plugin.unload()
+
+    def load_plugin_eagerly() -> None:
+        plugin = LocationService(iface)
+        plugin.initGui()
+        for name in STANDALONE_COMPONENTS:
+            plugin.component(name)
+        plugin.unload()
+
+    results: Results = {
+        "startup/plugin/fresh-import": measure_fresh_import(repeats),
+        "startup/plugin/lazy": measure(load_plugin, repeats),
+        f"startup/plugin/eager-{len(STANDALONE_COMPONENTS)}-dialogs": measure(
+            load_plugin_eagerly, repeats
+        ),
+    }
+    for ui_path in sorted(glob.glob(os.path.join(UI_DIRECTORY, "*", "*.ui"))):
+        name = os.path.splitext(os.path.basename(ui_path))[0]
+        root_class = ET.parse(ui_path).getroot().find("widget").get("class")
+        widget_class = getattr(QtWidgets, root_class)
+        source = io.StringIO()
+        uic.compileUi(ui_path, source)
+        namespace: Dict[str, Any] = {}
+        exec(compile(source.getvalue(), ui_path, "exec"), namespace)
+        form_class = next(v for k, v in namespace.items() if k.startswith("Ui_"))
+        results[f"startup/load-ui/{name}/xml"] = measure(
+            lambda path=ui_path, cls=widget_class: uic.loadUi(path, cls()), repeats
+        )
+        results[f"startup/load-ui/{name}/compiled"] = measure(
+            lambda form=form_class, cls=widget_class: form().setupUi(cls()), repeats
+        )
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """
+    Lists the benchmarks that got slower than the baseline allows.
+
+    Args:
+        results (Results): The current results.
+        baseline (Results): Results of a previous run.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20 %.
+
+    Returns:
+        List[str]: One line per regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or previous["seconds"] <= 0:
+            continue
+        ratio = current["seconds"] / previous["seconds"]
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                f"{name}: {previous['seconds']:.4f}s -> {current['seconds']:.4f}s "
+                f"({(ratio - 1.0) * 100:.0f}% slower)"
+            )
+    return regressions
+
+
+def print_results(results: Results) -> None:
+    """
+    Prints the results as an aligned table.
+    """
+    width = max(len(name) for name in results)
+    print(
+        f"{'benchmark':<{width}}  {'seconds':>10}  {'ops/s':>12}  "
+        f"{'peak MiB':>9}  {'kept MiB':>9}  {'wire KiB':>9}"
+    )
+    for name, result in results.items():
+        retained = result.get("retained_bytes")
+        kept = "-" if retained is None else f"{retained / (1024 * 1024):.2f}"
+        wire_bytes = result.get("wire_bytes")
+        wire = "-" if wire_bytes is None else f"{wire_bytes / 1024:.1f}"
+        print(
+            f"{name:<{width}}  {result['seconds']:>10.4f}  "
+            f"{result['ops_per_second']:>12.0f}  "
+            f"{result['peak_bytes'] / (1024 * 1024):>9.2f}  {kept:>9}  {wire:>9}"
+        )
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the plugin against a local mock server."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma separated payload sizes (result items or route vertices).",
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--route-legs", type=int, default=5)
+    parser.add_argument("--route-vertices", type=int, default=2000)
+    parser.add_argument("--only", default="", help="Run benchmarks with this prefix.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with a previous JSON result.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmarks and returns the process exit status.
+    """
+    args = parse_arguments(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QCoreApplication.setOrganizationName(SETTINGS_ORGANIZATION)
+    application = QgsApplication([], True)
+    application.initQgis()
+    configure_settings()
+    server = MockLocationServer(
+        settings=MockSettings(args.latency_ms, args.error_rate)
+    ).start()
+    suites: Dict[str, Callable[[], Results]] = {
+        "parse": lambda: bench_parsing(sizes, args.repeats),
+        "build": lambda: bench_feature_building(sizes, args.repeats),
+        "memory": lambda: bench_memory(sizes, args.repeats),
+        "requests": lambda: bench_requests(
+            server, args.requests, args.concurrency, args.repeats
+        ),
+        "startup": lambda: bench_startup(args.repeats),
+        "transport": lambda: bench_transport(
+            args.latency_ms,
+            args.requests,
+            args.concurrency,
+            args.repeats,
+            args.route_legs,
+            args.route_vertices,
+        ),
+    }
+    results: Results = {}
+    try:
+        for name, suite in suites.items():
+            if args.only and not name.startswith(args.only.split("/")[0]):
+                continue
+            results.update(suite())
+    finally:
+        server.stop()
+    if args.only:
+        results = {k: v for k, v in results.items() if k.startswith(args.only)}
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        status = 1 if regressions else 0
+    application.exitQgis()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
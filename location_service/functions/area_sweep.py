@@ -0,0 +1,446 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from qgis.core import (
+    QgsFeature,
+    QgsFields,
+    QgsGeometry,
+    QgsPointXY,
+    QgsRectangle,
+)
+
+from ..utils.request_pool import ProgressCallback, RequestPool
+from ..utils.result_models import PlaceItem
+from .places import PlacesFunctions
+
+CellKey = Tuple[float, float, float, float, int]
+
+
+class SweepCell:
+    """
+    A rectangle of the quadtree that covers the swept area.
+    """
+
+    __slots__ = ("depth", "east", "north", "south", "west")
+
+    def __init__(
+        self, west: float, south: float, east: float, north: float, depth: int = 0
+    ) -> None:
+        """
+        Initializes the cell.
+
+        Args:
+            west (float): Minimum longitude.
+            south (float): Minimum latitude.
+            east (float): Maximum longitude.
+            north (float): Maximum latitude.
+            depth (int): Number of splits from the root cell.
+        """
+        self.west = west
+        self.south = south
+        self.east = east
+        self.north = north
+        self.depth = depth
+
+    def key(self) -> CellKey:
+        """
+        Returns a hashable identity of the cell.
+
+        Returns:
+            CellKey: The bounds and depth.
+        """
+        return (self.west, self.south, self.east, self.north, self.depth)
+
+    def bounding_box(self) -> List[float]:
+        """
+        Returns the cell in the order of a search-text BoundingBox filter.
+
+        Returns:
+            List[float]: West, south, east and north.
+        """
+        return [self.west, self.south, self.east, self.north]
+
+    def split(self) -> List["SweepCell"]:
+        """
+        Divides the cell into four quadrants.
+
+        Returns:
+            List[SweepCell]: The south-west, south-east, north-west and
+            north-east quadrants, one level deeper.
+        """
+        middle_x = (self.west + self.east) / 2
+        middle_y = (self.south + self.north) / 2
+        depth = self.depth + 1
+        return [
+            SweepCell(self.west, self.south, middle_x, middle_y, depth),
+            SweepCell(middle_x, self.south, self.east, middle_y, depth),
+            SweepCell(self.west, middle_y, middle_x, self.north, depth),
+            SweepCell(middle_x, middle_y, self.east, self.north, depth),
+        ]
+
+    def geometry(self) -> QgsGeometry:
+        """
+        Returns the cell as a polygon.
+
+        Returns:
+            QgsGeometry: The rectangle.
+        """
+        return QgsGeometry.fromRect(
+            QgsRectangle(self.west, self.south, self.east, self.north)
+        )
+
+
+class SweepCheckpoint:
+    """
+    A JSON file holding the state of an unfinished sweep: the settings it
+    was started with, the cells still to search and the places found so
+    far. It is replaced atomically, so a crash never leaves it half written.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the checkpoint.
+
+        Args:
+            path (str): Location of the JSON file.
+        """
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Reads the saved state.
+
+        Returns:
+            Optional[Dict[str, Any]]: The state, or None if the file is
+            missing, unreadable or from another version.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("version") != self.VERSION:
+            return None
+        return state
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Writes the state through a temporary file.
+
+        Args:
+            state (Dict[str, Any]): The state to save.
+        """
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({**state, "version": self.VERSION}, f, separators=(",", ":"))
+        os.replace(temporary_path, self.path)
+
+    def remove(self) -> None:
+        """
+        Deletes the file once the sweep has completed.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class AreaSweep:
+    """
+    Collects every place matching a query inside a polygon area.
+
+    The area's bounding box is searched with one bounding-box filtered
+    request per quadtree cell. A cell whose reply is full is split into
+    four and searched again, so dense places are covered by small cells
+    and sparse ones by large cells. Cells outside the area are skipped,
+    cell requests run concurrently and places are de-duplicated by their
+    place id.
+    """
+
+    DEFAULT_MAX_DEPTH = 8
+    CELL_MAX_RESULTS = PlacesFunctions.PAGE_MAX_RESULTS
+    CHECKPOINT_INTERVAL_S = 10.0
+
+    def __init__(
+        self,
+        places: Optional[PlacesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the sweep.
+
+        Args:
+            places (Optional[PlacesFunctions]): Places backend used to build
+                requests. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.places = places or PlacesFunctions()
+        self.pool = RequestPool(self.places.api_handler, concurrency, max_retries)
+        self.places_found: Dict[str, PlaceItem] = {}
+        self.errors: List[Tuple[SweepCell, Exception]] = []
+        self.cells_searched = 0
+        self.truncated_cells = 0
+        self.resumed = False
+        self._pending: Dict[CellKey, SweepCell] = {}
+        self._failed: Dict[CellKey, SweepCell] = {}
+        self._query = ""
+        self._area_id = ""
+        self._max_depth = self.DEFAULT_MAX_DEPTH
+        self._engine: Any = None
+        self._checkpoint: Optional[SweepCheckpoint] = None
+        self._saved_at = 0.0
+
+    @staticmethod
+    def area_id(area: QgsGeometry) -> str:
+        """
+        Fingerprints an area so that a checkpoint is only resumed for the
+        same polygons.
+
+        Args:
+            area (QgsGeometry): The swept area in WGS84.
+
+        Returns:
+            str: A hash of the area's WKT.
+        """
+        return hashlib.sha1(area.asWkt(7).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def place_key(item: PlaceItem) -> str:
+        """
+        Returns the identity used to de-duplicate places.
+
+        Args:
+            item (PlaceItem): A search result.
+
+        Returns:
+            str: The place id, or the title and position if it has none.
+        """
+        return item.place_id or f"{item.title}|{item.lon:.6f}|{item.lat:.6f}"
+
+    def start(
+        self,
+        area: QgsGeometry,
+        query: str,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        checkpoint: Optional[SweepCheckpoint] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+    ) -> int:
+        """
+        Starts searching the area, resuming from the checkpoint when it was
+        saved for the same query, area and depth.
+
+        Args:
+            area (QgsGeometry): The polygons to sweep, in WGS84.
+            query (str): The query text, e.g. a category name.
+            max_depth (int): Maximum number of cell splits. Cells still full
+                at this depth are counted in truncated_cells.
+            checkpoint (Optional[SweepCheckpoint]): File the progress is
+                saved to while the sweep runs.
+            on_progress (Optional[ProgressCallback]): Called with the
+                finished and total cell requests.
+            on_finished (Optional[Callable[[], None]]): Called once no cell
+                is left to search.
+
+        Returns:
+            int: Number of cells queued at the start.
+        """
+        self._query = query
+        self._area_id = self.area_id(area)
+        self._max_depth = max_depth
+        self._checkpoint = checkpoint
+        self._engine = QgsGeometry.createGeometryEngine(area.constGet())
+        self._engine.prepareGeometry()
+        self.pool.on_progress = on_progress
+        self.pool.on_finished = self._on_pool_finished(on_finished)
+        cells = self._restore() if checkpoint is not None else None
+        if cells is None:
+            extent = area.boundingBox()
+            cells = [
+                SweepCell(
+                    extent.xMinimum(),
+                    extent.yMinimum(),
+                    extent.xMaximum(),
+                    extent.yMaximum(),
+                )
+            ]
+        queued = sum(1 for cell in cells if self._submit(cell))
+        if queued == 0:
+            self.pool.on_finished()
+        return queued
+
+    def _on_pool_finished(
+        self, on_finished: Optional[Callable[[], None]]
+    ) -> Callable[[], None]:
+        """
+        Wraps the finished callback so that the final state is saved first.
+
+        Args:
+            on_finished (Optional[Callable[[], None]]): The caller's callback.
+
+        Returns:
+            Callable[[], None]: The callback for the request pool.
+        """
+
+        def finished() -> None:
+            self.save_checkpoint()
+            if on_finished is not None:
+                on_finished()
+
+        return finished
+
+    def _restore(self) -> Optional[List[SweepCell]]:
+        """
+        Loads the places and cells of a matching checkpoint.
+
+        Returns:
+            Optional[List[SweepCell]]: The cells left to search, or None if
+            there is no checkpoint for this sweep.
+        """
+        state = self._checkpoint.load()
+        if state is None or (
+            state.get("query"),
+            state.get("area"),
+            state.get("max_depth"),
+        ) != (self._query, self._area_id, self._max_depth):
+            return None
+        for row in state.get("places", []):
+            item = PlaceItem(**dict(zip(PlaceItem.__slots__, row)))
+            self.places_found[self.place_key(item)] = item
+        self.cells_searched = state.get("cells_searched", 0)
+        self.truncated_cells = state.get("truncated_cells", 0)
+        self.resumed = True
+        return [SweepCell(*values) for values in state.get("cells", [])]
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Describes the sweep so far.
+
+        Returns:
+            Dict[str, Any]: Settings, unsearched and failed cells, counters
+            and the places found.
+        """
+        cells = list(self._pending.values()) + list(self._failed.values())
+        return {
+            "query": self._query,
+            "area": self._area_id,
+            "max_depth": self._max_depth,
+            "cells": [list(cell.key()) for cell in cells],
+            "cells_searched": self.cells_searched,
+            "truncated_cells": self.truncated_cells,
+            "places": [
+                [getattr(item, name) for name in PlaceItem.__slots__]
+                for item in self.places_found.values()
+            ],
+        }
+
+    def save_checkpoint(self) -> None:
+        """
+        Writes the checkpoint now, if the sweep has one.
+        """
+        if self._checkpoint is None:
+            return
+        self._checkpoint.save(self.checkpoint_state())
+        self._saved_at = time.monotonic()
+
+    def is_complete(self) -> bool:
+        """
+        Tells whether every cell was searched successfully.
+
+        Returns:
+            bool: True if no cell is pending or failed.
+        """
+        return not self._pending and not self._failed
+
+    def _submit(self, cell: SweepCell) -> bool:
+        """
+        Queues the search of a cell if it touches the area.
+
+        Args:
+            cell (SweepCell): The cell to search.
+
+        Returns:
+            bool: True if a request was queued.
+        """
+        if not self._engine.intersects(cell.geometry().constGet()):
+            return False
+        url, data = self.places.build_area_search_request(
+            self._query, cell.bounding_box(), self.CELL_MAX_RESULTS
+        )
+        self._pending[cell.key()] = cell
+        self.pool.submit(
+            url,
+            data,
+            lambda result, cell=cell: self._on_cell(cell, result),
+            lambda error, cell=cell: self._on_cell_error(cell, error),
+            PlaceItem.FIELDS,
+        )
+        return True
+
+    def _on_cell(self, cell: SweepCell, result: Dict[str, Any]) -> None:
+        """
+        Keeps the new places of a cell inside the area and splits the cell
+        if its reply was full.
+
+        Args:
+            cell (SweepCell): The searched cell.
+            result (Dict[str, Any]): The search-text response.
+        """
+        items = result.get("ResultItems") or []
+        for item in PlaceItem.from_response(result):
+            if item.lon is None:
+                continue
+            key = self.place_key(item)
+            if key in self.places_found:
+                continue
+            point = QgsGeometry.fromPointXY(QgsPointXY(item.lon, item.lat))
+            if self._engine.intersects(point.constGet()):
+                self.places_found[key] = item
+        if len(items) >= self.CELL_MAX_RESULTS:
+            if cell.depth < self._max_depth:
+                for child in cell.split():
+                    self._submit(child)
+            else:
+                self.truncated_cells += 1
+        self.cells_searched += 1
+        self._pending.pop(cell.key(), None)
+        if time.monotonic() - self._saved_at >= self.CHECKPOINT_INTERVAL_S:
+            self.save_checkpoint()
+
+    def _on_cell_error(self, cell: SweepCell, error: Exception) -> None:
+        """
+        Records a cell that failed after its retries, so that a resumed
+        sweep searches it again.
+
+        Args:
+            cell (SweepCell): The cell that failed.
+            error (Exception): The failure.
+        """
+        self._pending.pop(cell.key(), None)
+        self._failed[cell.key()] = cell
+        self.errors.append((cell, error))
+
+    def cancel(self) -> None:
+        """
+        Stops the sweep. The pool's finished callback saves the checkpoint,
+        with the cells still in flight, so that the sweep can resume.
+        """
+        self.pool.cancel()
+
+    def iter_features(self, fields: QgsFields) -> Iterator[QgsFeature]:
+        """
+        Lazily builds a point feature for every place found.
+
+        Args:
+            fields (QgsFields): Fields created by PlacesFunctions.create_fields.
+
+        Yields:
+            QgsFeature: One feature per place.
+        """
+        for item in self.places_found.values():
+            yield self.places.place_feature(fields, item)
@@ -0,0 +1,372 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from PyQt5.QtCore import QVariant
+from PyQt5.QtGui import QColor
+from qgis.core import (
+    QgsFeature,
+    QgsField,
+    QgsFields,
+    QgsFillSymbol,
+    QgsGeometry,
+    QgsProject,
+    QgsSingleSymbolRenderer,
+    QgsSpatialIndex,
+    QgsVectorLayer,
+)
+
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.geometry_codec import (
+    decode_flexible_polyline,
+    flatten_coordinates,
+    multipolygon_wkb,
+)
+from ..utils.request_pool import PoolJob, ProgressCallback, RequestPool
+from .route_matrix import Coordinate
+from .routes import RoutesFunctions
+
+
+class IsolineFunctions:
+    """
+    Calculates reachability polygons (isolines) around many origins at
+    several travel-time or distance thresholds, and dissolves overlapping
+    isolines into coverage areas.
+    """
+
+    THRESHOLD_TIME = "Time"
+    THRESHOLD_DISTANCE = "Distance"
+    ISOLINE_GEOMETRY_FORMAT = "FlexiblePolyline"
+    MAX_THRESHOLDS = 5
+    LAYER_TYPE = "MultiPolygon"
+    LAYER_NAME = "Isolines"
+    COVERAGE_LAYER_NAME = "IsolineCoverage"
+    FIELD_ORIGIN = "OriginId"
+    FIELD_THRESHOLD_TYPE = "ThresholdType"
+    FIELD_THRESHOLD = "Threshold"
+    FIELD_ORIGIN_COUNT = "Origins"
+    FILL_COLOR = QColor(0, 124, 191, 60)
+    OUTLINE_COLOR = QColor(0, 124, 191)
+
+    def __init__(
+        self,
+        routes: Optional[RoutesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the isoline calculator.
+
+        Args:
+            routes (Optional[RoutesFunctions]): Routes backend providing the
+                configuration and API handler. A new one is created when
+                omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.routes = routes or RoutesFunctions()
+        self.pool = RequestPool(self.routes.api_handler, concurrency, max_retries)
+        self.errors: List[Tuple[str, Exception]] = []
+        self.features: List[QgsFeature] = []
+
+    def build_isolines_request(
+        self,
+        lon: float,
+        lat: float,
+        thresholds: Sequence[float],
+        threshold_type: str = THRESHOLD_TIME,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of an isolines request.
+
+        Args:
+            lon (float): Longitude of the origin.
+            lat (float): Latitude of the origin.
+            thresholds (Sequence[float]): Up to MAX_THRESHOLDS travel times in
+                seconds or distances in meters.
+            threshold_type (str): THRESHOLD_TIME or THRESHOLD_DISTANCE.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.routes.get_configuration_settings()
+        isolines_url = (
+            f"https://routes.geo.{region}.amazonaws.com/v2/isolines?key={apikey}"
+        )
+        data = {
+            "Origin": [lon, lat],
+            "Thresholds": {threshold_type: [int(value) for value in thresholds]},
+            "IsolineGeometryFormat": self.ISOLINE_GEOMETRY_FORMAT,
+        }
+        return isolines_url, data
+
+    @staticmethod
+    def isoline_geometry(isoline: Dict[str, Any]) -> QgsGeometry:
+        """
+        Decodes the polygons of one isoline in bulk through flat coordinate
+        buffers and WKB.
+
+        Args:
+            isoline (Dict[str, Any]): An isoline with FlexiblePolyline
+                "PolylinePolygon" or Simple "Polygon" geometries.
+
+        Returns:
+            QgsGeometry: The isoline as a multipolygon.
+        """
+        polygons = []
+        for shape in isoline.get("Geometries", []):
+            if "PolylinePolygon" in shape:
+                rings = [decode_flexible_polyline(r) for r in shape["PolylinePolygon"]]
+            else:
+                rings = [flatten_coordinates(r) for r in shape.get("Polygon", [])]
+            if rings:
+                polygons.append(rings)
+        geometry = QgsGeometry()
+        geometry.fromWkb(multipolygon_wkb(polygons))
+        return geometry
+
+    def create_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of an isolines layer.
+
+        Returns:
+            QgsFields: Origin id, threshold type and threshold fields.
+        """
+        fields = QgsFields()
+        fields.append(QgsField(self.FIELD_ORIGIN, QVariant.String))
+        fields.append(QgsField(self.FIELD_THRESHOLD_TYPE, QVariant.String))
+        fields.append(QgsField(self.FIELD_THRESHOLD, QVariant.Double))
+        return fields
+
+    def create_coverage_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of a dissolved coverage layer.
+
+        Returns:
+            QgsFields: Threshold type, threshold and origin count fields.
+        """
+        fields = QgsFields()
+        fields.append(QgsField(self.FIELD_THRESHOLD_TYPE, QVariant.String))
+        fields.append(QgsField(self.FIELD_THRESHOLD, QVariant.Double))
+        fields.append(QgsField(self.FIELD_ORIGIN_COUNT, QVariant.Int))
+        return fields
+
+    def iter_features(
+        self, fields: QgsFields, origin_id: str, data: Dict[str, Any]
+    ) -> Iterator[QgsFeature]:
+        """
+        Lazily builds one polygon feature per isoline of a reply.
+
+        Args:
+            fields (QgsFields): Fields following the schema of create_fields.
+            origin_id (str): Identifier of the origin.
+            data (Dict[str, Any]): The isolines response.
+
+        Yields:
+            QgsFeature: One feature per threshold.
+        """
+        for isoline in data.get("Isolines", []):
+            if "TimeThreshold" in isoline:
+                threshold_type = self.THRESHOLD_TIME
+                threshold = isoline["TimeThreshold"]
+            else:
+                threshold_type = self.THRESHOLD_DISTANCE
+                threshold = isoline.get("DistanceThreshold")
+            feature = QgsFeature(fields)
+            feature.setGeometry(self.isoline_geometry(isoline))
+            feature.setAttributes([origin_id, threshold_type, threshold])
+            yield feature
+
+    def compute(
+        self,
+        origin_ids: Sequence[str],
+        origins: Sequence[Coordinate],
+        thresholds: Sequence[float],
+        writer: StreamingFeatureWriter,
+        threshold_type: str = THRESHOLD_TIME,
+        on_progress: Optional[ProgressCallback] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+        keep_features: bool = False,
+    ) -> int:
+        """
+        Starts calculating the isolines of every origin concurrently. The
+        polygons are written in chunks as the replies arrive.
+
+        Args:
+            origin_ids (Sequence[str]): Identifiers of the origins.
+            origins (Sequence[Coordinate]): Origin longitude/latitude pairs.
+            thresholds (Sequence[float]): Travel times in seconds or
+                distances in meters. More than MAX_THRESHOLDS are split over
+                several requests per origin.
+            writer (StreamingFeatureWriter): Receives the polygon features.
+                Its fields must follow the schema of create_fields.
+            threshold_type (str): THRESHOLD_TIME or THRESHOLD_DISTANCE.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts.
+            on_finished (Optional[Callable[[], None]]): Called once every
+                request has finished.
+            keep_features (bool): Also keep the features in features, e.g.
+                to dissolve them afterwards.
+
+        Returns:
+            int: Number of queued requests.
+        """
+        self.errors = []
+        self.features = []
+        fields = self.create_fields()
+        groups = [
+            list(thresholds[i : i + self.MAX_THRESHOLDS])
+            for i in range(0, len(thresholds), self.MAX_THRESHOLDS)
+        ]
+
+        def write_result(origin_id: str, result: Dict[str, Any]) -> None:
+            features = list(self.iter_features(fields, origin_id, result))
+            writer.add_features(features)
+            if keep_features:
+                self.features.extend(features)
+
+        def jobs() -> Iterator[PoolJob]:
+            for origin_id, (lon, lat) in zip(origin_ids, origins):
+                for group in groups:
+                    url, data = self.build_isolines_request(
+                        lon, lat, group, threshold_type
+                    )
+                    yield PoolJob(
+                        url,
+                        data,
+                        lambda result, origin_id=origin_id: write_result(
+                            origin_id, result
+                        ),
+                        lambda error, origin_id=origin_id: self.errors.append(
+                            (origin_id, error)
+                        ),
+                    )
+
+        count = len(origins) * len(groups)
+        self.pool.on_progress = on_progress
+        self.pool.on_finished = on_finished
+        self.pool.extend(jobs(), count)
+        if count == 0 and on_finished is not None:
+            on_finished()
+        return count
+
+    def dissolve(
+        self, fields: QgsFields, features: Iterable[QgsFeature]
+    ) -> Iterator[QgsFeature]:
+        """
+        Merges overlapping isolines of the same threshold into coverage
+        areas.
+
+        Overlap candidates are found through a spatial index of each
+        threshold's polygons and grouped with a union-find, so only nearby
+        polygons are compared and each group is unioned once.
+
+        Args:
+            fields (QgsFields): Fields following create_coverage_fields.
+            features (Iterable[QgsFeature]): Isoline features following the
+                schema of create_fields.
+
+        Yields:
+            QgsFeature: One feature per connected coverage area.
+        """
+        by_threshold: Dict[Tuple[str, float], List[QgsGeometry]] = {}
+        for feature in features:
+            geometry = feature.geometry()
+            if geometry is None or geometry.isEmpty():
+                continue
+            key = (
+                feature[self.FIELD_THRESHOLD_TYPE],
+                feature[self.FIELD_THRESHOLD],
+            )
+            by_threshold.setdefault(key, []).append(QgsGeometry(geometry))
+        for (threshold_type, threshold), geometries in sorted(by_threshold.items()):
+            for group in self.overlap_groups(geometries):
+                feature = QgsFeature(fields)
+                feature.setGeometry(
+                    QgsGeometry.unaryUnion([geometries[index] for index in group])
+                )
+                feature.setAttributes([threshold_type, threshold, len(group)])
+                yield feature
+
+    @staticmethod
+    def overlap_groups(geometries: Sequence[QgsGeometry]) -> List[List[int]]:
+        """
+        Groups geometries that overlap directly or through other geometries.
+
+        Args:
+            geometries (Sequence[QgsGeometry]): The geometries to group.
+
+        Returns:
+            List[List[int]]: Indices of the geometries of each group.
+        """
+        index = QgsSpatialIndex()
+        for position, geometry in enumerate(geometries):
+            index.addFeature(position, geometry.boundingBox())
+        parents = list(range(len(geometries)))
+
+        def find(item: int) -> int:
+            while parents[item] != item:
+                parents[item] = parents[parents[item]]
+                item = parents[item]
+            return item
+
+        for position, geometry in enumerate(geometries):
+            engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+            engine.prepareGeometry()
+            for candidate in index.intersects(geometry.boundingBox()):
+                if candidate <= position:
+                    continue
+                root, other = find(position), find(candidate)
+                if root == other:
+                    continue
+                if engine.intersects(geometries[candidate].constGet()):
+                    parents[other] = root
+        groups: Dict[int, List[int]] = {}
+        for position in range(len(geometries)):
+            groups.setdefault(find(position), []).append(position)
+        return list(groups.values())
+
+    def cancel(self) -> None:
+        """
+        Stops the requests. Isolines received so far stay in the output.
+        """
+        self.pool.cancel()
+
+    def create_layer(self, name: str = LAYER_NAME) -> QgsVectorLayer:
+        """
+        Creates an empty styled memory layer for isolines.
+
+        Args:
+            name (str): Name of the layer.
+
+        Returns:
+            QgsVectorLayer: The layer.
+        """
+        layer = QgsVectorLayer(
+            f"{self.LAYER_TYPE}?crs={self.routes.WGS84_CRS}", name, "memory"
+        )
+        layer.dataProvider().addAttributes(self.create_fields())
+        layer.updateFields()
+        symbol = QgsFillSymbol.createSimple({})
+        symbol.setColor(self.FILL_COLOR)
+        symbol.symbolLayer(0).setStrokeColor(self.OUTLINE_COLOR)
+        layer.setRenderer(QgsSingleSymbolRenderer(symbol))
+        return layer
+
+    def show_layer(self, layer: QgsVectorLayer) -> None:
+        """
+        Adds a populated layer to the project.
+
+        Args:
+            layer (QgsVectorLayer): The layer to show.
+        """
+        layer.triggerRepaint()
+        QgsProject.instance().addMapLayer(layer)
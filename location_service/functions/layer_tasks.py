@@ -0,0 +1,343 @@
+import abc
+from typing import Any, Callable, ClassVar, Dict, List, Optional
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+from qgis.core import QgsApplication, QgsProject, QgsTask, QgsVectorLayer
+
+from ..utils.external_api_handler import (
+    ApiRequest,
+    ErrorCallback,
+    ExternalApiHandler,
+    SuccessCallback,
+)
+from ..utils.instrumentation import Instrumentation
+from .places import PlacesFunctions
+from .routes import RoutesFunctions
+
+RequestStarter = Callable[[SuccessCallback, ErrorCallback], ApiRequest]
+
+
+class _AbstractTaskMeta(type(QgsTask), abc.ABCMeta):
+    """
+    Metaclass combining the sip wrapper type of QgsTask with ABCMeta, so
+    that abstract methods of a task are enforced.
+    """
+
+
+class ApiLayerTask(QgsTask, metaclass=_AbstractTaskMeta):
+    """
+    Background job that sends an API request, decodes the reply and builds
+    a styled memory layer on a worker thread. Only adding the finished
+    layer to the project happens on the GUI thread.
+
+    Tasks are listed in the QGIS task manager, report their progress there
+    and can be cancelled from it. Any number of them may run at once.
+    """
+
+    CANCEL_POLL_MS = 100
+    PROGRESS_SENT = 10.0
+    PROGRESS_RECEIVED = 60.0
+    PROGRESS_BUILT = 90.0
+
+    _active: ClassVar[List["ApiLayerTask"]] = []
+
+    def __init__(
+        self, description: str, on_error: Optional[ErrorCallback] = None
+    ) -> None:
+        """
+        Initializes the task.
+
+        Args:
+            description (str): Text shown in the task manager.
+            on_error (Optional[ErrorCallback]): Called on the GUI thread if
+                the request or the layer build fails. Not called when the
+                task is cancelled.
+        """
+        super().__init__(description, QgsTask.CanCancel)
+        self.on_error = on_error
+        self.layer: Optional[QgsVectorLayer] = None
+        self.error: Optional[Exception] = None
+
+    @abc.abstractmethod
+    def fetch(self, handler: ExternalApiHandler) -> Dict[str, Any]:
+        """
+        Sends the request of the task. Runs on the worker thread.
+
+        Args:
+            handler (ExternalApiHandler): Handler bound to the network
+                manager of the worker thread.
+
+        Returns:
+            Dict[str, Any]: The decoded response.
+        """
+
+    @abc.abstractmethod
+    def build_layer(self, result: Dict[str, Any]) -> QgsVectorLayer:
+        """
+        Builds and styles the layer of a response. Runs on the worker
+        thread.
+
+        Args:
+            result (Dict[str, Any]): The decoded response.
+
+        Returns:
+            QgsVectorLayer: The layer to add to the project.
+        """
+
+    def wait_for(
+        self, handler: ExternalApiHandler, start: RequestStarter
+    ) -> Dict[str, Any]:
+        """
+        Starts an asynchronous request and runs a local event loop until it
+        finishes. The loop also polls isCanceled so that cancelling the task
+        aborts the reply instead of waiting for the request timeout.
+
+        Args:
+            handler (ExternalApiHandler): Handler that owns the request.
+            start (RequestStarter): Starts the request with the given
+                success and error callbacks.
+
+        Returns:
+            Dict[str, Any]: The decoded response.
+
+        Raises:
+            Exception: The failure reported by the request.
+        """
+        outcome: Dict[str, Any] = {}
+        event_loop = QEventLoop()
+
+        def on_success(result: Dict[str, Any]) -> None:
+            outcome["result"] = result
+            event_loop.quit()
+
+        def on_error(error: Exception) -> None:
+            outcome["error"] = error
+            event_loop.quit()
+
+        api_request = start(on_success, on_error)
+
+        def check_cancelled() -> None:
+            if self.isCanceled():
+                handler.cancel_request(api_request)
+                event_loop.quit()
+
+        timer = QTimer()
+        timer.timeout.connect(check_cancelled)
+        timer.start(self.CANCEL_POLL_MS)
+        if not api_request.finished:
+            event_loop.exec_()
+        timer.stop()
+        if "error" in outcome:
+            raise outcome["error"]
+        result = outcome.get("result")
+        if result is None and not self.isCanceled():
+            raise ValueError("Failed to receive a valid response from the API.")
+        return result or {}
+
+    def run(self) -> bool:
+        """
+        Fetches the response and builds the layer. Runs on the worker thread.
+
+        Returns:
+            bool: True if a layer is ready to be added.
+        """
+        try:
+            handler = ExternalApiHandler()
+            self.setProgress(self.PROGRESS_SENT)
+            result = self.fetch(handler)
+            if self.isCanceled():
+                return False
+            self.setProgress(self.PROGRESS_RECEIVED)
+            layer = self.build_layer(result)
+            if self.isCanceled():
+                return False
+            self.setProgress(self.PROGRESS_BUILT)
+            layer.moveToThread(QCoreApplication.instance().thread())
+            self.layer = layer
+            return True
+        except Exception as e:
+            self.error = e
+            return False
+
+    def finished(self, result: bool) -> None:
+        """
+        Adds the layer to the project or reports the failure. Runs on the
+        GUI thread.
+
+        Args:
+            result (bool): The return value of run.
+        """
+        if self in ApiLayerTask._active:
+            ApiLayerTask._active.remove(self)
+        if result and self.layer is not None:
+            timer = Instrumentation.start("task.layer_add")
+            QgsProject.instance().addMapLayer(self.layer)
+            timer.finish(features=self.layer.featureCount())
+        elif self.error is not None and self.on_error is not None:
+            self.on_error(self.error)
+
+    def start(self) -> "ApiLayerTask":
+        """
+        Hands the task to the QGIS task manager. A reference is kept until
+        the task finishes, since the manager does not keep the Python
+        object alive.
+
+        Returns:
+            ApiLayerTask: The task itself.
+        """
+        ApiLayerTask._active.append(self)
+        QgsApplication.taskManager().addTask(self)
+        return self
+
+    @classmethod
+    def cancel_all(cls) -> None:
+        """
+        Cancels every task that has not finished yet.
+        """
+        for task in list(cls._active):
+            task.cancel()
+
+
+class SearchTextTask(ApiLayerTask):
+    """
+    Searches places in the background and adds the results as a point layer.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        lon: float,
+        lat: float,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> None:
+        """
+        Initializes the search.
+
+        Args:
+            text (str): The free-form query text.
+            lon (float): Longitude of the position to search.
+            lat (float): Latitude of the position to search.
+            on_error (Optional[ErrorCallback]): Called if the search fails.
+        """
+        super().__init__(f"SearchText: {text}", on_error)
+        self.text = text
+        self.lon = lon
+        self.lat = lat
+        self.places: Optional[PlacesFunctions] = None
+
+    def fetch(self, handler: ExternalApiHandler) -> Dict[str, Any]:
+        """
+        Sends the search-text request, answered from the nearby results
+        memory when possible.
+
+        Args:
+            handler (ExternalApiHandler): Handler of the worker thread.
+
+        Returns:
+            Dict[str, Any]: The search results.
+        """
+        self.places = PlacesFunctions()
+        self.places.api_handler = handler
+        return self.wait_for(
+            handler,
+            lambda on_success, on_error: self.places.search_text_async(
+                self.text, self.lon, self.lat, on_success, on_error
+            ),
+        )
+
+    def build_layer(self, result: Dict[str, Any]) -> QgsVectorLayer:
+        """
+        Builds the styled and labeled point layer of the results.
+
+        Args:
+            result (Dict[str, Any]): The search results.
+
+        Returns:
+            QgsVectorLayer: The memory layer.
+        """
+        places = self.places or PlacesFunctions()
+        layer = QgsVectorLayer(
+            f"{places.LAYER_TYPE}?crs={places.WGS84_CRS}", places.LAYER_NAME, "memory"
+        )
+        timer = Instrumentation.start("places.layer")
+        with timer.phase("feature_build"):
+            places.add_attributes(layer)
+            places.add_features(layer, result)
+        with timer.phase("style"):
+            places.style_layer(layer)
+        timer.finish(features=layer.featureCount(), output="memory")
+        return layer
+
+
+class CalculateRoutesTask(ApiLayerTask):
+    """
+    Calculates a route in the background and adds it as a line layer.
+    """
+
+    def __init__(
+        self,
+        st_lon: float,
+        st_lat: float,
+        ed_lon: float,
+        ed_lat: float,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> None:
+        """
+        Initializes the calculation.
+
+        Args:
+            st_lon (float): Longitude of the start position.
+            st_lat (float): Latitude of the start position.
+            ed_lon (float): Longitude of the end position.
+            ed_lat (float): Latitude of the end position.
+            on_error (Optional[ErrorCallback]): Called if the calculation
+                fails.
+        """
+        super().__init__(
+            f"CalculateRoutes: {st_lon},{st_lat} - {ed_lon},{ed_lat}", on_error
+        )
+        self.start_position = (st_lon, st_lat)
+        self.end_position = (ed_lon, ed_lat)
+        self.routes: Optional[RoutesFunctions] = None
+
+    def fetch(self, handler: ExternalApiHandler) -> Dict[str, Any]:
+        """
+        Sends the calculate-routes request.
+
+        Args:
+            handler (ExternalApiHandler): Handler of the worker thread.
+
+        Returns:
+            Dict[str, Any]: The route data.
+        """
+        self.routes = RoutesFunctions()
+        self.routes.api_handler = handler
+        return self.wait_for(
+            handler,
+            lambda on_success, on_error: self.routes.calculate_routes_async(
+                *self.start_position, *self.end_position, on_success, on_error
+            ),
+        )
+
+    def build_layer(self, result: Dict[str, Any]) -> QgsVectorLayer:
+        """
+        Builds the styled line layer of the route.
+
+        Args:
+            result (Dict[str, Any]): The route data.
+
+        Returns:
+            QgsVectorLayer: The memory layer.
+        """
+        routes = self.routes or RoutesFunctions()
+        layer = QgsVectorLayer(
+            f"{routes.LAYER_TYPE}?crs={routes.WGS84_CRS}", routes.LAYER_NAME, "memory"
+        )
+        timer = Instrumentation.start("routes.layer")
+        with timer.phase("feature_build"):
+            routes.add_attributes(layer)
+            routes.add_features(layer, result)
+        with timer.phase("style"):
+            routes.style_layer(layer)
+        timer.finish(features=layer.featureCount(), output="memory")
+        return layer
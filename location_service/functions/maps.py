@@ -1,8 +1,13 @@
-from typing import Tuple
+import os
+from typing import Optional, Tuple
 
-from qgis.core import QgsProject, QgsRasterLayer
+from qgis.core import QgsApplication, QgsProject, QgsRasterLayer
 
 from ..utils.configuration_handler import ConfigurationHandler
+from ..utils.instrumentation import Instrumentation
+from ..utils.request_pool import ProgressCallback
+from ..utils.tile_cache import BoundingBox, TileCache
+from .tile_prefetch import TilePrefetcher
 
 
 class MapsFunctions:
@@ -13,6 +18,12 @@ class MapsFunctions:
 
     KEY_REGION = "region_value"
     KEY_APIKEY = "apikey_value"
+    MAP_STYLES = ("Standard", "Monochrome", "Hybrid", "Satellite")
+    KEY_TILE_OFFLINE = "tile_offline_mode"
+    KEY_TILE_CACHE_MAX_SIZE = "tile_cache_max_size_mb"
+    TILE_CACHE_DIRECTORY = os.path.join("location_service", "tiles")
+    MIN_ZOOM = 0
+    MAX_ZOOM = 18
 
     def __init__(self) -> None:
         """
@@ -32,21 +43,146 @@ class MapsFunctions:
         apikey = self.configuration_handler.get_setting(self.KEY_APIKEY)
         return region, apikey
 
-    def add_xyz_tile_layer(self, selected_style: str) -> str:
+    def tile_url(self, selected_style: str) -> str:
+        """
+        Builds the XYZ tile URL template of a map style.
+
+        Args:
+            selected_style (str): The map style name.
+
+        Returns:
+            str: URL with {z}, {x} and {y} placeholders.
+        """
+        region_value, apikey_value = self.get_configuration_settings()
+        return (
+            f"https://als.dayjournal.dev/{region_value}/{selected_style}/"
+            f"{{z}}/{{x}}/{{y}}?APIkey={apikey_value}"
+        )
+
+    def tile_cache_path(self, selected_style: str) -> str:
+        """
+        Returns the MBTiles file caching the tiles of a map style.
+
+        Args:
+            selected_style (str): The map style name.
+
+        Returns:
+            str: Path under the QGIS profile directory.
+        """
+        region_value, _ = self.get_configuration_settings()
+        return os.path.join(
+            QgsApplication.qgisSettingsDirPath(),
+            self.TILE_CACHE_DIRECTORY,
+            f"{region_value}_{selected_style}.mbtiles",
+        )
+
+    def tile_cache(self, selected_style: str) -> TileCache:
+        """
+        Opens the tile cache of a map style with the configured size limit.
+
+        Args:
+            selected_style (str): The map style name.
+
+        Returns:
+            TileCache: The cache.
+        """
+        max_size_mb = self.configuration_handler.get_int_setting(
+            self.KEY_TILE_CACHE_MAX_SIZE
+        )
+        cache = TileCache(
+            self.tile_cache_path(selected_style), max_size_mb * 1024 * 1024
+        )
+        cache.set_metadata(
+            {"name": selected_style, "type": "baselayer", "version": "1.0"}
+        )
+        return cache
+
+    def prefetch_tiles(
+        self,
+        selected_style: str,
+        bbox: BoundingBox,
+        min_zoom: int,
+        max_zoom: int,
+        concurrency: int = TilePrefetcher.DEFAULT_CONCURRENCY,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> TilePrefetcher:
+        """
+        Starts downloading the tiles of a WGS84 bounding box over a zoom range
+        into the local tile cache.
+
+        Args:
+            selected_style (str): The map style name.
+            bbox (BoundingBox): West, south, east and north bounds.
+            min_zoom (int): First zoom level.
+            max_zoom (int): Last zoom level.
+            concurrency (int): Maximum number of simultaneous downloads.
+            on_progress (Optional[ProgressCallback]): Called with the number of
+                processed and total tiles.
+
+        Returns:
+            TilePrefetcher: The running prefetcher; call wait() to block until
+            it finishes.
+        """
+        prefetcher = TilePrefetcher(
+            self.tile_cache(selected_style), self.tile_url(selected_style), concurrency
+        )
+        prefetcher.on_progress = on_progress
+        prefetcher.start(bbox, min_zoom, max_zoom)
+        return prefetcher
+
+    def add_xyz_tile_layer(
+        self, selected_style: str, offline: Optional[bool] = None
+    ) -> str:
         """
         Adds an XYZ tile layer (raster tile) into the current QGIS project using
         configuration settings.
+
+        In offline mode the layer is read from the local tile cache filled by
+        prefetch_tiles instead of the remote tile server.
+
+        Args:
+            selected_style (str): The map style name.
+            offline (Optional[bool]): Whether to use the local tile cache.
+                Defaults to the tile_offline_mode setting.
         """
+        if offline is None:
+            offline = self.configuration_handler.get_bool_setting(self.KEY_TILE_OFFLINE)
+        timer = Instrumentation.start("maps.layer")
         try:
-            region_value, apikey_value = self.get_configuration_settings()
-            tile_url = (
-                f"https://als.dayjournal.dev/{region_value}/{selected_style}/"
-                f"{{z}}/{{x}}/{{y}}?APIkey={apikey_value}"
-            )
-            layer_url = f"type=xyz&url={tile_url}&zmin=0&zmax=18"
-            xyz_tile_layer = QgsRasterLayer(layer_url, selected_style, "wms")
-            QgsProject.instance().addMapLayer(xyz_tile_layer)
+            if offline:
+                xyz_tile_layer = self.create_cached_tile_layer(selected_style)
+            else:
+                tile_url = self.tile_url(selected_style)
+                layer_url = (
+                    f"type=xyz&url={tile_url}"
+                    f"&zmin={self.MIN_ZOOM}&zmax={self.MAX_ZOOM}"
+                )
+                xyz_tile_layer = QgsRasterLayer(layer_url, selected_style, "wms")
+            timer.lap("layer_create")
+            with timer.phase("layer_add"):
+                QgsProject.instance().addMapLayer(xyz_tile_layer)
+            timer.finish(style=selected_style, offline=offline)
         except KeyError as e:
             raise KeyError(f"Missing configuration for {e!r}") from e
         except Exception as e:
             raise Exception(f"Failed to load XYZ tile layer: {e!r}") from e
+
+    def create_cached_tile_layer(self, selected_style: str) -> QgsRasterLayer:
+        """
+        Opens the local tile cache of a map style as a raster layer.
+
+        Args:
+            selected_style (str): The map style name.
+
+        Returns:
+            QgsRasterLayer: Layer backed by the MBTiles file.
+
+        Raises:
+            FileNotFoundError: If no tiles of the style have been prefetched.
+        """
+        path = self.tile_cache_path(selected_style)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No cached tiles for {selected_style!r}; prefetch an area first"
+            )
+        return QgsRasterLayer(path, f"{selected_style} (offline)", "gdal")
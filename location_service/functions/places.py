@@ -1,8 +1,9 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, ClassVar, Dict, Iterator, List, Optional, Tuple
 
 from PyQt5.QtCore import QVariant
 from PyQt5.QtGui import QColor
 from qgis.core import (
+    QgsCoordinateReferenceSystem,
     QgsFeature,
     QgsField,
     QgsFields,
@@ -16,10 +17,22 @@ from qgis.core import (
     QgsTextFormat,
     QgsVectorLayer,
     QgsVectorLayerSimpleLabeling,
+    QgsWkbTypes,
 )
 
 from ..utils.configuration_handler import ConfigurationHandler
-from ..utils.external_api_handler import ExternalApiHandler
+from ..utils.external_api_handler import (
+    ApiRequest,
+    ErrorCallback,
+    ExternalApiHandler,
+    PendingResponse,
+    SuccessCallback,
+)
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.instrumentation import Instrumentation
+from ..utils.prefix_trie import PrefixTrie
+from ..utils.result_models import PlaceItem
+from ..utils.spatial_memo import SpatialMemoIndex
 
 
 class PlacesFunctions:
@@ -29,10 +42,21 @@ class PlacesFunctions:
 
     KEY_REGION = "region_value"
     KEY_APIKEY = "apikey_value"
+    KEY_MEMO_ENABLED = "memo_enabled"
+    KEY_MEMO_RADIUS = "memo_radius_m"
+    KEY_MEMO_MAX_ENTRIES = "memo_max_entries"
+    KEY_SUGGEST_ENABLED = "suggest_enabled"
     PLACES_LANGUAGE = None
     PLACES_MAX_RESULTS = 10
+    PAGE_MAX_RESULTS = 100
+    PAGE_FIELDS = PlaceItem.FIELDS | {"NextToken"}
+    SUGGEST_MAX_RESULTS = 5
+    SUGGEST_MIN_CHARS = 2
+    SUGGEST_BIAS_DECIMALS = 2
+    SUGGEST_MAX_CONTEXTS = 16
     WGS84_CRS = "EPSG:4326"
     LAYER_TYPE = "Point"
+    LAYER_NAME = "SearchText"
     FIELD_TITLE = "Title"
     FIELD_REGION = "Region"
     FIELD_LOCALITY = "Locality"
@@ -43,6 +67,9 @@ class PlacesFunctions:
     LABEL_TEXT_COLOR = QColor("black")
     LABEL_TEXT_SIZE = 10
 
+    _memo: ClassVar[Optional[SpatialMemoIndex]] = None
+    _suggestions: ClassVar[Dict[str, PrefixTrie]] = {}
+
     def __init__(self) -> None:
         """
         Initializes the PlaceFunctions with configuration and API handlers.
@@ -62,17 +89,21 @@ class PlacesFunctions:
         apikey = self.configuration_handler.get_setting(self.KEY_APIKEY)
         return region, apikey
 
-    def search_text(self, text: str, lon: float, lat: float) -> Dict[str, Any]:
+    def build_search_text_request(
+        self, text: str, lon: float, lat: float, max_results: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        Searches for a places index based on the provided longitude and
-        latitude coordinates.
+        Builds the URL and body of a search-text request.
 
         Args:
-            lon (float): Longitude of the position to search.
-            lat (float): Latitude of the position to search.
+            text (str): The free-form query text.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            max_results (Optional[int]): Result limit. Defaults to
+                PLACES_MAX_RESULTS.
 
         Returns:
-            A dictionary containing the API request results with place information.
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
         """
         region, apikey = self.get_configuration_settings()
         place_url = (
@@ -80,25 +111,467 @@ class PlacesFunctions:
         )
         data = {
             "Language": self.PLACES_LANGUAGE,
-            "MaxResults": self.PLACES_MAX_RESULTS,
+            "MaxResults": max_results or self.PLACES_MAX_RESULTS,
             "QueryText": text,
             "BiasPosition": [lon, lat],
         }
+        return place_url, data
+
+    def build_next_page_request(
+        self, next_token: str, max_results: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of a request for the next page of a
+        search-text query.
+
+        Args:
+            next_token (str): The NextToken of the previous page.
+            max_results (Optional[int]): Result limit of the page. Defaults
+                to PLACES_MAX_RESULTS.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.get_configuration_settings()
+        place_url = (
+            f"https://places.geo.{region}.amazonaws.com/v2/search-text?key={apikey}"
+        )
+        data = {
+            "MaxResults": max_results or self.PLACES_MAX_RESULTS,
+            "NextToken": next_token,
+        }
+        return place_url, data
+
+    def build_area_search_request(
+        self, text: str, bounding_box: List[float], max_results: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of a search-text request limited to a
+        bounding box. The filter replaces the bias position, which the API
+        does not accept together with it.
+
+        Args:
+            text (str): The free-form query text.
+            bounding_box (List[float]): West, south, east and north bounds.
+            max_results (Optional[int]): Result limit. Defaults to
+                PLACES_MAX_RESULTS.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.get_configuration_settings()
+        place_url = (
+            f"https://places.geo.{region}.amazonaws.com/v2/search-text?key={apikey}"
+        )
+        data = {
+            "Language": self.PLACES_LANGUAGE,
+            "MaxResults": max_results or self.PLACES_MAX_RESULTS,
+            "QueryText": text,
+            "Filter": {"BoundingBox": bounding_box},
+        }
+        return place_url, data
+
+    def build_reverse_geocode_request(
+        self, lon: float, lat: float, max_results: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of a reverse-geocode request.
+
+        Args:
+            lon (float): Longitude of the position to look up.
+            lat (float): Latitude of the position to look up.
+            max_results (Optional[int]): Result limit. Defaults to 1.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.get_configuration_settings()
+        place_url = (
+            f"https://places.geo.{region}.amazonaws.com/v2/reverse-geocode"
+            f"?key={apikey}"
+        )
+        data = {
+            "Language": self.PLACES_LANGUAGE,
+            "MaxResults": max_results or 1,
+            "QueryPosition": [lon, lat],
+        }
+        return place_url, data
+
+    def build_suggest_request(
+        self, text: str, lon: float, lat: float
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of a suggest request.
+
+        Args:
+            text (str): The partially typed query text.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.get_configuration_settings()
+        suggest_url = (
+            f"https://places.geo.{region}.amazonaws.com/v2/suggest?key={apikey}"
+        )
+        data = {
+            "Language": self.PLACES_LANGUAGE,
+            "MaxResults": self.SUGGEST_MAX_RESULTS,
+            "QueryText": text,
+            "BiasPosition": [float(lon), float(lat)],
+        }
+        return suggest_url, data
+
+    def suggestion_cache(self, lon: float, lat: float) -> Optional[PrefixTrie]:
+        """
+        Returns the prefix cache of suggestions around a bias position.
+        Positions are rounded so that small moves of the map keep using the
+        same cache.
+
+        Args:
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+
+        Returns:
+            Optional[PrefixTrie]: The cache, or None if suggestions are
+            disabled.
+        """
+        if not self.configuration_handler.get_bool_setting(self.KEY_SUGGEST_ENABLED):
+            return None
+        region, _ = self.get_configuration_settings()
+        context = "|".join(
+            (
+                str(region),
+                str(self.PLACES_LANGUAGE),
+                f"{float(lon):.{self.SUGGEST_BIAS_DECIMALS}f}",
+                f"{float(lat):.{self.SUGGEST_BIAS_DECIMALS}f}",
+            )
+        )
+        caches = PlacesFunctions._suggestions
+        if context not in caches:
+            while len(caches) >= self.SUGGEST_MAX_CONTEXTS:
+                del caches[next(iter(caches))]
+            caches[context] = PrefixTrie()
+        return caches[context]
+
+    @staticmethod
+    def suggestion_title(item: Dict[str, Any]) -> str:
+        """
+        Returns the text shown for a suggestion.
+
+        Args:
+            item (Dict[str, Any]): A result item of a suggest reply.
+
+        Returns:
+            str: The title of the suggestion.
+        """
+        return item.get("Title", "")
+
+    def cached_suggestions(
+        self, text: str, lon: float, lat: float
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Answers a suggest query from the prefix cache.
+
+        Args:
+            text (str): The partially typed query text.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+
+        Returns:
+            Optional[Tuple[List[Dict[str, Any]], bool]]: The suggestions and
+            whether they are final, or None if nothing is cached.
+        """
+        cache = self.suggestion_cache(lon, lat)
+        if cache is None:
+            return None
+        return cache.lookup(
+            text,
+            lambda item, prefix: PrefixTrie.matches_words(
+                self.suggestion_title(item), prefix
+            ),
+        )
+
+    def suggest_async(
+        self,
+        text: str,
+        lon: float,
+        lat: float,
+        on_success: Callable[[List[Dict[str, Any]]], None],
+        on_error: Optional[ErrorCallback] = None,
+    ) -> ApiRequest:
+        """
+        Requests suggestions for partially typed text without blocking the
+        event loop and stores them in the prefix cache.
+
+        Args:
+            text (str): The partially typed query text.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            on_success (Callable[[List[Dict[str, Any]]], None]): Called with
+                the suggestion items.
+            on_error (Optional[ErrorCallback]): Called if the request fails.
+
+        Returns:
+            ApiRequest: A handle that can be used to cancel the request.
+        """
+        suggest_url, data = self.build_suggest_request(text, lon, lat)
+        cache = self.suggestion_cache(lon, lat)
+
+        def remember(result: Dict[str, Any]) -> None:
+            items = result.get("ResultItems", [])
+            if cache is not None:
+                cache.put(text, items, len(items) < self.SUGGEST_MAX_RESULTS)
+            on_success(items)
+
+        return self.api_handler.send_json_post_request_async(
+            suggest_url, data, remember, on_error
+        )
+
+    def spatial_memo(self) -> Optional[SpatialMemoIndex]:
+        """
+        Returns the index of recent search results shared by all instances,
+        rebuilt when its radius or entry limit settings change.
+
+        Returns:
+            Optional[SpatialMemoIndex]: The index, or None if it is disabled.
+        """
+        settings = self.configuration_handler
+        if not settings.get_bool_setting(self.KEY_MEMO_ENABLED):
+            return None
+        radius_m = settings.get_int_setting(self.KEY_MEMO_RADIUS)
+        max_entries = settings.get_int_setting(self.KEY_MEMO_MAX_ENTRIES)
+        memo = PlacesFunctions._memo
+        if (
+            memo is None
+            or memo.radius_m != max(0.1, float(radius_m))
+            or memo.max_entries != max(1, max_entries)
+        ):
+            memo = SpatialMemoIndex(radius_m, max_entries)
+            PlacesFunctions._memo = memo
+        return memo
+
+    def memo_key(self, data: Dict[str, Any]) -> str:
+        """
+        Builds the key under which a search-text response is remembered,
+        covering every part of the request except the bias position.
+
+        Args:
+            data (Dict[str, Any]): The JSON body of the request.
+
+        Returns:
+            str: The key.
+        """
+        region, _ = self.get_configuration_settings()
+        return "|".join(
+            (
+                str(region),
+                str(data.get("Language")),
+                str(data.get("MaxResults")),
+                SpatialMemoIndex.normalize_query(data.get("QueryText", "")),
+            )
+        )
+
+    def search_text(self, text: str, lon: float, lat: float) -> Dict[str, Any]:
+        """
+        Searches for a places index based on the provided longitude and
+        latitude coordinates.
+
+        Args:
+            lon (float): Longitude of the position to search.
+            lat (float): Latitude of the position to search.
+
+        Returns:
+            A dictionary containing the API request results with place information.
+        """
+        place_url, data = self.build_search_text_request(text, lon, lat)
+        memo = self.spatial_memo()
+        memo_key = self.memo_key(data)
+        if memo is not None:
+            remembered = memo.lookup(memo_key, lon, lat)
+            if remembered is not None:
+                return remembered
         result = self.api_handler.send_json_post_request(place_url, data)
         if result is None:
             raise Exception("Failed to receive a valid response from the API.")
+        if memo is not None:
+            memo.put(memo_key, lon, lat, result)
         return result
 
-    def add_point_layer(self, data: Dict) -> None:
+    def search_text_async(
+        self,
+        text: str,
+        lon: float,
+        lat: float,
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> ApiRequest:
+        """
+        Searches for places without blocking the event loop.
+
+        Args:
+            text (str): The free-form query text.
+            lon (float): Longitude of the position to search.
+            lat (float): Latitude of the position to search.
+            on_success (SuccessCallback): Called with the search results.
+            on_error (Optional[ErrorCallback]): Called if the request fails.
+
+        Returns:
+            ApiRequest: A handle that can be used to cancel the search.
+        """
+        place_url, data = self.build_search_text_request(text, lon, lat)
+        memo = self.spatial_memo()
+        if memo is None:
+            return self.api_handler.send_json_post_request_async(
+                place_url, data, on_success, on_error
+            )
+        memo_key = self.memo_key(data)
+        remembered = memo.lookup(memo_key, lon, lat)
+        if remembered is not None:
+            return self.api_handler.deliver_async(
+                place_url, data, remembered, on_success, on_error
+            )
+
+        def remember(result: Dict[str, Any]) -> None:
+            memo.put(memo_key, lon, lat, result)
+            on_success(result)
+
+        return self.api_handler.send_json_post_request_async(
+            place_url, data, remember, on_error
+        )
+
+    def iter_search_text(
+        self,
+        text: str,
+        lon: float,
+        lat: float,
+        page_size: int = PLACES_MAX_RESULTS,
+        max_results: Optional[int] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[PlaceItem]:
+        """
+        Lazily yields every result of a search, following NextToken across
+        pages. The next page is requested as soon as a page arrives, so it
+        downloads while the caller consumes the current one. Closing the
+        generator early cancels the prefetched request.
+
+        Pages carry tokens that expire, so they bypass the response cache.
+
+        Args:
+            text (str): The free-form query text.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            page_size (int): Results per request, up to PAGE_MAX_RESULTS.
+            max_results (Optional[int]): Total number of results to yield, or
+                None for every page the API returns.
+            is_cancelled (Optional[Callable[[], bool]]): Polled while waiting
+                for a page. Iteration stops once it returns True.
+
+        Yields:
+            PlaceItem: One result at a time, in API order.
+        """
+        page_size = max(1, min(page_size, self.PAGE_MAX_RESULTS))
+        remaining = max_results
+
+        def next_size() -> int:
+            return page_size if remaining is None else min(page_size, remaining)
+
+        if remaining is not None and remaining <= 0:
+            return
+        url, data = self.build_search_text_request(text, lon, lat, next_size())
+        pending: Optional[PendingResponse] = PendingResponse(
+            self.api_handler, url, data, use_cache=False, fields=self.PAGE_FIELDS
+        )
+        try:
+            while pending is not None:
+                page = pending.result(is_cancelled)
+                pending = None
+                if page is None:
+                    return
+                items = page.get("ResultItems") or []
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+                next_token = page.get("NextToken")
+                if next_token and items and (remaining is None or remaining > 0):
+                    url, data = self.build_next_page_request(next_token, next_size())
+                    pending = PendingResponse(
+                        self.api_handler,
+                        url,
+                        data,
+                        use_cache=False,
+                        fields=self.PAGE_FIELDS,
+                    )
+                for item in items:
+                    yield PlaceItem.from_item(item)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def iter_search_text_features(
+        self,
+        fields: QgsFields,
+        text: str,
+        lon: float,
+        lat: float,
+        page_size: int = PLACES_MAX_RESULTS,
+        max_results: Optional[int] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[QgsFeature]:
+        """
+        Lazily yields a point feature for every result of a paginated
+        search. See iter_search_text for the arguments.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                four must follow the schema created by add_attributes.
+
+        Yields:
+            QgsFeature: One feature per result.
+        """
+        for item in self.iter_search_text(
+            text, lon, lat, page_size, max_results, is_cancelled
+        ):
+            yield self.place_feature(fields, item)
+
+    def add_point_layer(self, data: Dict, output_path: Optional[str] = None) -> None:
         """
         Adds a new point layer to the current QGIS project based on search results.
 
         Args:
             data (Dict): Data containing results from the search, including
                          location and place information.
+            output_path (Optional[str]): GeoPackage (.gpkg) or FlatGeobuf
+                (.fgb) file to write instead of a memory layer.
         """
+        if output_path:
+            fields = self.create_fields()
+            writer = StreamingFeatureWriter.for_file(
+                output_path,
+                self.LAYER_NAME,
+                fields,
+                QgsWkbTypes.Point,
+                QgsCoordinateReferenceSystem(self.WGS84_CRS),
+            )
+            timer = Instrumentation.start("places.layer")
+            # GeoPackage output is already open as a layer, so it is shown
+            # first and fills in as the chunks are written. FlatGeobuf can
+            # only be opened once the file is complete.
+            opened = writer.layer is not None
+            if opened:
+                with timer.phase("layer_add"):
+                    self.show_layer(writer.layer)
+            with timer.phase("feature_build"):
+                writer.add_features(self.iter_features(fields, data))
+                layer = writer.close()
+            if not opened:
+                with timer.phase("layer_add"):
+                    self.show_layer(layer)
+            timer.finish(features=writer.features_written, output="file")
+            return
         layer = QgsVectorLayer(
-            f"{self.LAYER_TYPE}?crs={self.WGS84_CRS}", "SearchText", "memory"
+            f"{self.LAYER_TYPE}?crs={self.WGS84_CRS}", self.LAYER_NAME, "memory"
         )
         self.setup_layer(layer, data)
 
@@ -111,12 +584,35 @@ class PlacesFunctions:
             layer (QgsVectorLayer): The vector layer to be configured.
             data (Dict): Search results data used to populate the layer.
         """
-        self.add_attributes(layer)
-        self.add_features(layer, data)
+        timer = Instrumentation.start("places.layer")
+        with timer.phase("feature_build"):
+            self.add_attributes(layer)
+            self.add_features(layer, data)
+        with timer.phase("layer_add"):
+            self.show_layer(layer)
+        timer.finish(features=layer.featureCount(), output="memory")
+
+    def show_layer(self, layer: QgsVectorLayer) -> None:
+        """
+        Styles and labels a populated layer and adds it to the project.
+
+        Args:
+            layer (QgsVectorLayer): The layer to show.
+        """
+        self.style_layer(layer)
+        QgsProject.instance().addMapLayer(layer)
+
+    def style_layer(self, layer: QgsVectorLayer) -> None:
+        """
+        Applies the symbol and labels to a layer without adding it to the
+        project, so that it can be done off the GUI thread.
+
+        Args:
+            layer (QgsVectorLayer): The layer to style.
+        """
         self.apply_layer_style(layer)
         self.apply_label_style(layer)
         layer.triggerRepaint()
-        QgsProject.instance().addMapLayer(layer)
 
     def add_attributes(self, layer: QgsVectorLayer) -> None:
         """
@@ -125,41 +621,87 @@ class PlacesFunctions:
         Args:
             layer (QgsVectorLayer): The layer to which fields are added.
         """
+        layer.dataProvider().addAttributes(self.create_fields())
+        layer.updateFields()
+
+    def create_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of a places layer.
+
+        Returns:
+            QgsFields: The Title, Region, Locality and Label fields.
+        """
         fields = QgsFields()
         fields.append(QgsField(self.FIELD_TITLE, QVariant.String))
         fields.append(QgsField(self.FIELD_REGION, QVariant.String))
         fields.append(QgsField(self.FIELD_LOCALITY, QVariant.String))
         fields.append(QgsField(self.FIELD_LABEL, QVariant.String))
-        layer.dataProvider().addAttributes(fields)
-        layer.updateFields()
+        return fields
 
-    def add_features(self, layer: QgsVectorLayer, data: Dict) -> None:
+    def add_features(
+        self,
+        layer: QgsVectorLayer,
+        data: Dict,
+        chunk_size: int = StreamingFeatureWriter.DEFAULT_CHUNK_SIZE,
+    ) -> None:
         """
         Adds features to the given layer based on search results.
 
         Args:
             layer (QgsVectorLayer): The layer to which features are added.
             data (Dict): The search results containing place information.
+            chunk_size (int): Number of features written per provider call.
         """
-        features = []
-        for result in data.get("ResultItems", []):
-            address = result.get("Address", {})
-            feature = QgsFeature(layer.fields())
-            feature.setGeometry(
-                QgsGeometry.fromPointXY(
-                    QgsPointXY(result["Position"][0], result["Position"][1])
-                )
-            )
-            feature.setAttributes(
-                [
-                    result.get("Title", ""),
-                    address.get("Region", {}).get("Name", ""),
-                    address.get("Locality", ""),
-                    address.get("Label", ""),
-                ]
-            )
-            features.append(feature)
-        layer.dataProvider().addFeatures(features)
+        writer = StreamingFeatureWriter.for_layer(layer, chunk_size)
+        writer.add_features(self.iter_features(layer.fields(), data))
+        writer.flush()
+
+    def build_features(self, fields: QgsFields, data: Dict) -> List[QgsFeature]:
+        """
+        Builds point features from search results.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                four must follow the schema created by add_attributes.
+            data (Dict): The search results containing place information.
+
+        Returns:
+            List[QgsFeature]: One feature per result item.
+        """
+        return list(self.iter_features(fields, data))
+
+    def iter_features(self, fields: QgsFields, data: Dict) -> Iterator[QgsFeature]:
+        """
+        Lazily builds point features from search results.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                four must follow the schema created by add_attributes.
+            data (Dict): The search results containing place information.
+
+        Yields:
+            QgsFeature: One feature per result item.
+        """
+        for item in PlaceItem.from_response(data):
+            yield self.place_feature(fields, item)
+
+    @staticmethod
+    def place_feature(fields: QgsFields, item: PlaceItem) -> QgsFeature:
+        """
+        Builds the point feature of one result.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                four must follow the schema created by add_attributes.
+            item (PlaceItem): The result.
+
+        Returns:
+            QgsFeature: The feature.
+        """
+        feature = QgsFeature(fields)
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(item.lon, item.lat)))
+        feature.setAttributes([item.title, item.region, item.locality, item.label])
+        return feature
 
     def apply_layer_style(self, layer: QgsVectorLayer) -> None:
         """
@@ -0,0 +1,271 @@
+import csv
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PyQt5.QtCore import QVariant
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsField,
+    QgsFields,
+)
+
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.request_pool import PoolJob, RequestPool
+from ..utils.result_models import PlaceItem
+from ..utils.transform_cache import Wgs84Transformer
+from .places import PlacesFunctions
+
+BiasPosition = Optional[Tuple[float, float]]
+BatchQuery = Tuple[int, str, BiasPosition]
+BatchProgressCallback = Callable[[int, int, float], None]
+
+
+class PlacesBatchGeocoder:
+    """
+    Geocodes many query strings concurrently and streams the best match of
+    each into a feature writer, tagged with the id of its input record.
+
+    Queries are read lazily from a feature source or a CSV file and turned
+    into requests only when the pool has a free slot, so large inputs are
+    never held in memory at once.
+    """
+
+    BATCH_MAX_RESULTS = 1
+    FIELD_INPUT_ID = "InputId"
+
+    def __init__(
+        self,
+        places: Optional[PlacesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the batch geocoder.
+
+        Args:
+            places (Optional[PlacesFunctions]): Places backend used to build
+                requests and features. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.places = places or PlacesFunctions()
+        self.pool = RequestPool(self.places.api_handler, concurrency, max_retries)
+        self.errors: List[Tuple[int, str, Exception]] = []
+        self.skipped = 0
+        self._started_at = 0.0
+        self._finished_at: Optional[float] = None
+
+    def create_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of the batch output.
+
+        Returns:
+            QgsFields: The places fields followed by the InputId field, which
+            holds the feature id or CSV row number of each query.
+        """
+        fields = self.places.create_fields()
+        fields.append(QgsField(self.FIELD_INPUT_ID, QVariant.LongLong))
+        return fields
+
+    @staticmethod
+    def queries_from_features(
+        features: Iterable[QgsFeature],
+        crs: QgsCoordinateReferenceSystem,
+        query_field: str,
+        use_geometry_bias: bool = True,
+    ) -> Iterator[BatchQuery]:
+        """
+        Reads query strings from an attribute of features, such as those of
+        a processing feature source.
+
+        Args:
+            features (Iterable[QgsFeature]): The source features.
+            crs (QgsCoordinateReferenceSystem): CRS of the feature geometries.
+            query_field (str): Name of the field holding the query text.
+            use_geometry_bias (bool): Use the feature geometry (its centroid
+                for lines and polygons) as the bias position.
+
+        Yields:
+            BatchQuery: The feature id, the query text and its bias position,
+            if any.
+        """
+        if not use_geometry_bias:
+            for feature in features:
+                text = feature[query_field]
+                if text:
+                    yield feature.id(), str(text), None
+            return
+        for feature, bias in Wgs84Transformer.iter_feature_positions(features, crs):
+            text = feature[query_field]
+            if text:
+                yield feature.id(), str(text), bias
+
+    @staticmethod
+    def queries_from_csv(
+        path: str,
+        query_column: str,
+        lon_column: Optional[str] = None,
+        lat_column: Optional[str] = None,
+    ) -> Iterator[BatchQuery]:
+        """
+        Reads query strings from a CSV column, optionally with bias
+        coordinates from two other columns.
+
+        Args:
+            path (str): Path to the CSV file.
+            query_column (str): Column holding the query text.
+            lon_column (Optional[str]): Column holding the bias longitude.
+            lat_column (Optional[str]): Column holding the bias latitude.
+
+        Yields:
+            BatchQuery: The data row number starting at 1, the query text
+            and its bias position, if any.
+
+        Raises:
+            ValueError: If a column is missing from the header.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as csv_file:
+            reader = csv.DictReader(csv_file)
+            header = reader.fieldnames or []
+            for column in (query_column, lon_column, lat_column):
+                if column and column not in header:
+                    raise ValueError(f"Column {column!r} not found in {path}")
+            for row_number, row in enumerate(reader, 1):
+                text = row.get(query_column)
+                if not text:
+                    continue
+                bias: BiasPosition = None
+                if lon_column and lat_column:
+                    try:
+                        bias = (float(row[lon_column]), float(row[lat_column]))
+                    except (TypeError, ValueError):
+                        bias = None
+                yield row_number, text, bias
+
+    @staticmethod
+    def count_csv_rows(path: str) -> int:
+        """
+        Counts the data rows of a CSV file without keeping them.
+
+        Args:
+            path (str): Path to the CSV file.
+
+        Returns:
+            int: Number of rows after the header.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as csv_file:
+            return max(0, sum(1 for _ in csv.reader(csv_file)) - 1)
+
+    def geocode(
+        self,
+        queries: Iterable[BatchQuery],
+        count: int,
+        default_bias: BiasPosition,
+        writer: StreamingFeatureWriter,
+        on_progress: Optional[BatchProgressCallback] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Starts geocoding the queries. A request is built only when the pool
+        has a free slot, and the best match of every query is written as
+        soon as its reply arrives.
+
+        Args:
+            queries (Iterable[BatchQuery]): Input ids, query texts and
+                optional bias positions, typically a generator.
+            count (int): Number of input records, used for progress. Records
+                without a query or a bias are subtracted once the queries
+                are exhausted.
+            default_bias (BiasPosition): Bias position used for queries
+                without one. Queries without either are skipped, as the API
+                requires a bias for every search.
+            writer (StreamingFeatureWriter): Receives the result features.
+                Its fields must follow the schema of create_fields.
+            on_progress (Optional[BatchProgressCallback]): Called with the
+                finished count, the total and the current rows per second.
+            on_finished (Optional[Callable[[], None]]): Called once every
+                query has finished.
+        """
+        fields = self.create_fields()
+        self.errors = []
+        self.skipped = 0
+        self._started_at = time.monotonic()
+        self._finished_at = None
+
+        def write_result(input_id: int, result: Dict[str, Any]) -> None:
+            writer.add_features(self.iter_features(fields, input_id, result))
+
+        def jobs() -> Iterator[PoolJob]:
+            submitted = 0
+            for input_id, text, bias in queries:
+                position = bias or default_bias
+                if position is None:
+                    self.skipped += 1
+                    continue
+                url, data = self.places.build_search_text_request(
+                    text, position[0], position[1], self.BATCH_MAX_RESULTS
+                )
+                submitted += 1
+                yield PoolJob(
+                    url,
+                    data,
+                    lambda result, input_id=input_id: write_result(input_id, result),
+                    lambda error, input_id=input_id, text=text: self.errors.append(
+                        (input_id, text, error)
+                    ),
+                    PlaceItem.FIELDS,
+                )
+            self.pool.total -= count - submitted
+
+        def report_progress(completed: int, total: int) -> None:
+            if on_progress is not None:
+                on_progress(completed, total, self.rows_per_second())
+
+        def report_finished() -> None:
+            self._finished_at = time.monotonic()
+            if on_finished is not None:
+                on_finished()
+
+        self.pool.on_progress = report_progress
+        self.pool.on_finished = report_finished
+        self.pool.extend(jobs(), count)
+        if self.pool.is_finished():
+            report_finished()
+
+    def iter_features(
+        self, fields: QgsFields, input_id: int, result: Dict[str, Any]
+    ) -> Iterator[QgsFeature]:
+        """
+        Builds the features of one reply, tagged with the input id.
+
+        Args:
+            fields (QgsFields): Fields following create_fields.
+            input_id (int): Feature id or CSV row number of the query.
+            result (Dict[str, Any]): The search results of the query.
+
+        Yields:
+            QgsFeature: One feature per result item.
+        """
+        for feature in self.places.iter_features(fields, result):
+            feature.setAttributes([*feature.attributes(), input_id])
+            yield feature
+
+    def cancel(self) -> None:
+        """
+        Stops the batch. Results received so far stay in the output.
+        """
+        self.pool.cancel()
+
+    def rows_per_second(self) -> float:
+        """
+        Returns the throughput of the batch so far.
+
+        Returns:
+            float: Finished queries per second of wall-clock time.
+        """
+        end = self._finished_at or time.monotonic()
+        elapsed = end - self._started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.pool.completed() / elapsed
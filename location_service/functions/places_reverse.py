@@ -0,0 +1,364 @@
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QVariant
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsField,
+    QgsFields,
+    QgsVectorDataProvider,
+    QgsVectorLayer,
+)
+
+from ..utils.request_pool import RequestPool
+from ..utils.result_models import PlaceItem
+from ..utils.transform_cache import Wgs84Transformer
+from .places import PlacesFunctions
+
+GridKey = Tuple[int, int]
+ReverseProgressCallback = Callable[[int, int, float], None]
+
+
+class GridPoints:
+    """
+    Source features grouped by the grid cell their location snaps to, so
+    that near-identical coordinates are looked up only once.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty grouping.
+        """
+        self.positions: Dict[GridKey, Tuple[float, float]] = {}
+        self.feature_ids: Dict[GridKey, List[int]] = {}
+        self.feature_count = 0
+        self.skipped = 0
+
+    def add(self, key: GridKey, feature_id: int, lon: float, lat: float) -> None:
+        """
+        Adds a feature to its cell. The first position seen in a cell is
+        the one looked up.
+
+        Args:
+            key (GridKey): The grid cell.
+            feature_id (int): Id of the source feature.
+            lon (float): Longitude of the feature.
+            lat (float): Latitude of the feature.
+        """
+        self.positions.setdefault(key, (lon, lat))
+        self.feature_ids.setdefault(key, []).append(feature_id)
+        self.feature_count += 1
+
+    def __len__(self) -> int:
+        """
+        Returns the number of unique lookups.
+        """
+        return len(self.positions)
+
+
+class PlacesReverseGeocoder:
+    """
+    Looks up the address of every point of a layer with the reverse-geocode
+    API. Points are snapped to a grid so that near-identical coordinates
+    share one request, the unique lookups run concurrently and the results
+    are joined back to every source feature.
+    """
+
+    FIELD_PREFIX = "rev_"
+    RESULT_FIELDS = (
+        ("title", QVariant.String),
+        ("label", QVariant.String),
+        ("region", QVariant.String),
+        ("locality", QVariant.String),
+        ("place_id", QVariant.String),
+        ("distance", QVariant.Int),
+    )
+    DEFAULT_GRID_SIZE_M = 10.0
+    DEFAULT_CHUNK_SIZE = 1000
+    METERS_PER_DEGREE = 111320.0
+
+    def __init__(
+        self,
+        places: Optional[PlacesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the reverse geocoder.
+
+        Args:
+            places (Optional[PlacesFunctions]): Places backend used to build
+                requests. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.places = places or PlacesFunctions()
+        self.pool = RequestPool(self.places.api_handler, concurrency, max_retries)
+        self.errors: List[Tuple[Tuple[float, float], Exception]] = []
+        self.updated = 0
+        self.write_error: Optional[str] = None
+        self._pending: Dict[int, Dict[int, Any]] = {}
+        self._started_at = 0.0
+        self._finished_at: Optional[float] = None
+
+    @classmethod
+    def create_fields(cls) -> QgsFields:
+        """
+        Creates the attribute schema appended to the source features.
+
+        Returns:
+            QgsFields: The title, label, region, locality, place id and
+            distance fields.
+        """
+        fields = QgsFields()
+        for name, field_type in cls.RESULT_FIELDS:
+            fields.append(QgsField(f"{cls.FIELD_PREFIX}{name}", field_type))
+        return fields
+
+    @classmethod
+    def result_attributes(cls, result: Dict[str, Any]) -> List[Any]:
+        """
+        Extracts the attribute values of the best match of a reply.
+
+        Args:
+            result (Dict[str, Any]): The reverse-geocode response.
+
+        Returns:
+            List[Any]: Values in the order of create_fields. Every value is
+            None when nothing was found.
+        """
+        items = result.get("ResultItems") or []
+        if not items:
+            return [None] * len(cls.RESULT_FIELDS)
+        item = PlaceItem.from_item(items[0])
+        return [
+            item.title,
+            item.label,
+            item.region,
+            item.locality,
+            item.place_id,
+            item.distance,
+        ]
+
+    @classmethod
+    def snap(cls, lon: float, lat: float, grid_size_m: float) -> GridKey:
+        """
+        Returns the grid cell of a position.
+
+        Args:
+            lon (float): Longitude.
+            lat (float): Latitude.
+            grid_size_m (float): Cell size in meters. Zero or less keeps
+                every distinct position, to about a centimeter.
+
+        Returns:
+            GridKey: Column and row of the cell.
+        """
+        cell = max(grid_size_m, 0.01) / cls.METERS_PER_DEGREE
+        return (math.floor(lon / cell), math.floor(lat / cell))
+
+    @classmethod
+    def group_features(
+        cls,
+        features: Iterable[QgsFeature],
+        crs: QgsCoordinateReferenceSystem,
+        grid_size_m: float = DEFAULT_GRID_SIZE_M,
+    ) -> GridPoints:
+        """
+        Snaps the location of every feature to the grid.
+
+        Args:
+            features (Iterable[QgsFeature]): The source features. Lines and
+                polygons are represented by their centroid.
+            crs (QgsCoordinateReferenceSystem): CRS of the feature geometries.
+            grid_size_m (float): Cell size in meters.
+
+        Returns:
+            GridPoints: The features grouped by cell. Features without a
+            geometry are counted as skipped.
+        """
+        grid = GridPoints()
+        for feature, position in Wgs84Transformer.iter_feature_positions(features, crs):
+            if position is None:
+                grid.skipped += 1
+                continue
+            lon, lat = position
+            grid.add(cls.snap(lon, lat, grid_size_m), feature.id(), lon, lat)
+        return grid
+
+    def submit_lookups(
+        self,
+        grid: GridPoints,
+        on_result: Callable[[GridKey, Dict[str, Any]], None],
+    ) -> int:
+        """
+        Queues one reverse-geocode request per grid cell in the request
+        pool. Failures are collected in errors.
+
+        Args:
+            grid (GridPoints): The features grouped by cell.
+            on_result (Callable[[GridKey, Dict[str, Any]], None]): Called
+                with the cell and the response of each successful lookup.
+
+        Returns:
+            int: Number of queued lookups.
+        """
+        for key, (lon, lat) in grid.positions.items():
+            url, data = self.places.build_reverse_geocode_request(lon, lat)
+            self.pool.submit(
+                url,
+                data,
+                lambda result, key=key: on_result(key, result),
+                lambda error, position=(lon, lat): self.errors.append(
+                    (position, error)
+                ),
+                PlaceItem.FIELDS,
+            )
+        return len(grid)
+
+    def ensure_fields(self, layer: QgsVectorLayer) -> List[int]:
+        """
+        Adds the result fields missing from a layer.
+
+        Args:
+            layer (QgsVectorLayer): The layer to update in place.
+
+        Returns:
+            List[int]: Indices of the result fields in the layer, in the
+            order of create_fields.
+
+        Raises:
+            ValueError: If the provider cannot add or change attributes, or
+                rejected the new fields.
+        """
+        provider = layer.dataProvider()
+        required = (
+            QgsVectorDataProvider.AddAttributes
+            | QgsVectorDataProvider.ChangeAttributeValues
+        )
+        if int(provider.capabilities()) & int(required) != int(required):
+            raise ValueError(
+                f"The layer {layer.name()!r} cannot be updated in place; "
+                "write the results to a new layer instead"
+            )
+        fields = self.create_fields()
+        missing = [
+            field for field in fields if layer.fields().indexOf(field.name()) < 0
+        ]
+        if missing:
+            if not provider.addAttributes(missing):
+                raise ValueError(
+                    f"Could not add the result fields to {layer.name()!r}: "
+                    + "; ".join(provider.errors())
+                )
+            layer.updateFields()
+        return [layer.fields().indexOf(field.name()) for field in fields]
+
+    def geocode_layer(
+        self,
+        layer: QgsVectorLayer,
+        grid_size_m: float = DEFAULT_GRID_SIZE_M,
+        on_progress: Optional[ReverseProgressCallback] = None,
+        on_finished: Optional[Callable[[int], None]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """
+        Starts adding the address of every feature to a layer in place.
+        Attribute values are written in bulk through changeAttributeValues
+        as the replies arrive. If the provider rejects a write, the lookups
+        are cancelled and the reason is kept in write_error.
+
+        Args:
+            layer (QgsVectorLayer): The layer to update. Its provider must
+                support adding attributes and changing attribute values.
+            grid_size_m (float): Points closer than about this distance
+                share one lookup.
+            on_progress (Optional[ReverseProgressCallback]): Called with the
+                finished and total lookups and the lookups per second.
+            on_finished (Optional[Callable[[int], None]]): Called with the
+                number of updated features once every lookup has finished.
+            chunk_size (int): Number of features updated per provider call.
+
+        Returns:
+            int: Number of unique lookups queued.
+
+        Raises:
+            ValueError: If the layer cannot be updated in place.
+        """
+        indices = self.ensure_fields(layer)
+        request = QgsFeatureRequest().setNoAttributes()
+        grid = self.group_features(layer.getFeatures(request), layer.crs(), grid_size_m)
+        self.errors = []
+        self.updated = 0
+        self.write_error = None
+        self._pending = {}
+        self._started_at = time.monotonic()
+        self._finished_at = None
+
+        def write_result(key: GridKey, result: Dict[str, Any]) -> None:
+            values = dict(zip(indices, self.result_attributes(result)))
+            for feature_id in grid.feature_ids.pop(key, []):
+                self._pending[feature_id] = values
+            if len(self._pending) >= chunk_size:
+                self._flush(layer)
+
+        def report_progress(completed: int, total: int) -> None:
+            if on_progress is not None:
+                on_progress(completed, total, self.lookups_per_second())
+
+        def report_finished() -> None:
+            self._finished_at = time.monotonic()
+            self._flush(layer)
+            layer.triggerRepaint()
+            if on_finished is not None:
+                on_finished(self.updated)
+
+        self.pool.on_progress = report_progress
+        self.pool.on_finished = report_finished
+        count = self.submit_lookups(grid, write_result)
+        if count == 0:
+            report_finished()
+        return count
+
+    def _flush(self, layer: QgsVectorLayer) -> None:
+        """
+        Writes the collected attribute values in one provider call.
+
+        Args:
+            layer (QgsVectorLayer): The layer being updated.
+        """
+        if not self._pending or self.write_error is not None:
+            return
+        provider = layer.dataProvider()
+        if not provider.changeAttributeValues(self._pending):
+            self.write_error = (
+                f"Could not update {len(self._pending)} features: "
+                + "; ".join(provider.errors())
+            )
+            self._pending = {}
+            self.pool.cancel()
+            return
+        self.updated += len(self._pending)
+        self._pending = {}
+
+    def cancel(self) -> None:
+        """
+        Stops the lookups. Features updated so far keep their values.
+        """
+        self.pool.cancel()
+
+    def lookups_per_second(self) -> float:
+        """
+        Returns the throughput of the lookups so far.
+
+        Returns:
+            float: Finished lookups per second of wall-clock time.
+        """
+        end = self._finished_at or time.monotonic()
+        elapsed = end - self._started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.pool.completed() / elapsed
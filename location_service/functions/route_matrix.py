@@ -0,0 +1,454 @@
+import math
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from PyQt5.QtCore import QVariant
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsField,
+    QgsFields,
+    QgsVectorLayer,
+)
+
+from ..utils.request_pool import PoolJob, ProgressCallback, RequestPool
+from ..utils.transform_cache import Wgs84Transformer
+from .routes import RoutesFunctions
+
+Coordinate = Tuple[float, float]
+
+
+class RouteMatrix:
+    """
+    A dense origin by destination matrix of route distances and durations.
+
+    Values are kept in flat double arrays indexed row-major by origin, so a
+    matrix of several hundred origins and destinations takes a few megabytes.
+    Cells that could not be routed hold NaN.
+    """
+
+    FIELD_ORIGIN = "OriginId"
+    FIELD_DESTINATION = "DestinationId"
+    FIELD_DISTANCE = "Distance"
+    FIELD_DURATION = "Duration"
+
+    def __init__(
+        self, origin_ids: Sequence[str], destination_ids: Sequence[str]
+    ) -> None:
+        """
+        Allocates the matrix with every cell unset.
+
+        Args:
+            origin_ids (Sequence[str]): Identifiers of the rows.
+            destination_ids (Sequence[str]): Identifiers of the columns.
+        """
+        self.origin_ids = list(origin_ids)
+        self.destination_ids = list(destination_ids)
+        size = len(self.origin_ids) * len(self.destination_ids)
+        self.distances = array("d", [math.nan]) * size
+        self.durations = array("d", [math.nan]) * size
+
+    def index(self, origin: int, destination: int) -> int:
+        """
+        Returns the flat array position of a cell.
+
+        Args:
+            origin (int): Row index.
+            destination (int): Column index.
+
+        Returns:
+            int: Position in the distance and duration arrays.
+        """
+        return origin * len(self.destination_ids) + destination
+
+    def set(
+        self, origin: int, destination: int, distance: float, duration: float
+    ) -> None:
+        """
+        Stores the values of a cell.
+
+        Args:
+            origin (int): Row index.
+            destination (int): Column index.
+            distance (float): Route distance in meters.
+            duration (float): Route duration in seconds.
+        """
+        position = self.index(origin, destination)
+        self.distances[position] = distance
+        self.durations[position] = duration
+
+    def distance(self, origin: int, destination: int) -> float:
+        """
+        Returns the route distance of a cell in meters.
+        """
+        return self.distances[self.index(origin, destination)]
+
+    def duration(self, origin: int, destination: int) -> float:
+        """
+        Returns the route duration of a cell in seconds.
+        """
+        return self.durations[self.index(origin, destination)]
+
+    def create_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of the matrix rows.
+
+        Returns:
+            QgsFields: Origin and destination ids, distance and duration.
+        """
+        fields = QgsFields()
+        fields.append(QgsField(self.FIELD_ORIGIN, QVariant.String))
+        fields.append(QgsField(self.FIELD_DESTINATION, QVariant.String))
+        fields.append(QgsField(self.FIELD_DISTANCE, QVariant.Double))
+        fields.append(QgsField(self.FIELD_DURATION, QVariant.Double))
+        return fields
+
+    def iter_features(self, fields: QgsFields) -> Iterator[QgsFeature]:
+        """
+        Lazily builds one attribute-only feature per cell.
+
+        Args:
+            fields (QgsFields): Fields following the schema of create_fields.
+
+        Yields:
+            QgsFeature: The feature of each origin and destination pair.
+        """
+        for row in self.iter_rows():
+            feature = QgsFeature(fields)
+            feature.setAttributes(list(row))
+            yield feature
+
+    def iter_rows(
+        self,
+    ) -> Iterator[Tuple[str, str, Optional[float], Optional[float]]]:
+        """
+        Iterates over the cells in row-major order.
+
+        Yields:
+            Tuple[str, str, Optional[float], Optional[float]]: Origin id,
+            destination id, distance and duration. Unset values are None.
+        """
+        for origin, origin_id in enumerate(self.origin_ids):
+            for destination, destination_id in enumerate(self.destination_ids):
+                position = self.index(origin, destination)
+                distance = self.distances[position]
+                duration = self.durations[position]
+                yield (
+                    origin_id,
+                    destination_id,
+                    None if math.isnan(distance) else distance,
+                    None if math.isnan(duration) else duration,
+                )
+
+
+class RouteMatrixFunctions:
+    """
+    Computes many-to-many route matrices with route-matrix requests, each
+    covering a tile of up to TILE_SIZE distinct origins and destinations.
+    """
+
+    COORDINATE_PRECISION = 6
+    DEFAULT_REQUESTS_PER_SECOND = 10.0
+    TILE_SIZE = 10
+    RESPONSE_FIELDS = frozenset(("RouteMatrix", "Distance", "Duration", "Error"))
+
+    def __init__(
+        self,
+        routes: Optional[RoutesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the matrix calculator.
+
+        Args:
+            routes (Optional[RoutesFunctions]): Routes backend used to build
+                requests. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            requests_per_second (float): Maximum request start rate.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.routes = routes or RoutesFunctions()
+        self.pool = RequestPool(
+            self.routes.api_handler, concurrency, max_retries, requests_per_second
+        )
+        self.matrix: Optional[RouteMatrix] = None
+        self.errors: List[Exception] = []
+
+    @staticmethod
+    def points_from_layer(
+        layer: QgsVectorLayer, id_field: Optional[str] = None
+    ) -> Tuple[List[str], List[Coordinate]]:
+        """
+        Reads identifiers and WGS84 positions from a point layer.
+
+        Args:
+            layer (QgsVectorLayer): The source layer. Non-point geometries
+                are reduced to their centroid.
+            id_field (Optional[str]): Field used as identifier. Feature ids
+                are used when omitted.
+
+        Returns:
+            Tuple[List[str], List[Coordinate]]: Identifiers and positions.
+        """
+        return RouteMatrixFunctions.points_from_features(
+            layer.getFeatures(), layer.crs(), id_field
+        )
+
+    @staticmethod
+    def points_from_features(
+        features: Iterable[QgsFeature],
+        crs: QgsCoordinateReferenceSystem,
+        id_field: Optional[str] = None,
+    ) -> Tuple[List[str], List[Coordinate]]:
+        """
+        Reads identifiers and WGS84 positions from arbitrary features, such
+        as those of a processing feature source.
+
+        Args:
+            features (Iterable[QgsFeature]): The source features. Non-point
+                geometries are reduced to their centroid.
+            crs (QgsCoordinateReferenceSystem): CRS of the feature geometries.
+            id_field (Optional[str]): Field used as identifier. Feature ids
+                are used when omitted.
+
+        Returns:
+            Tuple[List[str], List[Coordinate]]: Identifiers and positions.
+        """
+        ids: List[str] = []
+        points: List[Coordinate] = []
+        for feature, position in Wgs84Transformer.iter_feature_positions(features, crs):
+            if position is None:
+                continue
+            ids.append(str(feature[id_field] if id_field else feature.id()))
+            points.append(position)
+        return ids, points
+
+    def compute_layers(
+        self,
+        origins_layer: QgsVectorLayer,
+        destinations_layer: QgsVectorLayer,
+        origin_id_field: Optional[str] = None,
+        destination_id_field: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        on_finished: Optional[Callable[[RouteMatrix], None]] = None,
+    ) -> RouteMatrix:
+        """
+        Starts computing the matrix between two point layers.
+
+        Args:
+            origins_layer (QgsVectorLayer): Layer of origin points.
+            destinations_layer (QgsVectorLayer): Layer of destination points.
+            origin_id_field (Optional[str]): Identifier field of the origins.
+            destination_id_field (Optional[str]): Identifier field of the
+                destinations.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts.
+            on_finished (Optional[Callable[[RouteMatrix], None]]): Called with
+                the completed matrix.
+
+        Returns:
+            RouteMatrix: The matrix, filled in as replies arrive.
+        """
+        origin_ids, origins = self.points_from_layer(origins_layer, origin_id_field)
+        destination_ids, destinations = self.points_from_layer(
+            destinations_layer, destination_id_field
+        )
+        return self.compute(
+            origin_ids,
+            origins,
+            destination_ids,
+            destinations,
+            on_progress,
+            on_finished,
+        )
+
+    def compute(
+        self,
+        origin_ids: Sequence[str],
+        origins: Sequence[Coordinate],
+        destination_ids: Sequence[str],
+        destinations: Sequence[Coordinate],
+        on_progress: Optional[ProgressCallback] = None,
+        on_finished: Optional[Callable[[RouteMatrix], None]] = None,
+    ) -> RouteMatrix:
+        """
+        Starts computing the matrix between two lists of positions.
+
+        Positions are rounded to COORDINATE_PRECISION and grouped, so each
+        distinct position is sent once and its results fanned out to every
+        matching cell. The distinct origins and destinations are split into
+        tiles of TILE_SIZE, with one route-matrix request per pair of tiles.
+        Pairs with the same origin and destination are set to zero.
+
+        Args:
+            origin_ids (Sequence[str]): Identifiers of the origins.
+            origins (Sequence[Coordinate]): Origin longitude/latitude pairs.
+            destination_ids (Sequence[str]): Identifiers of the destinations.
+            destinations (Sequence[Coordinate]): Destination longitude/latitude
+                pairs.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts.
+            on_finished (Optional[Callable[[RouteMatrix], None]]): Called with
+                the completed matrix.
+
+        Returns:
+            RouteMatrix: The matrix, filled in as replies arrive.
+        """
+        matrix = RouteMatrix(origin_ids, destination_ids)
+        self.matrix = matrix
+        self.errors = []
+        origin_groups = self._group_positions(origins)
+        destination_groups = self._group_positions(destinations)
+        for position, origin_indices in origin_groups.items():
+            destination_indices = destination_groups.get(position)
+            if destination_indices is not None:
+                self._fill_cells(matrix, origin_indices, destination_indices, 0.0, 0.0)
+        tile = self.TILE_SIZE
+        request_count = math.ceil(len(origin_groups) / tile) * math.ceil(
+            len(destination_groups) / tile
+        )
+        self.pool.on_progress = on_progress
+        self.pool.on_finished = (
+            (lambda: on_finished(matrix)) if on_finished is not None else None
+        )
+        self.pool.extend(
+            self._iter_jobs(
+                matrix, list(origin_groups.items()), list(destination_groups.items())
+            ),
+            request_count,
+        )
+        if request_count == 0 and on_finished is not None:
+            on_finished(matrix)
+        return matrix
+
+    def cancel(self) -> None:
+        """
+        Stops the computation. Cells not yet received stay NaN.
+        """
+        self.pool.cancel()
+
+    def _group_positions(
+        self, positions: Sequence[Coordinate]
+    ) -> Dict[Coordinate, List[int]]:
+        """
+        Groups position indices by their rounded coordinates.
+
+        Args:
+            positions (Sequence[Coordinate]): Longitude/latitude pairs.
+
+        Returns:
+            Dict[Coordinate, List[int]]: Indices sharing each rounded position.
+        """
+        groups: Dict[Coordinate, List[int]] = {}
+        for index, (lon, lat) in enumerate(positions):
+            key = (
+                round(lon, self.COORDINATE_PRECISION),
+                round(lat, self.COORDINATE_PRECISION),
+            )
+            groups.setdefault(key, []).append(index)
+        return groups
+
+    def _iter_jobs(
+        self,
+        matrix: RouteMatrix,
+        origin_groups: List[Tuple[Coordinate, List[int]]],
+        destination_groups: List[Tuple[Coordinate, List[int]]],
+    ) -> Iterator[PoolJob]:
+        """
+        Lazily yields one route-matrix job per pair of tiles.
+
+        Args:
+            matrix (RouteMatrix): The matrix receiving the results.
+            origin_groups (List[Tuple[Coordinate, List[int]]]): Distinct
+                origins and the rows sharing each of them.
+            destination_groups (List[Tuple[Coordinate, List[int]]]): Distinct
+                destinations and the columns sharing each of them.
+
+        Yields:
+            PoolJob: A route-matrix request for one tile.
+        """
+        tile = self.TILE_SIZE
+        for row in range(0, len(origin_groups), tile):
+            origin_tile = origin_groups[row : row + tile]
+            for column in range(0, len(destination_groups), tile):
+                destination_tile = destination_groups[column : column + tile]
+                url, data = self.routes.build_route_matrix_request(
+                    [position for position, _ in origin_tile],
+                    [position for position, _ in destination_tile],
+                )
+                yield PoolJob(
+                    url,
+                    data,
+                    lambda result, o=origin_tile, d=destination_tile: (
+                        self._on_tile(matrix, o, d, result)
+                    ),
+                    self.errors.append,
+                    self.RESPONSE_FIELDS,
+                )
+
+    def _on_tile(
+        self,
+        matrix: RouteMatrix,
+        origin_tile: List[Tuple[Coordinate, List[int]]],
+        destination_tile: List[Tuple[Coordinate, List[int]]],
+        result: Dict[str, Any],
+    ) -> None:
+        """
+        Copies the cells of one route-matrix reply into every cell of the
+        matching origin and destination groups. Cells the service could not
+        route stay NaN.
+
+        Args:
+            matrix (RouteMatrix): The matrix receiving the results.
+            origin_tile (List[Tuple[Coordinate, List[int]]]): The origins of
+                the request.
+            destination_tile (List[Tuple[Coordinate, List[int]]]): The
+                destinations of the request.
+            result (Dict[str, Any]): The route-matrix response.
+        """
+        for (origin, origin_indices), cells in zip(
+            origin_tile, result.get("RouteMatrix", [])
+        ):
+            for (destination, destination_indices), cell in zip(
+                destination_tile, cells
+            ):
+                if origin == destination or cell.get("Error"):
+                    continue
+                distance = cell.get("Distance")
+                duration = cell.get("Duration")
+                if distance is None or duration is None:
+                    continue
+                self._fill_cells(
+                    matrix,
+                    origin_indices,
+                    destination_indices,
+                    float(distance),
+                    float(duration),
+                )
+
+    @staticmethod
+    def _fill_cells(
+        matrix: RouteMatrix,
+        origin_indices: List[int],
+        destination_indices: List[int],
+        distance: float,
+        duration: float,
+    ) -> None:
+        """
+        Stores one value pair in every combination of rows and columns.
+        """
+        for origin in origin_indices:
+            for destination in destination_indices:
+                matrix.set(origin, destination, distance, duration)
@@ -0,0 +1,439 @@
+import math
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QVariant
+from qgis.core import QgsFeature, QgsField, QgsFields, QgsGeometry
+
+from ..utils.geometry_codec import linestring_wkb
+from ..utils.request_pool import ProgressCallback, RequestPool
+from ..utils.result_models import RouteLeg
+from ..utils.spatial_memo import SpatialMemoIndex
+from ..utils.stop_order import nearest_neighbour_order, two_opt
+from .route_matrix import Coordinate, RouteMatrix, RouteMatrixFunctions
+from .routes import RoutesFunctions
+
+Chunk = Tuple[int, int]
+MatrixKey = Tuple[Coordinate, ...]
+
+
+def plan_chunks(stop_count: int, max_waypoints: int) -> List[Chunk]:
+    """
+    Splits a list of stops into consecutive routes that each fit in one
+    request. Neighbouring chunks share their boundary stop, so the chunk
+    routes join into one continuous route.
+
+    Args:
+        stop_count (int): Number of stops, including the origin and the
+            final destination.
+        max_waypoints (int): Intermediate stops allowed per request.
+
+    Returns:
+        List[Chunk]: First and last stop index of each chunk, inclusive.
+    """
+    step = max(1, max_waypoints + 1)
+    return [
+        (first, min(first + step, stop_count - 1))
+        for first in range(0, stop_count - 1, step)
+    ]
+
+
+class StitchedRoute:
+    """
+    One continuous route assembled from the routes of consecutive chunks.
+    """
+
+    def __init__(self, order: List[int]) -> None:
+        """
+        Initializes an empty route.
+
+        Args:
+            order (List[int]): Stop indices in visiting order.
+        """
+        self.order = order
+        self.coordinates = array("d")
+        self.distance = 0.0
+        self.duration = 0.0
+        self.legs = 0
+        self.missing_chunks: List[int] = []
+
+    @property
+    def complete(self) -> bool:
+        """
+        Returns whether every chunk was routed.
+        """
+        return not self.missing_chunks
+
+    def append_leg(self, flat: array) -> None:
+        """
+        Appends the vertices of a leg, dropping the first vertex when it
+        repeats the current end of the route.
+
+        Args:
+            flat (array): Interleaved longitude and latitude values.
+        """
+        if len(flat) < 2:
+            return
+        if (
+            len(self.coordinates) >= 2
+            and self.coordinates[-2] == flat[0]
+            and self.coordinates[-1] == flat[1]
+        ):
+            flat = flat[2:]
+        self.coordinates.extend(flat)
+        self.legs += 1
+
+    def geometry(self) -> QgsGeometry:
+        """
+        Returns the route as a single line string.
+
+        Returns:
+            QgsGeometry: The stitched line.
+        """
+        geometry = QgsGeometry()
+        geometry.fromWkb(linestring_wkb(self.coordinates))
+        return geometry
+
+
+class RoutePlanner:
+    """
+    Routes through many stops by splitting them into request-sized chunks
+    calculated in parallel, and optionally reorders the stops locally with
+    a nearest-neighbour tour improved by 2-opt.
+
+    The stop order is optimized on a duration matrix fetched with tiled
+    route-matrix requests. Matrices are kept in memory per stop list, so
+    reordering the same stops again needs no matrix requests.
+    """
+
+    MATRIX_TILE_SIZE = RouteMatrixFunctions.TILE_SIZE
+    MATRIX_CACHE_SIZE = 8
+    FALLBACK_SPEED_MPS = 10.0
+    FIELD_ORDER = "StopOrder"
+    FIELD_STOPS = "Stops"
+    FIELD_DISTANCE = "Distance"
+    FIELD_DURATION = "Duration"
+    FIELD_COMPLETE = "Complete"
+
+    _matrix_cache: ClassVar["OrderedDict[MatrixKey, RouteMatrix]"] = OrderedDict()
+
+    def __init__(
+        self,
+        routes: Optional[RoutesFunctions] = None,
+        concurrency: int = RequestPool.DEFAULT_CONCURRENCY,
+        max_retries: int = RequestPool.DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Initializes the planner.
+
+        Args:
+            routes (Optional[RoutesFunctions]): Routes backend used to build
+                requests. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+        """
+        self.routes = routes or RoutesFunctions()
+        self.pool = RequestPool(self.routes.api_handler, concurrency, max_retries)
+        self.errors: List[Exception] = []
+        self.matrix: Optional[RouteMatrix] = None
+        self._matrix_key: Optional[MatrixKey] = None
+        self._chunk_results: Dict[int, Dict[str, Any]] = {}
+        self._chunks: List[Chunk] = []
+        self._order: List[int] = []
+
+    @classmethod
+    def matrix_key(cls, stops: Sequence[Coordinate]) -> MatrixKey:
+        """
+        Returns the cache key of the duration matrix of a stop list.
+
+        Args:
+            stops (Sequence[Coordinate]): Stop positions.
+
+        Returns:
+            MatrixKey: The rounded positions.
+        """
+        return tuple((round(lon, 6), round(lat, 6)) for lon, lat in stops)
+
+    def start_matrix(
+        self,
+        stops: Sequence[Coordinate],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """
+        Starts fetching the duration matrix between every pair of stops,
+        one route-matrix request per tile of MATRIX_TILE_SIZE origins and
+        destinations. A cached matrix of the same stops is reused. Call
+        finish_matrix once the pool has finished to cache the new matrix.
+
+        Args:
+            stops (Sequence[Coordinate]): Stop positions.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts.
+
+        Returns:
+            int: Number of queued requests, zero when the matrix was cached.
+        """
+        key = self.matrix_key(stops)
+        cached = RoutePlanner._matrix_cache.get(key)
+        if cached is not None:
+            RoutePlanner._matrix_cache.move_to_end(key)
+            self.matrix = cached
+            return 0
+        ids = [str(index) for index in range(len(stops))]
+        matrix = RouteMatrix(ids, ids)
+        for index in range(len(stops)):
+            matrix.set(index, index, 0.0, 0.0)
+        self.matrix = matrix
+        self._matrix_key = key
+        self.errors = []
+        self.pool.on_progress = on_progress
+        tile = self.MATRIX_TILE_SIZE
+        count = 0
+        for row in range(0, len(stops), tile):
+            for column in range(0, len(stops), tile):
+                url, data = self.routes.build_route_matrix_request(
+                    stops[row : row + tile], stops[column : column + tile]
+                )
+                self.pool.submit(
+                    url,
+                    data,
+                    lambda result, row=row, column=column: self._on_matrix_tile(
+                        matrix, row, column, result
+                    ),
+                    self.errors.append,
+                )
+                count += 1
+        return count
+
+    def finish_matrix(self) -> None:
+        """
+        Caches the matrix fetched by start_matrix if every tile request
+        succeeded. A matrix with failed or cancelled tiles is not kept, so
+        the next plan of the same stops fetches it again.
+        """
+        key, self._matrix_key = self._matrix_key, None
+        if key is None or self.matrix is None:
+            return
+        if self.errors or self.pool.completed() < self.pool.total:
+            RoutePlanner._matrix_cache.pop(key, None)
+            return
+        RoutePlanner._matrix_cache[key] = self.matrix
+        RoutePlanner._matrix_cache.move_to_end(key)
+        while len(RoutePlanner._matrix_cache) > self.MATRIX_CACHE_SIZE:
+            RoutePlanner._matrix_cache.popitem(last=False)
+
+    @staticmethod
+    def _on_matrix_tile(
+        matrix: RouteMatrix, row: int, column: int, result: Dict[str, Any]
+    ) -> None:
+        """
+        Copies the cells of one route-matrix reply into the matrix.
+
+        Args:
+            matrix (RouteMatrix): The matrix receiving the values.
+            row (int): Index of the first origin of the tile.
+            column (int): Index of the first destination of the tile.
+            result (Dict[str, Any]): The route-matrix response.
+        """
+        for origin, cells in enumerate(result.get("RouteMatrix", [])):
+            for destination, cell in enumerate(cells):
+                if cell.get("Error") or "Duration" not in cell:
+                    continue
+                matrix.set(
+                    row + origin,
+                    column + destination,
+                    float(cell.get("Distance", math.nan)),
+                    float(cell["Duration"]),
+                )
+
+    def optimize_order(
+        self, stops: Sequence[Coordinate], fixed_end: bool = False
+    ) -> List[int]:
+        """
+        Orders the stops to shorten the total duration, keeping the first
+        stop first. Pairs missing from the matrix are estimated from the
+        straight-line distance.
+
+        Args:
+            stops (Sequence[Coordinate]): Stop positions.
+            fixed_end (bool): Keep the last stop last.
+
+        Returns:
+            List[int]: Stop indices in visiting order.
+        """
+        matrix = self.matrix
+        durations: Dict[Tuple[int, int], float] = {}
+
+        def cost(origin: int, destination: int) -> float:
+            pair = (origin, destination)
+            value = durations.get(pair)
+            if value is None:
+                value = math.nan
+                if matrix is not None:
+                    value = matrix.duration(origin, destination)
+                if math.isnan(value):
+                    (lon1, lat1), (lon2, lat2) = stops[origin], stops[destination]
+                    value = (
+                        SpatialMemoIndex.distance_m(lon1, lat1, lon2, lat2)
+                        / self.FALLBACK_SPEED_MPS
+                    )
+                durations[pair] = value
+            return value
+
+        count = len(stops)
+        end = count - 1 if fixed_end and count > 1 else None
+        order = nearest_neighbour_order(count, cost, 0, end)
+        return two_opt(order, cost, fixed_end)
+
+    def start_routes(
+        self,
+        stops: Sequence[Coordinate],
+        order: Optional[Sequence[int]] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """
+        Starts calculating the route through the stops in the given order,
+        one request per chunk of up to MAX_WAYPOINTS intermediate stops.
+
+        Args:
+            stops (Sequence[Coordinate]): Stop positions.
+            order (Optional[Sequence[int]]): Visiting order. Defaults to the
+                order of the stops.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts.
+
+        Returns:
+            int: Number of queued requests.
+        """
+        self._order = list(order) if order is not None else list(range(len(stops)))
+        self._chunks = plan_chunks(len(self._order), self.routes.MAX_WAYPOINTS)
+        self._chunk_results = {}
+        self.errors = []
+        self.pool.on_progress = on_progress
+        for index, (first, last) in enumerate(self._chunks):
+            positions = [stops[stop] for stop in self._order[first : last + 1]]
+            (st_lon, st_lat), (ed_lon, ed_lat) = positions[0], positions[-1]
+            url, data = self.routes.build_routes_request(
+                st_lon, st_lat, ed_lon, ed_lat, positions[1:-1]
+            )
+            self.pool.submit(
+                url,
+                data,
+                lambda result, index=index: self._chunk_results.__setitem__(
+                    index, result
+                ),
+                self.errors.append,
+                RouteLeg.FIELDS,
+            )
+        return len(self._chunks)
+
+    def stitch(self) -> StitchedRoute:
+        """
+        Joins the legs of the chunk routes received so far in stop order.
+
+        Returns:
+            StitchedRoute: The continuous route. Chunks that failed are
+            listed in missing_chunks.
+        """
+        route = StitchedRoute(self._order)
+        for index in range(len(self._chunks)):
+            result = self._chunk_results.get(index)
+            routes = result.get("Routes", []) if result else []
+            if not routes:
+                route.missing_chunks.append(index)
+                continue
+            summary = routes[0].get("Summary", {})
+            route.distance += float(summary.get("Distance", 0.0))
+            route.duration += float(summary.get("Duration", 0.0))
+            for leg in routes[0].get("Legs", []):
+                route.append_leg(RoutesFunctions.leg_coordinates(leg))
+        return route
+
+    def plan(
+        self,
+        stops: Sequence[Coordinate],
+        on_finished: Callable[[StitchedRoute], None],
+        optimize: bool = False,
+        fixed_end: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Starts routing through the stops without blocking, optionally
+        reordering them first.
+
+        Args:
+            stops (Sequence[Coordinate]): Stop positions. The first one is
+                the origin.
+            on_finished (Callable[[StitchedRoute], None]): Called with the
+                stitched route.
+            optimize (bool): Reorder the stops to shorten the route.
+            fixed_end (bool): Keep the last stop last when reordering.
+            on_progress (Optional[ProgressCallback]): Called with the finished
+                and total request counts of the current phase.
+        """
+
+        def route_stops() -> None:
+            self.finish_matrix()
+            order = self.optimize_order(stops, fixed_end) if optimize else None
+            self.pool.on_finished = lambda: on_finished(self.stitch())
+            if self.start_routes(stops, order, on_progress) == 0:
+                on_finished(self.stitch())
+
+        if not optimize:
+            route_stops()
+            return
+        self.pool.on_finished = route_stops
+        if self.start_matrix(stops, on_progress) == 0:
+            route_stops()
+
+    def cancel(self) -> None:
+        """
+        Stops the requests in flight.
+        """
+        self.pool.cancel()
+
+    @classmethod
+    def create_fields(cls) -> QgsFields:
+        """
+        Creates the attribute schema of a planned route.
+
+        Returns:
+            QgsFields: Stop order, stop count, distance, duration and
+            completeness fields.
+        """
+        fields = QgsFields()
+        fields.append(QgsField(cls.FIELD_ORDER, QVariant.String))
+        fields.append(QgsField(cls.FIELD_STOPS, QVariant.Int))
+        fields.append(QgsField(cls.FIELD_DISTANCE, QVariant.Double))
+        fields.append(QgsField(cls.FIELD_DURATION, QVariant.Double))
+        fields.append(QgsField(cls.FIELD_COMPLETE, QVariant.Bool))
+        return fields
+
+    @staticmethod
+    def build_feature(
+        fields: QgsFields, route: StitchedRoute, stop_ids: Sequence[str]
+    ) -> QgsFeature:
+        """
+        Builds the line feature of a planned route.
+
+        Args:
+            fields (QgsFields): Fields following the schema of create_fields.
+            route (StitchedRoute): The stitched route.
+            stop_ids (Sequence[str]): Identifiers of the stops.
+
+        Returns:
+            QgsFeature: The route feature.
+        """
+        feature = QgsFeature(fields)
+        feature.setGeometry(route.geometry())
+        feature.setAttributes(
+            [
+                ",".join(stop_ids[stop] for stop in route.order),
+                len(route.order),
+                route.distance,
+                route.duration,
+                route.complete,
+            ]
+        )
+        return feature
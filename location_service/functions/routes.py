@@ -1,22 +1,33 @@
-from typing import Any, Dict, Tuple
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from PyQt5.QtCore import QVariant
 from PyQt5.QtGui import QColor
 from qgis.core import (
+    QgsCoordinateReferenceSystem,
     QgsFeature,
     QgsField,
     QgsFields,
     QgsGeometry,
-    QgsPointXY,
     QgsProject,
     QgsSimpleLineSymbolLayer,
     QgsSingleSymbolRenderer,
     QgsSymbol,
     QgsVectorLayer,
+    QgsWkbTypes,
 )
 
 from ..utils.configuration_handler import ConfigurationHandler
-from ..utils.external_api_handler import ExternalApiHandler
+from ..utils.external_api_handler import (
+    ApiRequest,
+    ErrorCallback,
+    ExternalApiHandler,
+    SuccessCallback,
+)
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.geometry_codec import linestring_wkb
+from ..utils.instrumentation import Instrumentation
+from ..utils.result_models import RouteLeg
 
 
 class RoutesFunctions:
@@ -28,9 +39,12 @@ class RoutesFunctions:
     KEY_APIKEY = "apikey_value"
     WGS84_CRS = "EPSG:4326"
     LAYER_TYPE = "LineString"
+    LAYER_NAME = "CalculateRoutes"
     FIELD_ROADNAME = "RoadName"
     LINE_COLOR = QColor(255, 0, 0)
     LINE_WIDTH = 2.0
+    LEG_GEOMETRY_FORMAT = "FlexiblePolyline"
+    MAX_WAYPOINTS = 23
 
     def __init__(self) -> None:
         """
@@ -51,42 +65,161 @@ class RoutesFunctions:
         apikey = self.configuration_handler.get_setting(self.KEY_APIKEY)
         return region, apikey
 
-    def calculate_routes(
-        self, st_lon: float, st_lat: float, ed_lon: float, ed_lat: float
-    ) -> Dict[str, Any]:
+    def build_routes_request(
+        self,
+        st_lon: float,
+        st_lat: float,
+        ed_lon: float,
+        ed_lat: float,
+        waypoints: Optional[Sequence[Tuple[float, float]]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        Calculates a route from start to end coordinates using an external API.
+        Builds the URL and body of a routes request.
 
         Args:
             st_lon (float): Longitude of the start position.
             st_lat (float): Latitude of the start position.
             ed_lon (float): Longitude of the end position.
             ed_lat (float): Latitude of the end position.
+            waypoints (Optional[Sequence[Tuple[float, float]]]): Longitude and
+                latitude of intermediate stops, at most MAX_WAYPOINTS.
 
         Returns:
-            A dictionary containing the calculated route data.
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+
+        Raises:
+            ValueError: If there are more than MAX_WAYPOINTS waypoints.
         """
         region, apikey = self.get_configuration_settings()
         routes_url = f"https://routes.geo.{region}.amazonaws.com/v2/routes?key={apikey}"
-        data = {
+        data: Dict[str, Any] = {
             "Origin": [st_lon, st_lat],
             "Destination": [ed_lon, ed_lat],
-            "LegGeometryFormat": "Simple",
+            "LegGeometryFormat": self.LEG_GEOMETRY_FORMAT,
+        }
+        if waypoints:
+            if len(waypoints) > self.MAX_WAYPOINTS:
+                raise ValueError(
+                    f"A route can have at most {self.MAX_WAYPOINTS} waypoints."
+                )
+            data["Waypoints"] = [{"Position": [lon, lat]} for lon, lat in waypoints]
+        return routes_url, data
+
+    def build_route_matrix_request(
+        self,
+        origins: Sequence[Tuple[float, float]],
+        destinations: Sequence[Tuple[float, float]],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and body of a route-matrix request, which returns the
+        distance and duration between every origin and destination.
+
+        Args:
+            origins (Sequence[Tuple[float, float]]): Origin positions.
+            destinations (Sequence[Tuple[float, float]]): Destination
+                positions.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and JSON body.
+        """
+        region, apikey = self.get_configuration_settings()
+        matrix_url = (
+            f"https://routes.geo.{region}.amazonaws.com/v2/route-matrix?key={apikey}"
+        )
+        data = {
+            "Origins": [{"Position": [lon, lat]} for lon, lat in origins],
+            "Destinations": [{"Position": [lon, lat]} for lon, lat in destinations],
+            "RoutingBoundary": {"Unbounded": True},
         }
+        return matrix_url, data
+
+    def calculate_routes(
+        self, st_lon: float, st_lat: float, ed_lon: float, ed_lat: float
+    ) -> Dict[str, Any]:
+        """
+        Calculates a route from start to end coordinates using an external API.
+
+        Args:
+            st_lon (float): Longitude of the start position.
+            st_lat (float): Latitude of the start position.
+            ed_lon (float): Longitude of the end position.
+            ed_lat (float): Latitude of the end position.
+
+        Returns:
+            A dictionary containing the calculated route data.
+        """
+        routes_url, data = self.build_routes_request(st_lon, st_lat, ed_lon, ed_lat)
         result = self.api_handler.send_json_post_request(routes_url, data)
         if result is None:
             raise ValueError("Failed to receive a valid response from the API.")
         return result
 
-    def add_line_layer(self, data: Dict[str, Any]) -> None:
+    def calculate_routes_async(
+        self,
+        st_lon: float,
+        st_lat: float,
+        ed_lon: float,
+        ed_lat: float,
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> ApiRequest:
+        """
+        Calculates a route without blocking the event loop.
+
+        Args:
+            st_lon (float): Longitude of the start position.
+            st_lat (float): Latitude of the start position.
+            ed_lon (float): Longitude of the end position.
+            ed_lat (float): Latitude of the end position.
+            on_success (SuccessCallback): Called with the route data.
+            on_error (Optional[ErrorCallback]): Called if the request fails.
+
+        Returns:
+            ApiRequest: A handle that can be used to cancel the calculation.
+        """
+        routes_url, data = self.build_routes_request(st_lon, st_lat, ed_lon, ed_lat)
+        return self.api_handler.send_json_post_request_async(
+            routes_url, data, on_success, on_error
+        )
+
+    def add_line_layer(
+        self, data: Dict[str, Any], output_path: Optional[str] = None
+    ) -> None:
         """
         Adds a line layer to the QGIS project based on route data provided.
 
         Args:
             data (Dict): Route data including the route legs and geometry.
+            output_path (Optional[str]): GeoPackage (.gpkg) or FlatGeobuf
+                (.fgb) file to write instead of a memory layer.
         """
+        if output_path:
+            fields = self.create_fields()
+            writer = StreamingFeatureWriter.for_file(
+                output_path,
+                self.LAYER_NAME,
+                fields,
+                QgsWkbTypes.LineString,
+                QgsCoordinateReferenceSystem(self.WGS84_CRS),
+            )
+            timer = Instrumentation.start("routes.layer")
+            # GeoPackage output is already open as a layer, so it is shown
+            # first and fills in as the chunks are written. FlatGeobuf can
+            # only be opened once the file is complete.
+            opened = writer.layer is not None
+            if opened:
+                with timer.phase("layer_add"):
+                    self.show_layer(writer.layer)
+            with timer.phase("feature_build"):
+                writer.add_features(self.iter_features(fields, data))
+                layer = writer.close()
+            if not opened:
+                with timer.phase("layer_add"):
+                    self.show_layer(layer)
+            timer.finish(features=writer.features_written, output="file")
+            return
         layer = QgsVectorLayer(
-            f"{self.LAYER_TYPE}?crs={self.WGS84_CRS}", "CalculateRoutes", "memory"
+            f"{self.LAYER_TYPE}?crs={self.WGS84_CRS}", self.LAYER_NAME, "memory"
         )
         self.setup_layer(layer, data)
 
@@ -99,11 +232,34 @@ class RoutesFunctions:
             layer (QgsVectorLayer): The vector layer to be configured.
             data (Dict): Route data used to populate the layer.
         """
-        self.add_attributes(layer)
-        self.add_features(layer, data)
+        timer = Instrumentation.start("routes.layer")
+        with timer.phase("feature_build"):
+            self.add_attributes(layer)
+            self.add_features(layer, data)
+        with timer.phase("layer_add"):
+            self.show_layer(layer)
+        timer.finish(features=layer.featureCount(), output="memory")
+
+    def show_layer(self, layer: QgsVectorLayer) -> None:
+        """
+        Styles a populated layer and adds it to the project.
+
+        Args:
+            layer (QgsVectorLayer): The layer to show.
+        """
+        self.style_layer(layer)
+        QgsProject.instance().addMapLayer(layer)
+
+    def style_layer(self, layer: QgsVectorLayer) -> None:
+        """
+        Applies the line symbol to a layer without adding it to the project,
+        so that it can be done off the GUI thread.
+
+        Args:
+            layer (QgsVectorLayer): The layer to style.
+        """
         self.apply_layer_style(layer)
         layer.triggerRepaint()
-        QgsProject.instance().addMapLayer(layer)
 
     def add_attributes(self, layer: QgsVectorLayer) -> None:
         """
@@ -112,34 +268,85 @@ class RoutesFunctions:
         Args:
             layer (QgsVectorLayer): The layer to which fields are added.
         """
+        layer.dataProvider().addAttributes(self.create_fields())
+        layer.updateFields()
+
+    def create_fields(self) -> QgsFields:
+        """
+        Creates the attribute schema of a routes layer.
+
+        Returns:
+            QgsFields: The road name field.
+        """
         fields = QgsFields()
         fields.append(QgsField(self.FIELD_ROADNAME, QVariant.String))
-        layer.dataProvider().addAttributes(fields)
-        layer.updateFields()
+        return fields
 
-    def add_features(self, layer: QgsVectorLayer, data: Dict) -> None:
+    def add_features(
+        self,
+        layer: QgsVectorLayer,
+        data: Dict,
+        chunk_size: int = StreamingFeatureWriter.DEFAULT_CHUNK_SIZE,
+    ) -> None:
         """
         Adds features to the layer based on the route data.
 
         Args:
             layer (QgsVectorLayer): The layer to which features are added.
             data (Dict): The route data containing legs and geometry.
+            chunk_size (int): Number of features written per provider call.
+        """
+        writer = StreamingFeatureWriter.for_layer(layer, chunk_size)
+        writer.add_features(self.iter_features(layer.fields(), data))
+        writer.flush()
+
+    def build_features(self, fields: QgsFields, data: Dict) -> List[QgsFeature]:
+        """
+        Builds line features from route data.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                one must be the road name field created by add_attributes.
+            data (Dict): The route data containing legs and geometry.
+
+        Returns:
+            List[QgsFeature]: One feature per route leg.
+        """
+        return list(self.iter_features(fields, data))
+
+    def iter_features(self, fields: QgsFields, data: Dict) -> Iterator[QgsFeature]:
+        """
+        Lazily builds line features from route data.
+
+        Args:
+            fields (QgsFields): Fields of the target layer or sink. The first
+                one must be the road name field created by add_attributes.
+            data (Dict): The route data containing legs and geometry.
+
+        Yields:
+            QgsFeature: One feature per route leg.
+        """
+        for leg in RouteLeg.from_response(data):
+            geometry = QgsGeometry()
+            geometry.fromWkb(linestring_wkb(leg.coordinates))
+            feature = QgsFeature(fields)
+            feature.setAttributes([leg.road_name])
+            feature.setGeometry(geometry)
+            yield feature
+
+    @staticmethod
+    def leg_coordinates(leg: Dict[str, Any]) -> array:
+        """
+        Decodes the geometry of a route leg into a flat coordinate buffer.
+
+        Args:
+            leg (Dict[str, Any]): A route leg with either a FlexiblePolyline
+                "Polyline" or a Simple "LineString" geometry.
+
+        Returns:
+            array: Interleaved longitude and latitude values.
         """
-        features = []
-        for route in data.get("Routes", []):
-            for road in route.get("MajorRoadLabels", []):
-                roadname = road.get("RoadName", {}).get("Value", None)
-            for leg in route.get("Legs", []):
-                line_points = [
-                    QgsPointXY(coord[0], coord[1])
-                    for coord in leg["Geometry"]["LineString"]
-                ]
-                geometry = QgsGeometry.fromPolylineXY(line_points)
-                feature = QgsFeature(layer.fields())
-                feature.setAttributes([roadname])
-                feature.setGeometry(geometry)
-                features.append(feature)
-        layer.dataProvider().addFeatures(features)
+        return RouteLeg.coordinates_of(leg)
 
     def apply_layer_style(self, layer: QgsVectorLayer) -> None:
         """
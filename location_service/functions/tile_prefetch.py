@@ -0,0 +1,242 @@
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtNetwork import QNetworkReply
+from qgis.core import QgsNetworkAccessManager
+
+from ..utils.request_factory import ApiRequestFactory
+from ..utils.request_pool import ProgressCallback
+from ..utils.tile_cache import BoundingBox, TileCache, TileKey
+
+
+class TilePrefetcher:
+    """
+    Downloads every tile of a bounding box over a zoom range into a
+    TileCache, keeping a fixed number of GET requests in flight.
+
+    Tiles that are already cached are skipped, so an interrupted prefetch
+    can simply be started again.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+    MAX_TILES = 200000
+    REQUEST_TIMEOUT_MS = 30000
+    PNG_SIGNATURE = b"\x89PNG"
+    JPEG_SIGNATURE = b"\xff\xd8"
+
+    def __init__(
+        self,
+        cache: TileCache,
+        url_template: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        """
+        Initializes the prefetcher.
+
+        Args:
+            cache (TileCache): Store receiving the downloaded tiles.
+            url_template (str): Tile URL with {z}, {x} and {y} placeholders.
+            concurrency (int): Maximum number of simultaneous downloads.
+        """
+        self.cache = cache
+        self.url_template = url_template
+        self.concurrency = max(1, concurrency)
+        self.network_manager = QgsNetworkAccessManager.instance()
+        self.request_factory = ApiRequestFactory()
+        self.on_progress: Optional[ProgressCallback] = None
+        self.on_finished: Optional[Callable[[], None]] = None
+        self.total = 0
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+        self.started_at = 0.0
+        self._tiles: Optional[Iterator[TileKey]] = None
+        self._active: Dict[QNetworkReply, TileKey] = {}
+        self._cancelled = False
+        self._finished = True
+        self._tile_format: Optional[str] = None
+
+    def start(self, bbox: BoundingBox, min_zoom: int, max_zoom: int) -> int:
+        """
+        Starts downloading the tiles covering a WGS84 bounding box.
+
+        Args:
+            bbox (BoundingBox): West, south, east and north bounds.
+            min_zoom (int): First zoom level.
+            max_zoom (int): Last zoom level.
+
+        Returns:
+            int: The number of tiles covering the area.
+
+        Raises:
+            ValueError: If the zoom range is invalid or covers too many tiles.
+        """
+        if min_zoom < 0 or max_zoom < min_zoom:
+            raise ValueError(f"Invalid zoom range: {min_zoom}-{max_zoom}")
+        total = TileCache.count_tiles(bbox, min_zoom, max_zoom)
+        if total > self.MAX_TILES:
+            raise ValueError(
+                f"The area covers {total} tiles; the limit is {self.MAX_TILES}"
+            )
+        west, south, east, north = bbox
+        self.cache.set_metadata(
+            {
+                "bounds": f"{west},{south},{east},{north}",
+                "minzoom": str(min_zoom),
+                "maxzoom": str(max_zoom),
+            }
+        )
+        self.total = total
+        self.downloaded = self.skipped = self.failed = self.bytes_downloaded = 0
+        self.started_at = time.monotonic()
+        self._tiles = TileCache.iter_tiles(bbox, min_zoom, max_zoom)
+        self._cancelled = False
+        self._finished = False
+        self._fill_slots()
+        return total
+
+    def completed(self) -> int:
+        """
+        Returns the number of tiles processed so far.
+
+        Returns:
+            int: Downloaded, skipped and failed tiles.
+        """
+        return self.downloaded + self.skipped + self.failed
+
+    def is_finished(self) -> bool:
+        """
+        Tells whether every tile has been processed or the run was cancelled.
+
+        Returns:
+            bool: True when no more work is pending.
+        """
+        return self._finished
+
+    def cancel(self) -> None:
+        """
+        Stops the prefetch and aborts the downloads in flight.
+        """
+        self._cancelled = True
+        self._tiles = None
+        for reply in list(self._active):
+            reply.abort()
+        self._check_finished()
+
+    def wait(self) -> None:
+        """
+        Blocks in a local event loop until the prefetch has finished.
+        """
+        if self._finished:
+            return
+        loop = QEventLoop()
+        previous = self.on_finished
+
+        def finished() -> None:
+            if previous is not None:
+                previous()
+            loop.quit()
+
+        self.on_finished = finished
+        loop.exec_()
+        self.on_finished = previous
+
+    def _fill_slots(self) -> None:
+        """
+        Starts downloads until the concurrency limit is reached, skipping
+        tiles that are already cached.
+        """
+        while self._tiles is not None and len(self._active) < self.concurrency:
+            tile = next(self._tiles, None)
+            if tile is None:
+                self._tiles = None
+                break
+            if self.cache.contains(*tile):
+                self.skipped += 1
+                self._report_progress()
+                continue
+            self._download(tile)
+        self._check_finished()
+
+    def _download(self, tile: TileKey) -> None:
+        """
+        Sends the GET request for one tile.
+
+        Args:
+            tile (TileKey): Zoom, column and row of the tile.
+        """
+        zoom, x, y = tile
+        url = (
+            self.url_template.replace("{z}", str(zoom))
+            .replace("{x}", str(x))
+            .replace("{y}", str(y))
+        )
+        request = self.request_factory.build_request(url)
+        reply = self.network_manager.get(request)
+        self._active[reply] = tile
+        reply.finished.connect(lambda: self._on_reply_finished(reply))
+        QTimer.singleShot(
+            self.REQUEST_TIMEOUT_MS,
+            lambda: reply.abort() if reply in self._active else None,
+        )
+
+    def _on_reply_finished(self, reply: QNetworkReply) -> None:
+        """
+        Stores a downloaded tile and starts the next download.
+
+        Args:
+            reply (QNetworkReply): The finished reply.
+        """
+        tile = self._active.pop(reply, None)
+        if tile is None:
+            return
+        if reply.error() == QNetworkReply.NoError:
+            data = bytes(reply.readAll())
+            self._record_format(data)
+            self.cache.put(*tile, data)
+            self.downloaded += 1
+            self.bytes_downloaded += len(data)
+        elif not self._cancelled:
+            self.failed += 1
+        reply.deleteLater()
+        self._report_progress()
+        if not self._cancelled:
+            self._fill_slots()
+        else:
+            self._check_finished()
+
+    def _record_format(self, data: bytes) -> None:
+        """
+        Writes the MBTiles format entry from the first downloaded tile.
+
+        Args:
+            data (bytes): The encoded tile image.
+        """
+        if self._tile_format is not None:
+            return
+        if data.startswith(self.PNG_SIGNATURE):
+            self._tile_format = "png"
+        elif data.startswith(self.JPEG_SIGNATURE):
+            self._tile_format = "jpg"
+        else:
+            return
+        self.cache.set_metadata({"format": self._tile_format})
+
+    def _report_progress(self) -> None:
+        """
+        Invokes the progress callback.
+        """
+        if self.on_progress is not None:
+            self.on_progress(self.completed(), self.total)
+
+    def _check_finished(self) -> None:
+        """
+        Marks the run as finished once no tiles are left or in flight.
+        """
+        if self._finished or self._tiles is not None or self._active:
+            return
+        self._finished = True
+        if self.on_finished is not None:
+            self.on_finished()
@@ -1,15 +1,14 @@
+import importlib
 import os
-from typing import Callable, Optional
+import sys
+from typing import Any, Callable, ClassVar, Dict, Optional
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QAction, QWidget
+from qgis.core import QgsApplication
 
-from .ui.config.config import ConfigUi
-from .ui.maps.maps import MapsUi
-from .ui.places.places import PlacesUi
-from .ui.routes.routes import RoutesUi
-from .ui.terms.terms import TermsUi
+from .utils.instrumentation import Instrumentation
 
 
 class LocationService:
@@ -18,6 +17,14 @@ class LocationService:
     """
 
     MAIN_NAME = "Amazon Location Service"
+    COMPONENT_CLASSES: ClassVar[Dict[str, str]] = {
+        "config": "ConfigUi",
+        "maps": "MapsUi",
+        "places": "PlacesUi",
+        "routes": "RoutesUi",
+        "stats": "StatsDock",
+        "terms": "TermsUi",
+    }
 
     def __init__(self, iface) -> None:
         """
@@ -33,13 +40,33 @@ class LocationService:
         self.actions = []
         self.toolbar = self.iface.addToolBar(self.MAIN_NAME)
         self.toolbar.setObjectName(self.MAIN_NAME)
-        self.config = ConfigUi()
-        self.maps = MapsUi()
-        self.places = PlacesUi()
-        self.routes = RoutesUi()
-        self.terms = TermsUi()
-        for component in [self.config, self.maps, self.places, self.routes]:
-            component.hide()
+        self.provider: Optional[Any] = None
+        self._components: Dict[str, Any] = {}
+
+    def component(self, name: str) -> Any:
+        """
+        Returns a dialog or panel, importing its module and building it on
+        first use so that loading the plugin does not pay for windows the
+        user never opens.
+
+        Args:
+            name (str): Component name, a key of COMPONENT_CLASSES.
+
+        Returns:
+            Any: The component instance.
+        """
+        component = self._components.get(name)
+        if component is None:
+            timer = Instrumentation.start("plugin.component")
+            module = importlib.import_module(f".ui.{name}.{name}", __package__)
+            timer.lap("import")
+            component = getattr(module, self.COMPONENT_CLASSES[name])()
+            timer.lap("construct")
+            if name == "stats":
+                self.iface.addDockWidget(Qt.RightDockWidgetArea, component)  # type: ignore
+            timer.finish(component=name)
+            self._components[name] = component
+        return component
 
     def add_action(
         self,
@@ -85,12 +112,24 @@ class LocationService:
         self.actions.append(action)
         return action
 
+    def initProcessing(self) -> None:
+        """
+        Registers the processing provider. QGIS calls this directly when the
+        plugin is loaded without a GUI, e.g. by qgis_process. The provider
+        and the backends of its algorithms are imported here rather than
+        when the plugin module is loaded.
+        """
+        from .processing.provider import LocationServiceProvider
+
+        self.provider = LocationServiceProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self) -> None:
         """
         Initializes the GUI components, adding actions to the interface.
         """
-        components = ["config", "maps", "places", "routes", "terms"]
-        for component_name in components:
+        self.initProcessing()
+        for component_name in self.COMPONENT_CLASSES:
             icon_path = os.path.join(
                 self.plugin_directory, f"ui/{component_name}/{component_name}.png"
             )
@@ -109,37 +148,66 @@ class LocationService:
             self.iface.removePluginMenu(self.MAIN_NAME, action)
             self.iface.removeToolBarIcon(action)
         del self.toolbar
+        stats = self._components.get("stats")
+        if stats is not None:
+            self.iface.removeDockWidget(stats)
+        for component in self._components.values():
+            if hasattr(component, "close"):
+                component.close()
+        self._components.clear()
+        # Tasks and handlers only exist once a dialog imported their modules.
+        layer_tasks = sys.modules.get(f"{__package__}.functions.layer_tasks")
+        if layer_tasks is not None:
+            layer_tasks.ApiLayerTask.cancel_all()
+        api_handler = sys.modules.get(f"{__package__}.utils.external_api_handler")
+        if api_handler is not None:
+            api_handler.ExternalApiHandler.cancel_all_handlers()
+        if self.provider is not None:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider = None
 
     def show_config(self) -> None:
         """
         Displays the configuration dialog window.
         """
-        self.config.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
-        self.config.show()
+        dialog = self.component("config")
+        dialog.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
+        dialog.show()
 
     def show_maps(self) -> None:
         """
         Displays the maps dialog window.
         """
-        self.maps.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
-        self.maps.show()
+        dialog = self.component("maps")
+        dialog.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
+        dialog.show()
 
     def show_places(self) -> None:
         """
         Displays the places dialog window.
         """
-        self.places.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
-        self.places.show()
+        dialog = self.component("places")
+        dialog.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
+        dialog.show()
 
     def show_routes(self) -> None:
         """
         Displays the routes dialog window.
         """
-        self.routes.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
-        self.routes.show()
+        dialog = self.component("routes")
+        dialog.setWindowFlags(Qt.WindowStaysOnTopHint)  # type: ignore
+        dialog.show()
+
+    def show_stats(self) -> None:
+        """
+        Displays the timing stats panel.
+        """
+        stats = self.component("stats")
+        stats.show()
+        stats.raise_()
 
     def show_terms(self) -> None:
         """
         Opens the service terms URL in the default web browser.
         """
-        self.terms.open_service_terms_url()
+        self.component("terms").open_service_terms_url()
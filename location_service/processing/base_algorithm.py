@@ -0,0 +1,165 @@
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+from PyQt5.QtCore import QTimer
+from qgis.core import (
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProcessingParameterFileDestination,
+)
+
+from ..functions.tile_prefetch import TilePrefetcher
+from ..utils.job_journal import JobJournal
+from ..utils.request_pool import ProgressCallback, RequestPool
+
+
+class ApiAlgorithm(QgsProcessingAlgorithm):
+    """
+    Base class for processing algorithms that run Amazon Location Service
+    requests through a RequestPool.
+    """
+
+    GROUP_ID = "location_service"
+    GROUP_NAME = "Amazon Location Service"
+    CANCEL_POLL_MS = 100
+    DEFAULT_CONCURRENCY = RequestPool.DEFAULT_CONCURRENCY
+    MAX_CONCURRENCY = 64
+    JOURNAL = "JOURNAL"
+    PROGRESS_INFO_SECONDS = 5.0
+
+    def group(self) -> str:
+        """
+        Returns the display name of the algorithm group.
+        """
+        return self.GROUP_NAME
+
+    def groupId(self) -> str:
+        """
+        Returns the identifier of the algorithm group.
+        """
+        return self.GROUP_ID
+
+    def createInstance(self) -> "ApiAlgorithm":
+        """
+        Creates a fresh instance of the algorithm for each run.
+        """
+        return type(self)()
+
+    @classmethod
+    def progress_callback(
+        cls,
+        feedback: QgsProcessingFeedback,
+        failed: Optional[Callable[[], int]] = None,
+    ) -> ProgressCallback:
+        """
+        Creates a pool progress callback that reports to the feedback object.
+        Besides the percentage, the finished and total counts are written to
+        the log every PROGRESS_INFO_SECONDS and when the last job finishes.
+
+        Args:
+            feedback (QgsProcessingFeedback): Feedback of the running algorithm.
+            failed (Optional[Callable[[], int]]): Returns the number of failed
+                jobs so far, included in the log when given.
+
+        Returns:
+            ProgressCallback: Callback taking the finished and total counts.
+        """
+        last_info = 0.0
+
+        def report(completed: int, total: int) -> None:
+            nonlocal last_info
+            if total:
+                feedback.setProgress(100.0 * completed / total)
+            now = time.monotonic()
+            if completed < total and now - last_info < cls.PROGRESS_INFO_SECONDS:
+                return
+            last_info = now
+            message = f"Finished {completed} of {total} requests"
+            if failed is not None:
+                message += f", {failed()} failed"
+            feedback.pushInfo(message + ".")
+
+        return report
+
+    def add_journal_parameter(self) -> None:
+        """
+        Declares the optional job journal file of a batch algorithm.
+        """
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.JOURNAL,
+                "Job journal",
+                "SQLite files (*.sqlite)",
+                optional=True,
+                createByDefault=False,
+            )
+        )
+
+    def open_journal(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        pool: RequestPool,
+        feedback: QgsProcessingFeedback,
+    ) -> Optional[JobJournal]:
+        """
+        Attaches the job journal chosen by the user to a pool, so that an
+        interrupted run can be resumed by running it again.
+
+        Args:
+            parameters (Dict[str, Any]): The algorithm parameters.
+            context (QgsProcessingContext): The processing context.
+            pool (RequestPool): The pool running the requests.
+            feedback (QgsProcessingFeedback): Feedback of the running algorithm.
+
+        Returns:
+            Optional[JobJournal]: The journal, or None if none was chosen.
+        """
+        path = self.parameterAsFileOutput(parameters, self.JOURNAL, context)
+        if not path:
+            return None
+        journal = JobJournal(path)
+        counts = journal.counts()
+        if any(counts.values()):
+            feedback.pushInfo(
+                f"Resuming from {path}: {counts[JobJournal.STATE_DONE]} requests "
+                f"done, {counts[JobJournal.STATE_PENDING]} pending and "
+                f"{counts[JobJournal.STATE_FAILED]} failed."
+            )
+        pool.journal = journal
+        return journal
+
+    def run_pool(
+        self,
+        pool: Union[RequestPool, TilePrefetcher],
+        feedback: QgsProcessingFeedback,
+        on_cancel: Callable[[], None],
+    ) -> None:
+        """
+        Blocks the algorithm thread until the pool has finished, polling the
+        feedback object so that cancelling the algorithm aborts every
+        request in flight. The pool's job journal, if any, is closed.
+
+        Args:
+            pool (Union[RequestPool, TilePrefetcher]): The pool with the
+                queued requests.
+            feedback (QgsProcessingFeedback): Feedback of the running algorithm.
+            on_cancel (Callable[[], None]): Called to stop the work when the
+                user cancels.
+        """
+        timer = QTimer()
+        timer.timeout.connect(lambda: on_cancel() if feedback.isCanceled() else None)
+        timer.start(self.CANCEL_POLL_MS)
+        try:
+            pool.wait()
+        finally:
+            timer.stop()
+            journal = getattr(pool, "journal", None)
+            if journal is not None:
+                journal.close()
+                pool.journal = None
+                if journal.replayed:
+                    feedback.pushInfo(
+                        f"Answered {journal.replayed} requests from the journal."
+                    )
@@ -0,0 +1,159 @@
+from typing import Any, Dict, Optional
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingOutputFile,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterExtent,
+    QgsProcessingParameterNumber,
+)
+
+from ..functions.maps import MapsFunctions
+from ..functions.tile_prefetch import TilePrefetcher
+from .base_algorithm import ApiAlgorithm
+
+
+class PrefetchTilesAlgorithm(ApiAlgorithm):
+    """
+    Downloads the map tiles of an extent over a zoom range into the local
+    tile cache, so the map can be displayed offline.
+    """
+
+    STYLE = "STYLE"
+    EXTENT = "EXTENT"
+    MIN_ZOOM = "MIN_ZOOM"
+    MAX_ZOOM = "MAX_ZOOM"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+    WGS84_CRS = "EPSG:4326"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "prefetchtiles"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Prefetch map tiles"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Downloads every map tile of the extent between the minimum and "
+            "maximum zoom into the local tile cache. Tiles already cached are "
+            "skipped. Enable offline mode in the Maps dialog to display the "
+            "cached tiles."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.STYLE, "Map style", list(MapsFunctions.MAP_STYLES), defaultValue=0
+            )
+        )
+        self.addParameter(QgsProcessingParameterExtent(self.EXTENT, "Extent"))
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MIN_ZOOM,
+                "Minimum zoom",
+                QgsProcessingParameterNumber.Integer,
+                MapsFunctions.MIN_ZOOM,
+                minValue=MapsFunctions.MIN_ZOOM,
+                maxValue=MapsFunctions.MAX_ZOOM,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_ZOOM,
+                "Maximum zoom",
+                QgsProcessingParameterNumber.Integer,
+                14,
+                minValue=MapsFunctions.MIN_ZOOM,
+                maxValue=MapsFunctions.MAX_ZOOM,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent downloads",
+                QgsProcessingParameterNumber.Integer,
+                TilePrefetcher.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.addOutput(QgsProcessingOutputFile(self.OUTPUT, "Tile cache"))
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Downloads the tiles in parallel and returns the MBTiles path.
+        """
+        style = MapsFunctions.MAP_STYLES[
+            self.parameterAsEnum(parameters, self.STYLE, context)
+        ]
+        extent = self.parameterAsExtent(
+            parameters,
+            self.EXTENT,
+            context,
+            QgsCoordinateReferenceSystem(self.WGS84_CRS),
+        )
+        maps = MapsFunctions()
+        try:
+            prefetcher = maps.prefetch_tiles(
+                style,
+                (
+                    extent.xMinimum(),
+                    extent.yMinimum(),
+                    extent.xMaximum(),
+                    extent.yMaximum(),
+                ),
+                self.parameterAsInt(parameters, self.MIN_ZOOM, context),
+                self.parameterAsInt(parameters, self.MAX_ZOOM, context),
+                self.parameterAsInt(parameters, self.CONCURRENCY, context),
+                self.progress_callback(feedback),
+            )
+        except ValueError as e:
+            raise QgsProcessingException(str(e)) from e
+        cache = prefetcher.cache
+        tile_size = cache.average_tile_size()
+        if (
+            tile_size is not None
+            and prefetcher.total * tile_size > cache.max_size_bytes
+        ):
+            feedback.pushInfo(
+                f"The area needs about {int(prefetcher.total * tile_size)} bytes, "
+                f"more than the tile cache limit of {cache.max_size_bytes} bytes; "
+                "the tiles fetched first will be evicted. Raise "
+                f"{MapsFunctions.KEY_TILE_CACHE_MAX_SIZE} or prefetch a smaller "
+                "area."
+            )
+        self.run_pool(prefetcher, feedback, prefetcher.cancel)
+        cache.close()
+        feedback.pushInfo(
+            f"Downloaded {prefetcher.downloaded} tiles "
+            f"({prefetcher.bytes_downloaded} bytes), "
+            f"{prefetcher.skipped} already cached, {prefetcher.failed} failed."
+        )
+        if cache.evictions:
+            feedback.pushInfo(
+                f"The tile cache reached its size limit and {cache.evictions} "
+                "tiles were evicted, oldest fetched first; if the area is larger "
+                "than the limit these include tiles of this run."
+            )
+        return {self.OUTPUT: prefetcher.cache.path}
@@ -0,0 +1,914 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeatureSource,
+    QgsProcessingFeedback,
+    QgsProcessingOutputVectorLayer,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterField,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterPoint,
+    QgsProcessingParameterString,
+    QgsProcessingParameterVectorLayer,
+    QgsProcessingUtils,
+    QgsWkbTypes,
+)
+
+from ..functions.area_sweep import AreaSweep, SweepCheckpoint
+from ..functions.places import PlacesFunctions
+from ..functions.places_batch import BatchQuery, PlacesBatchGeocoder
+from ..functions.places_reverse import GridKey, PlacesReverseGeocoder
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.transform_cache import Wgs84Transformer
+from .base_algorithm import ApiAlgorithm
+
+
+class SearchTextAlgorithm(ApiAlgorithm):
+    """
+    Geocodes a text field of every input feature with the search-text API.
+    """
+
+    INPUT = "INPUT"
+    FIELD = "FIELD"
+    USE_GEOMETRY = "USE_GEOMETRY"
+    BIAS = "BIAS"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "searchtext"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Search text (batch geocode)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Geocodes the query text stored in a field of each input feature. "
+            "The feature location, or the default bias position, is used as "
+            "the search bias. The best match of every query is written to the "
+            "output layer, with the id of its input feature in the InputId "
+            "field."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT, "Input layer", [QgsProcessing.TypeVector]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.FIELD,
+                "Query text field",
+                parentLayerParameterName=self.INPUT,
+                type=QgsProcessingParameterField.String,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.USE_GEOMETRY, "Use feature location as bias", True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterPoint(
+                self.BIAS, "Default bias position", optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.add_journal_parameter()
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Geocoded places", QgsProcessing.TypeVectorPoint
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Runs the searches in parallel and writes the results to the sink.
+        """
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT)
+            )
+        query_field = self.parameterAsString(parameters, self.FIELD, context)
+        use_geometry = self.parameterAsBool(parameters, self.USE_GEOMETRY, context)
+        default_bias = self.read_default_bias(parameters, context)
+
+        geocoder = PlacesBatchGeocoder(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        queries = PlacesBatchGeocoder.queries_from_features(
+            source.getFeatures(), source.sourceCrs(), query_field, use_geometry
+        )
+        dest_id = self.run_batch(
+            geocoder,
+            queries,
+            source.featureCount(),
+            default_bias,
+            parameters,
+            context,
+            feedback,
+        )
+        return {self.OUTPUT: dest_id}
+
+    def read_default_bias(
+        self, parameters: Dict[str, Any], context: QgsProcessingContext
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Reads the optional default bias position in WGS84.
+
+        Args:
+            parameters (Dict[str, Any]): The algorithm parameters.
+            context (QgsProcessingContext): The processing context.
+
+        Returns:
+            Optional[Tuple[float, float]]: Longitude and latitude, or None if
+            no position was given.
+        """
+        if not parameters.get(self.BIAS):
+            return None
+        wgs84 = QgsCoordinateReferenceSystem(PlacesFunctions.WGS84_CRS)
+        point = self.parameterAsPoint(parameters, self.BIAS, context, wgs84)
+        return (point.x(), point.y())
+
+    def run_batch(
+        self,
+        geocoder: PlacesBatchGeocoder,
+        queries: Iterable[BatchQuery],
+        count: int,
+        default_bias: Optional[Tuple[float, float]],
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> str:
+        """
+        Streams the queries through the geocoder into the output sink and
+        reports skipped queries, failures and throughput.
+
+        Args:
+            geocoder (PlacesBatchGeocoder): The geocoder running the batch.
+            queries (Iterable[BatchQuery]): The queries, read lazily.
+            count (int): Number of input records.
+            default_bias (Optional[Tuple[float, float]]): Bias position of
+                queries without their own.
+            parameters (Dict[str, Any]): The algorithm parameters.
+            context (QgsProcessingContext): The processing context.
+            feedback (QgsProcessingFeedback): Feedback of the running algorithm.
+
+        Returns:
+            str: The destination id of the output sink.
+        """
+        self.open_journal(parameters, context, geocoder.pool, feedback)
+        wgs84 = QgsCoordinateReferenceSystem(PlacesFunctions.WGS84_CRS)
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            geocoder.create_fields(),
+            QgsWkbTypes.Point,
+            wgs84,
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        writer = StreamingFeatureWriter(sink)
+        report = self.progress_callback(feedback, lambda: len(geocoder.errors))
+        try:
+            geocoder.geocode(
+                queries,
+                count,
+                default_bias,
+                writer,
+                lambda completed, total, _rate: report(completed, total),
+            )
+        except ValueError as e:
+            raise QgsProcessingException(str(e)) from e
+        self.run_pool(geocoder.pool, feedback, geocoder.cancel)
+        writer.close()
+        if geocoder.skipped:
+            feedback.pushInfo(
+                f"Skipped {geocoder.skipped} queries without a location or "
+                "default bias."
+            )
+        for input_id, text, error in geocoder.errors:
+            feedback.reportError(f"Search {input_id} for {text!r} failed: {error}")
+        feedback.pushInfo(
+            f"Geocoded {geocoder.pool.completed()} queries at "
+            f"{geocoder.rows_per_second():.1f} rows/s."
+        )
+        return dest_id
+
+
+class SearchTextCsvAlgorithm(SearchTextAlgorithm):
+    """
+    Geocodes a column of a CSV file with the search-text API.
+    """
+
+    LON_COLUMN = "LON_COLUMN"
+    LAT_COLUMN = "LAT_COLUMN"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "searchtextcsv"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Search text (CSV batch geocode)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Geocodes the query text stored in a column of a CSV file. The "
+            "rows are read as the requests are sent, so files of any size can "
+            "be geocoded. Optional longitude and latitude columns, or the "
+            "default bias position, are used as the search bias. The InputId "
+            "field of the output holds the row number of each query."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.INPUT,
+                "Input CSV file",
+                QgsProcessingParameterFile.File,
+                "csv",
+            )
+        )
+        self.addParameter(QgsProcessingParameterString(self.FIELD, "Query column"))
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.LON_COLUMN, "Bias longitude column", optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.LAT_COLUMN, "Bias latitude column", optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterPoint(
+                self.BIAS, "Default bias position", optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.add_journal_parameter()
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Geocoded places", QgsProcessing.TypeVectorPoint
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Runs the searches in parallel and writes the results to the sink.
+        """
+        path = self.parameterAsFile(parameters, self.INPUT, context)
+        query_column = self.parameterAsString(parameters, self.FIELD, context)
+        lon_column = self.parameterAsString(parameters, self.LON_COLUMN, context)
+        lat_column = self.parameterAsString(parameters, self.LAT_COLUMN, context)
+        if bool(lon_column) != bool(lat_column):
+            raise QgsProcessingException(
+                "Set both bias coordinate columns or neither of them."
+            )
+        try:
+            count = PlacesBatchGeocoder.count_csv_rows(path)
+        except OSError as e:
+            raise QgsProcessingException(f"Could not read {path}: {e}") from e
+
+        geocoder = PlacesBatchGeocoder(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        queries = PlacesBatchGeocoder.queries_from_csv(
+            path, query_column, lon_column or None, lat_column or None
+        )
+        dest_id = self.run_batch(
+            geocoder,
+            queries,
+            count,
+            self.read_default_bias(parameters, context),
+            parameters,
+            context,
+            feedback,
+        )
+        return {self.OUTPUT: dest_id}
+
+
+class SearchTextPagesAlgorithm(ApiAlgorithm):
+    """
+    Collects many results of a single query by following result pages.
+    """
+
+    QUERY = "QUERY"
+    BIAS = "BIAS"
+    PAGE_SIZE = "PAGE_SIZE"
+    MAX_RESULTS = "MAX_RESULTS"
+    OUTPUT = "OUTPUT"
+    DEFAULT_MAX_RESULTS = 500
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "searchtextpages"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Search text (all pages)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Searches one query near a position and writes every result, "
+            "following the result pages until the maximum number of results "
+            "is reached. Each page is requested while the previous one is "
+            "being written. Set the maximum to 0 to read all pages."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(QgsProcessingParameterString(self.QUERY, "Query text"))
+        self.addParameter(QgsProcessingParameterPoint(self.BIAS, "Bias position"))
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.PAGE_SIZE,
+                "Results per request",
+                QgsProcessingParameterNumber.Integer,
+                PlacesFunctions.PAGE_MAX_RESULTS,
+                minValue=1,
+                maxValue=PlacesFunctions.PAGE_MAX_RESULTS,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_RESULTS,
+                "Maximum results (0 for no limit)",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_MAX_RESULTS,
+                minValue=0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Places", QgsProcessing.TypeVectorPoint
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Streams the results of every page to the sink.
+        """
+        query = self.parameterAsString(parameters, self.QUERY, context)
+        wgs84 = QgsCoordinateReferenceSystem(PlacesFunctions.WGS84_CRS)
+        point = self.parameterAsPoint(parameters, self.BIAS, context, wgs84)
+        page_size = self.parameterAsInt(parameters, self.PAGE_SIZE, context)
+        max_results = self.parameterAsInt(parameters, self.MAX_RESULTS, context)
+
+        places = PlacesFunctions()
+        fields = places.create_fields()
+        sink, dest_id = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, QgsWkbTypes.Point, wgs84
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        writer = StreamingFeatureWriter(sink)
+        features = places.iter_search_text_features(
+            fields,
+            query,
+            point.x(),
+            point.y(),
+            page_size,
+            max_results or None,
+            feedback.isCanceled,
+        )
+
+        def report(feature_iterator: Iterator[QgsFeature]) -> Iterator[QgsFeature]:
+            for count, feature in enumerate(feature_iterator, 1):
+                yield feature
+                if max_results:
+                    feedback.setProgress(100.0 * count / max_results)
+                if feedback.isCanceled():
+                    break
+
+        try:
+            writer.add_features(report(features))
+        finally:
+            features.close()
+            writer.close()
+        feedback.pushInfo(f"Wrote {writer.features_written} places.")
+        return {self.OUTPUT: dest_id}
+
+
+class AreaSweepAlgorithm(ApiAlgorithm):
+    """
+    Harvests every place matching a query inside polygons by searching an
+    adaptive quadtree of bounding boxes.
+    """
+
+    INPUT = "INPUT"
+    QUERY = "QUERY"
+    MAX_DEPTH = "MAX_DEPTH"
+    CONCURRENCY = "CONCURRENCY"
+    CHECKPOINT = "CHECKPOINT"
+    OUTPUT = "OUTPUT"
+    MAX_SWEEP_DEPTH = 16
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "areasweep"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Search text (area sweep)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Searches one query over the extent of the input polygons, "
+            "splitting every cell whose result limit is reached into four "
+            "smaller cells. Places inside the polygons are written once per "
+            "place id. With a checkpoint file, progress is saved while the "
+            "sweep runs and a cancelled or failed sweep resumes where it "
+            "stopped when run again with the same inputs."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT, "Area", [QgsProcessing.TypeVectorPolygon]
+            )
+        )
+        self.addParameter(QgsProcessingParameterString(self.QUERY, "Query text"))
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_DEPTH,
+                "Maximum cell splits",
+                QgsProcessingParameterNumber.Integer,
+                AreaSweep.DEFAULT_MAX_DEPTH,
+                minValue=0,
+                maxValue=self.MAX_SWEEP_DEPTH,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFileDestination(
+                self.CHECKPOINT,
+                "Checkpoint file",
+                "JSON files (*.json)",
+                optional=True,
+                createByDefault=False,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Places", QgsProcessing.TypeVectorPoint
+            )
+        )
+
+    @staticmethod
+    def read_area(source: QgsProcessingFeatureSource) -> QgsGeometry:
+        """
+        Merges the input polygons into one WGS84 geometry.
+
+        Args:
+            source (QgsProcessingFeatureSource): The polygon source.
+
+        Returns:
+            QgsGeometry: The union of the polygons.
+
+        Raises:
+            QgsProcessingException: If the source has no polygon.
+        """
+        transform = Wgs84Transformer.transform_for(source.sourceCrs())
+        geometries = []
+        for feature in source.getFeatures(QgsFeatureRequest().setNoAttributes()):
+            geometry = feature.geometry()
+            if geometry is None or geometry.isEmpty():
+                continue
+            geometry.transform(transform)
+            geometries.append(geometry)
+        if not geometries:
+            raise QgsProcessingException("The area has no polygons.")
+        return QgsGeometry.unaryUnion(geometries)
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Sweeps the area and writes the de-duplicated places to the sink.
+        """
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT)
+            )
+        query = self.parameterAsString(parameters, self.QUERY, context)
+        max_depth = self.parameterAsInt(parameters, self.MAX_DEPTH, context)
+        checkpoint_path = self.parameterAsFileOutput(
+            parameters, self.CHECKPOINT, context
+        )
+
+        area = self.read_area(source)
+        sweep = AreaSweep(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        fields = sweep.places.create_fields()
+        wgs84 = QgsCoordinateReferenceSystem(PlacesFunctions.WGS84_CRS)
+        sink, dest_id = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, QgsWkbTypes.Point, wgs84
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        checkpoint = SweepCheckpoint(checkpoint_path) if checkpoint_path else None
+        sweep.start(
+            area,
+            query,
+            max_depth,
+            checkpoint,
+            self.progress_callback(feedback, lambda: len(sweep.errors)),
+        )
+        if sweep.resumed:
+            feedback.pushInfo(
+                f"Resumed from {checkpoint_path} with "
+                f"{len(sweep.places_found)} places."
+            )
+        self.run_pool(sweep.pool, feedback, sweep.cancel)
+
+        writer = StreamingFeatureWriter(sink)
+        writer.add_features(sweep.iter_features(fields))
+        writer.close()
+        for cell, error in sweep.errors:
+            feedback.reportError(
+                f"Search of cell {cell.bounding_box()} failed: {error}"
+            )
+        if sweep.truncated_cells:
+            feedback.pushInfo(
+                f"{sweep.truncated_cells} cells still reached the result limit "
+                "at the maximum depth, so some places may be missing."
+            )
+        if checkpoint is not None:
+            if sweep.is_complete():
+                checkpoint.remove()
+            else:
+                feedback.pushInfo(
+                    f"Run again with {checkpoint_path} to resume the sweep."
+                )
+        feedback.pushInfo(
+            f"Searched {sweep.cells_searched} cells and wrote "
+            f"{writer.features_written} places."
+        )
+        return {self.OUTPUT: dest_id}
+
+
+class ReverseGeocodeAlgorithm(ApiAlgorithm):
+    """
+    Adds the address nearest to every input point with the reverse-geocode
+    API, looking up near-identical positions only once.
+    """
+
+    INPUT = "INPUT"
+    GRID_SIZE = "GRID_SIZE"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "reversegeocode"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Reverse geocode (batch)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Looks up the address nearest to each input feature and appends it "
+            "to the feature attributes. Features closer to each other than the "
+            "grid size share a single lookup. Lines and polygons are looked up "
+            "at their centroid."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT, "Input layer", [QgsProcessing.TypeVectorAnyGeometry]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.GRID_SIZE,
+                "De-duplication grid size (meters)",
+                QgsProcessingParameterNumber.Double,
+                PlacesReverseGeocoder.DEFAULT_GRID_SIZE_M,
+                minValue=0.0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.add_journal_parameter()
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(self.OUTPUT, "Reverse geocoded")
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Runs the unique lookups in parallel, then writes every input feature
+        with the result of its grid cell.
+        """
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT)
+            )
+        grid_size = self.parameterAsDouble(parameters, self.GRID_SIZE, context)
+        geocoder = PlacesReverseGeocoder(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        self.open_journal(parameters, context, geocoder.pool, feedback)
+        fields = QgsProcessingUtils.combineFields(
+            source.fields(), geocoder.create_fields()
+        )
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            source.wkbType(),
+            source.sourceCrs(),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        grid = geocoder.group_features(
+            source.getFeatures(QgsFeatureRequest().setNoAttributes()),
+            source.sourceCrs(),
+            grid_size,
+        )
+        feedback.pushInfo(
+            f"{grid.feature_count} features snap to {len(grid)} unique lookups."
+        )
+        cell_of = {
+            feature_id: key
+            for key, feature_ids in grid.feature_ids.items()
+            for feature_id in feature_ids
+        }
+        results: Dict[GridKey, List[Any]] = {}
+
+        def store_result(key: GridKey, result: Dict[str, Any]) -> None:
+            results[key] = geocoder.result_attributes(result)
+
+        geocoder.pool.on_progress = self.progress_callback(
+            feedback, lambda: len(geocoder.errors)
+        )
+        geocoder.submit_lookups(grid, store_result)
+        self.run_pool(geocoder.pool, feedback, geocoder.cancel)
+        for (lon, lat), error in geocoder.errors:
+            feedback.reportError(f"Lookup at {lon:.6f}, {lat:.6f} failed: {error}")
+
+        empty = [None] * len(geocoder.RESULT_FIELDS)
+        writer = StreamingFeatureWriter(sink)
+
+        def joined_features() -> Iterator[QgsFeature]:
+            for feature in source.getFeatures():
+                if feedback.isCanceled():
+                    return
+                output = QgsFeature(fields)
+                output.setGeometry(feature.geometry())
+                key = cell_of.get(feature.id())
+                output.setAttributes(feature.attributes() + results.get(key, empty))
+                yield output
+
+        writer.add_features(joined_features())
+        writer.close()
+        return {self.OUTPUT: dest_id}
+
+
+class ReverseGeocodeInPlaceAlgorithm(ApiAlgorithm):
+    """
+    Adds the address nearest to every point of a layer to the layer itself,
+    writing the result fields through its data provider.
+    """
+
+    INPUT = "INPUT"
+    GRID_SIZE = "GRID_SIZE"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "reversegeocodeinplace"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Reverse geocode (update layer)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Looks up the address nearest to each feature and writes it to "
+            "result fields of the input layer, which are added when missing. "
+            "The layer must be editable through its data provider, e.g. a "
+            "GeoPackage or shapefile. Features closer to each other than the "
+            "grid size share a single lookup."
+        )
+
+    def flags(self) -> QgsProcessingAlgorithm.Flags:
+        """
+        Runs on the main thread, as the layer is modified while it may be
+        shown in the project.
+        """
+        return super().flags() | QgsProcessingAlgorithm.FlagNoThreading
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                self.INPUT, "Layer to update", [QgsProcessing.TypeVectorAnyGeometry]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.GRID_SIZE,
+                "De-duplication grid size (meters)",
+                QgsProcessingParameterNumber.Double,
+                PlacesReverseGeocoder.DEFAULT_GRID_SIZE_M,
+                minValue=0.0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.add_journal_parameter()
+        self.addOutput(QgsProcessingOutputVectorLayer(self.OUTPUT, "Updated layer"))
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Runs the unique lookups in parallel and writes the results to the
+        layer in chunks as they arrive.
+        """
+        layer = self.parameterAsVectorLayer(parameters, self.INPUT, context)
+        if layer is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.INPUT)
+            )
+        geocoder = PlacesReverseGeocoder(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        self.open_journal(parameters, context, geocoder.pool, feedback)
+        progress = self.progress_callback(feedback, lambda: len(geocoder.errors))
+        try:
+            count = geocoder.geocode_layer(
+                layer,
+                self.parameterAsDouble(parameters, self.GRID_SIZE, context),
+                lambda completed, total, _rate: progress(completed, total),
+            )
+        except ValueError as e:
+            raise QgsProcessingException(str(e)) from e
+        feedback.pushInfo(f"Looking up {count} unique positions.")
+        self.run_pool(geocoder.pool, feedback, geocoder.cancel)
+        for (lon, lat), error in geocoder.errors:
+            feedback.reportError(f"Lookup at {lon:.6f}, {lat:.6f} failed: {error}")
+        if geocoder.write_error is not None:
+            raise QgsProcessingException(geocoder.write_error)
+        feedback.pushInfo(
+            f"Updated {geocoder.updated} features at "
+            f"{geocoder.lookups_per_second():.1f} lookups per second."
+        )
+        return {self.OUTPUT: layer.id()}
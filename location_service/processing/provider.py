@@ -0,0 +1,68 @@
+import os
+
+from PyQt5.QtGui import QIcon
+from qgis.core import QgsProcessingProvider
+
+from .maps_algorithm import PrefetchTilesAlgorithm
+from .places_algorithm import (
+    AreaSweepAlgorithm,
+    ReverseGeocodeAlgorithm,
+    ReverseGeocodeInPlaceAlgorithm,
+    SearchTextAlgorithm,
+    SearchTextCsvAlgorithm,
+    SearchTextPagesAlgorithm,
+)
+from .routes_algorithm import (
+    CalculateRoutesAlgorithm,
+    IsolinesAlgorithm,
+    PlanRouteAlgorithm,
+    RouteMatrixAlgorithm,
+)
+
+
+class LocationServiceProvider(QgsProcessingProvider):
+    """
+    Exposes the plugin's places and routes functions as processing
+    algorithms, so they can be used in models, scripts and qgis_process.
+    """
+
+    PROVIDER_ID = "location_service"
+    PROVIDER_NAME = "Amazon Location Service"
+    ICON_PATH = os.path.join(os.path.dirname(__file__), "..", "ui", "icon.png")
+
+    def loadAlgorithms(self) -> None:
+        """
+        Registers the provider's algorithms.
+        """
+        for algorithm in (
+            SearchTextAlgorithm(),
+            SearchTextCsvAlgorithm(),
+            SearchTextPagesAlgorithm(),
+            AreaSweepAlgorithm(),
+            ReverseGeocodeAlgorithm(),
+            ReverseGeocodeInPlaceAlgorithm(),
+            CalculateRoutesAlgorithm(),
+            RouteMatrixAlgorithm(),
+            PlanRouteAlgorithm(),
+            IsolinesAlgorithm(),
+            PrefetchTilesAlgorithm(),
+        ):
+            self.addAlgorithm(algorithm)
+
+    def id(self) -> str:
+        """
+        Returns the unique provider id used in algorithm ids.
+        """
+        return self.PROVIDER_ID
+
+    def name(self) -> str:
+        """
+        Returns the display name of the provider.
+        """
+        return self.PROVIDER_NAME
+
+    def icon(self) -> QIcon:
+        """
+        Returns the provider icon.
+        """
+        return QIcon(self.ICON_PATH)
@@ -0,0 +1,676 @@
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QVariant
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsField,
+    QgsProcessing,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterField,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterString,
+    QgsWkbTypes,
+)
+
+from ..functions.isolines import IsolineFunctions
+from ..functions.route_matrix import RouteMatrixFunctions
+from ..functions.route_planner import RoutePlanner
+from ..functions.routes import RoutesFunctions
+from ..utils.feature_writer import StreamingFeatureWriter
+from ..utils.request_pool import RequestPool
+from .base_algorithm import ApiAlgorithm
+
+
+class CalculateRoutesAlgorithm(ApiAlgorithm):
+    """
+    Calculates one route for each origin and destination feature pair,
+    matching the two inputs by feature order.
+    """
+
+    ORIGINS = "ORIGINS"
+    ORIGIN_ID_FIELD = "ORIGIN_ID_FIELD"
+    DESTINATIONS = "DESTINATIONS"
+    DESTINATION_ID_FIELD = "DESTINATION_ID_FIELD"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+    FIELD_ORIGIN = "OriginId"
+    FIELD_DESTINATION = "DestinationId"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "calculateroutes"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Calculate routes (pairwise)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Calculates a route from the n-th origin feature to the n-th "
+            "destination feature. Each route leg becomes one line feature."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.ORIGINS, "Origins", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.ORIGIN_ID_FIELD,
+                "Origin id field",
+                parentLayerParameterName=self.ORIGINS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.DESTINATIONS, "Destinations", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.DESTINATION_ID_FIELD,
+                "Destination id field",
+                parentLayerParameterName=self.DESTINATIONS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.add_journal_parameter()
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Routes", QgsProcessing.TypeVectorLine
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Runs the route calculations in parallel and writes every leg to the
+        sink.
+        """
+        origins = self.parameterAsSource(parameters, self.ORIGINS, context)
+        destinations = self.parameterAsSource(parameters, self.DESTINATIONS, context)
+        if origins is None or destinations is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.ORIGINS)
+            )
+        origin_ids, origin_points = RouteMatrixFunctions.points_from_features(
+            origins.getFeatures(),
+            origins.sourceCrs(),
+            self.parameterAsString(parameters, self.ORIGIN_ID_FIELD, context) or None,
+        )
+        destination_ids, destination_points = RouteMatrixFunctions.points_from_features(
+            destinations.getFeatures(),
+            destinations.sourceCrs(),
+            self.parameterAsString(parameters, self.DESTINATION_ID_FIELD, context)
+            or None,
+        )
+        if len(origin_points) != len(destination_points):
+            feedback.pushInfo(
+                "Origins and destinations differ in length; "
+                "extra features are ignored."
+            )
+
+        routes = RoutesFunctions()
+        fields = routes.create_fields()
+        fields.append(QgsField(self.FIELD_ORIGIN, QVariant.String))
+        fields.append(QgsField(self.FIELD_DESTINATION, QVariant.String))
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            QgsWkbTypes.LineString,
+            QgsCoordinateReferenceSystem(RoutesFunctions.WGS84_CRS),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        pool = RequestPool(
+            routes.api_handler,
+            self.parameterAsInt(parameters, self.CONCURRENCY, context),
+        )
+        errors: List[str] = []
+        pool.on_progress = self.progress_callback(feedback, lambda: len(errors))
+        self.open_journal(parameters, context, pool, feedback)
+
+        writer = StreamingFeatureWriter(sink)
+
+        def write_result(result: Dict[str, Any], origin_id: str, dest: str) -> None:
+            for feature in routes.iter_features(fields, result):
+                feature.setAttributes([feature.attributes()[0], origin_id, dest])
+                writer.add_features([feature])
+
+        for origin_id, origin, destination_id, destination in zip(
+            origin_ids, origin_points, destination_ids, destination_points
+        ):
+            url, data = routes.build_routes_request(
+                origin[0], origin[1], destination[0], destination[1]
+            )
+            pool.submit(
+                url,
+                data,
+                lambda result, o=origin_id, d=destination_id: write_result(
+                    result, o, d
+                ),
+                lambda error, o=origin_id, d=destination_id: errors.append(
+                    f"Route {o} -> {d} failed: {error}"
+                ),
+            )
+        self.run_pool(pool, feedback, pool.cancel)
+        writer.close()
+        for message in errors:
+            feedback.reportError(message)
+        return {self.OUTPUT: dest_id}
+
+
+class RouteMatrixAlgorithm(ApiAlgorithm):
+    """
+    Computes the distance and duration between every origin and every
+    destination.
+    """
+
+    ORIGINS = "ORIGINS"
+    ORIGIN_ID_FIELD = "ORIGIN_ID_FIELD"
+    DESTINATIONS = "DESTINATIONS"
+    DESTINATION_ID_FIELD = "DESTINATION_ID_FIELD"
+    CONCURRENCY = "CONCURRENCY"
+    REQUESTS_PER_SECOND = "REQUESTS_PER_SECOND"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "routematrix"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Route matrix (many-to-many)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Computes the route distance (meters) and duration (seconds) for "
+            "every origin and destination pair and writes them to a table. "
+            "Up to 10 distinct origins and 10 distinct destinations are sent "
+            "per route-matrix request, and duplicate positions only once."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.ORIGINS, "Origins", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.ORIGIN_ID_FIELD,
+                "Origin id field",
+                parentLayerParameterName=self.ORIGINS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.DESTINATIONS, "Destinations", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.DESTINATION_ID_FIELD,
+                "Destination id field",
+                parentLayerParameterName=self.DESTINATIONS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.REQUESTS_PER_SECOND,
+                "Maximum requests per second",
+                QgsProcessingParameterNumber.Double,
+                RouteMatrixFunctions.DEFAULT_REQUESTS_PER_SECOND,
+                minValue=0.0,
+            )
+        )
+        self.add_journal_parameter()
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Route matrix", QgsProcessing.TypeVector
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Computes the matrix and writes one row per pair to the sink.
+        """
+        origins = self.parameterAsSource(parameters, self.ORIGINS, context)
+        destinations = self.parameterAsSource(parameters, self.DESTINATIONS, context)
+        if origins is None or destinations is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.ORIGINS)
+            )
+        origin_ids, origin_points = RouteMatrixFunctions.points_from_features(
+            origins.getFeatures(),
+            origins.sourceCrs(),
+            self.parameterAsString(parameters, self.ORIGIN_ID_FIELD, context) or None,
+        )
+        destination_ids, destination_points = RouteMatrixFunctions.points_from_features(
+            destinations.getFeatures(),
+            destinations.sourceCrs(),
+            self.parameterAsString(parameters, self.DESTINATION_ID_FIELD, context)
+            or None,
+        )
+
+        calculator = RouteMatrixFunctions(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context),
+            requests_per_second=self.parameterAsDouble(
+                parameters, self.REQUESTS_PER_SECOND, context
+            ),
+        )
+        self.open_journal(parameters, context, calculator.pool, feedback)
+        matrix = calculator.compute(
+            origin_ids,
+            origin_points,
+            destination_ids,
+            destination_points,
+            self.progress_callback(feedback, lambda: len(calculator.errors)),
+        )
+        self.run_pool(calculator.pool, feedback, calculator.cancel)
+        for error in calculator.errors:
+            feedback.reportError(f"Route request failed: {error}")
+
+        fields = matrix.create_fields()
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            QgsWkbTypes.NoGeometry,
+            QgsCoordinateReferenceSystem(),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+        writer = StreamingFeatureWriter(sink)
+        writer.add_features(matrix.iter_features(fields))
+        writer.close()
+        return {self.OUTPUT: dest_id}
+
+
+class PlanRouteAlgorithm(ApiAlgorithm):
+    """
+    Calculates one continuous route through every input stop, optionally
+    reordering the stops to shorten it.
+    """
+
+    STOPS = "STOPS"
+    ID_FIELD = "ID_FIELD"
+    OPTIMIZE = "OPTIMIZE"
+    FIXED_END = "FIXED_END"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "planroute"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Plan route through stops"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Calculates a route that starts at the first stop and visits every "
+            "other stop in feature order. Long stop lists are split into "
+            "chunks that are calculated in parallel and joined into a single "
+            "line. With optimization enabled the stops are reordered with a "
+            "nearest-neighbour tour improved by 2-opt, using a duration matrix "
+            "fetched with route-matrix requests."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.STOPS, "Stops", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.ID_FIELD,
+                "Stop id field",
+                parentLayerParameterName=self.STOPS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(self.OPTIMIZE, "Optimize stop order", False)
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.FIXED_END, "Keep the last stop as destination", False
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Planned route", QgsProcessing.TypeVectorLine
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Optionally orders the stops, routes the chunks in parallel and writes
+        the stitched route to the sink.
+        """
+        source = self.parameterAsSource(parameters, self.STOPS, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.STOPS)
+            )
+        stop_ids, stops = RouteMatrixFunctions.points_from_features(
+            source.getFeatures(),
+            source.sourceCrs(),
+            self.parameterAsString(parameters, self.ID_FIELD, context) or None,
+        )
+        if len(stops) < 2:
+            raise QgsProcessingException("At least two stops are required.")
+        planner = RoutePlanner(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        order = None
+        if self.parameterAsBool(parameters, self.OPTIMIZE, context):
+            feedback.pushInfo("Fetching the duration matrix.")
+            planner.start_matrix(
+                stops, self.progress_callback(feedback, lambda: len(planner.errors))
+            )
+            self.run_pool(planner.pool, feedback, planner.cancel)
+            planner.finish_matrix()
+            for error in planner.errors:
+                feedback.reportError(f"Route matrix request failed: {error}")
+            if feedback.isCanceled():
+                return {}
+            order = planner.optimize_order(
+                stops, self.parameterAsBool(parameters, self.FIXED_END, context)
+            )
+        chunk_count = planner.start_routes(
+            stops,
+            order,
+            self.progress_callback(feedback, lambda: len(planner.errors)),
+        )
+        feedback.pushInfo(f"Routing {len(stops)} stops in {chunk_count} requests.")
+        self.run_pool(planner.pool, feedback, planner.cancel)
+        for error in planner.errors:
+            feedback.reportError(f"Route request failed: {error}")
+        route = planner.stitch()
+
+        fields = planner.create_fields()
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            QgsWkbTypes.LineString,
+            QgsCoordinateReferenceSystem(RoutesFunctions.WGS84_CRS),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+        writer = StreamingFeatureWriter(sink)
+        writer.add_features([planner.build_feature(fields, route, stop_ids)])
+        writer.close()
+        return {self.OUTPUT: dest_id}
+
+
+class IsolinesAlgorithm(ApiAlgorithm):
+    """
+    Calculates the area reachable from every origin within several travel
+    times or distances.
+    """
+
+    ORIGINS = "ORIGINS"
+    ID_FIELD = "ID_FIELD"
+    THRESHOLD_TYPE = "THRESHOLD_TYPE"
+    THRESHOLDS = "THRESHOLDS"
+    CONCURRENCY = "CONCURRENCY"
+    OUTPUT = "OUTPUT"
+    COVERAGE = "COVERAGE"
+    THRESHOLD_TYPES = (
+        (IsolineFunctions.THRESHOLD_TIME, "Travel time (seconds)"),
+        (IsolineFunctions.THRESHOLD_DISTANCE, "Distance (meters)"),
+    )
+
+    def name(self) -> str:
+        """
+        Returns the unique algorithm name.
+        """
+        return "isolines"
+
+    def displayName(self) -> str:
+        """
+        Returns the translated algorithm name.
+        """
+        return "Isolines (service areas)"
+
+    def shortHelpString(self) -> str:
+        """
+        Returns a short description of the algorithm.
+        """
+        return (
+            "Calculates reachability polygons around every origin for each "
+            "threshold, with the requests running in parallel. Optionally "
+            "dissolves the overlapping polygons of each threshold into "
+            "coverage areas."
+        )
+
+    def initAlgorithm(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Declares the algorithm parameters.
+        """
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.ORIGINS, "Origins", [QgsProcessing.TypeVectorPoint]
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.ID_FIELD,
+                "Origin id field",
+                parentLayerParameterName=self.ORIGINS,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.THRESHOLD_TYPE,
+                "Threshold type",
+                [label for _, label in self.THRESHOLD_TYPES],
+                defaultValue=0,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.THRESHOLDS, "Thresholds (comma separated)", "300,600,900"
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CONCURRENCY,
+                "Concurrent requests",
+                QgsProcessingParameterNumber.Integer,
+                self.DEFAULT_CONCURRENCY,
+                minValue=1,
+                maxValue=self.MAX_CONCURRENCY,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, "Isolines", QgsProcessing.TypeVectorPolygon
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.COVERAGE,
+                "Dissolved coverage",
+                QgsProcessing.TypeVectorPolygon,
+                optional=True,
+                createByDefault=False,
+            )
+        )
+
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """
+        Requests the isolines in parallel, writes them to the sink and
+        optionally dissolves them into coverage areas.
+        """
+        source = self.parameterAsSource(parameters, self.ORIGINS, context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.ORIGINS)
+            )
+        try:
+            thresholds = sorted(
+                {
+                    float(value)
+                    for value in self.parameterAsString(
+                        parameters, self.THRESHOLDS, context
+                    ).split(",")
+                    if value.strip()
+                }
+            )
+        except ValueError as e:
+            raise QgsProcessingException(f"Invalid thresholds: {e}") from e
+        if not thresholds:
+            raise QgsProcessingException("At least one threshold is required.")
+        threshold_type = self.THRESHOLD_TYPES[
+            self.parameterAsEnum(parameters, self.THRESHOLD_TYPE, context)
+        ][0]
+        origin_ids, origins = RouteMatrixFunctions.points_from_features(
+            source.getFeatures(),
+            source.sourceCrs(),
+            self.parameterAsString(parameters, self.ID_FIELD, context) or None,
+        )
+
+        isolines = IsolineFunctions(
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        )
+        wgs84 = QgsCoordinateReferenceSystem(RoutesFunctions.WGS84_CRS)
+        fields = isolines.create_fields()
+        sink, dest_id = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, QgsWkbTypes.MultiPolygon, wgs84
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+        coverage_sink, coverage_id = self.parameterAsSink(
+            parameters,
+            self.COVERAGE,
+            context,
+            isolines.create_coverage_fields(),
+            QgsWkbTypes.MultiPolygon,
+            wgs84,
+        )
+        writer = StreamingFeatureWriter(sink)
+        isolines.compute(
+            origin_ids,
+            origins,
+            thresholds,
+            writer,
+            threshold_type,
+            self.progress_callback(feedback, lambda: len(isolines.errors)),
+            keep_features=coverage_sink is not None,
+        )
+        self.run_pool(isolines.pool, feedback, isolines.cancel)
+        writer.close()
+        for origin_id, error in isolines.errors:
+            feedback.reportError(f"Isolines of origin {origin_id} failed: {error}")
+        results = {self.OUTPUT: dest_id}
+        if coverage_sink is not None and not feedback.isCanceled():
+            feedback.pushInfo("Dissolving overlapping isolines.")
+            coverage_writer = StreamingFeatureWriter(coverage_sink)
+            coverage_writer.add_features(
+                isolines.dissolve(isolines.create_coverage_fields(), isolines.features)
+            )
+            coverage_writer.close()
+            results[self.COVERAGE] = coverage_id
+        return results
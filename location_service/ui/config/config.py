@@ -1,9 +1,9 @@
 import os
 
 from PyQt5.QtWidgets import QDialog, QMessageBox
-from qgis.PyQt import uic
 
 from ...utils.configuration_handler import ConfigurationHandler
+from ...utils.ui_loader import load_ui
 
 
 class ConfigUi(QDialog):
@@ -22,7 +22,7 @@ class ConfigUi(QDialog):
         existing configuration values.
         """
         super().__init__()
-        self.ui = uic.loadUi(self.UI_PATH, self)
+        self.ui = load_ui(self.UI_PATH, self)
         self.button_save.clicked.connect(self._save)
         self.button_cancel.clicked.connect(self._cancel)
         self.configuration_handler = ConfigurationHandler()
@@ -1,10 +1,10 @@
 import os
 
 from PyQt5.QtWidgets import QDialog, QMessageBox
-from qgis.PyQt import uic
 
 from ...functions.maps import MapsFunctions
 from ...utils.configuration_handler import ConfigurationHandler
+from ...utils.ui_loader import load_ui
 
 
 class MapsUi(QDialog):
@@ -14,19 +14,22 @@ class MapsUi(QDialog):
     """
 
     UI_PATH = os.path.join(os.path.dirname(__file__), "maps.ui")
-    MAP_STYLES = ("Standard", "Monochrome", "Hybrid", "Satellite")
+    MAP_STYLES = MapsFunctions.MAP_STYLES
 
     def __init__(self) -> None:
         """
         Initializes the Maps dialog, loads UI components, and populates the maps options.
         """
         super().__init__()
-        self.ui = uic.loadUi(self.UI_PATH, self)
+        self.ui = load_ui(self.UI_PATH, self)
         self.button_add.clicked.connect(self._add)
         self.button_cancel.clicked.connect(self._cancel)
         self.maps = MapsFunctions()
         self.configuration_handler = ConfigurationHandler()
         self._populate_maps_options()
+        self.offline_checkBox.setChecked(
+            self.configuration_handler.get_bool_setting(MapsFunctions.KEY_TILE_OFFLINE)
+        )
 
     def _populate_maps_options(self) -> None:
         """
@@ -41,7 +44,11 @@ class MapsUi(QDialog):
         """
         try:
             select_style = self.style_comboBox.currentText()
-            self.maps.add_xyz_tile_layer(select_style)
+            offline = self.offline_checkBox.isChecked()
+            self.configuration_handler.store_setting(
+                MapsFunctions.KEY_TILE_OFFLINE, "true" if offline else "false"
+            )
+            self.maps.add_xyz_tile_layer(select_style, offline)
             self.close()
         except Exception as e:
             QMessageBox.critical(
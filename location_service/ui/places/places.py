@@ -1,11 +1,19 @@
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
-from PyQt5.QtWidgets import QDialog, QMessageBox
-from qgis.PyQt import uic
+from PyQt5.QtCore import QStringListModel, Qt, QTimer
+from PyQt5.QtGui import QShowEvent
+from PyQt5.QtWidgets import QCompleter, QDialog, QMessageBox
+from qgis.core import QgsProject
 from qgis.utils import iface
 
+from ...functions.layer_tasks import SearchTextTask
 from ...functions.places import PlacesFunctions
 from ...utils.click_handler import MapClickCoordinateUpdater
+from ...utils.external_api_handler import ApiRequest
+from ...utils.request_factory import ApiRequestFactory
+from ...utils.transform_cache import Wgs84Transformer
+from ...utils.ui_loader import load_ui
 
 
 class PlacesUi(QDialog):
@@ -14,6 +22,7 @@ class PlacesUi(QDialog):
     """
 
     UI_PATH = os.path.join(os.path.dirname(__file__), "places.ui")
+    KEY_SUGGEST_DEBOUNCE = "suggest_debounce_ms"
 
     def __init__(self) -> None:
         """
@@ -21,17 +30,40 @@ class PlacesUi(QDialog):
         the places options.
         """
         super().__init__()
-        self.ui = uic.loadUi(self.UI_PATH, self)
+        self.ui = load_ui(self.UI_PATH, self)
         self.canvas = iface.mapCanvas()
         self.button_click.clicked.connect(self._click)
         self.button_search.clicked.connect(self._search)
         self.button_cancel.clicked.connect(self._cancel)
         self.places_comboBox.addItem("SearchText")
         self.places = PlacesFunctions()
+        self._suggest_request: Optional[ApiRequest] = None
+        self._suggest_model = QStringListModel(self)
+        self._completer = QCompleter(self._suggest_model, self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.text_lineEdit.setCompleter(self._completer)
+        self._suggest_timer = QTimer(self)
+        self._suggest_timer.setSingleShot(True)
+        self._suggest_timer.timeout.connect(self._request_suggestions)
+        self.text_lineEdit.textEdited.connect(self._on_text_edited)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """
+        Opens connections to the API endpoints while the user fills in the
+        dialog.
+
+        Args:
+            event (QShowEvent): The show event.
+        """
+        super().showEvent(event)
+        ApiRequestFactory().preconnect()
 
     def _search(self) -> None:
         """
-        Performs a places search and visualizes the results on the map.
+        Starts a background places search. The results are added to the
+        map as a point layer when the task finishes, and the dialog closes
+        right away so that several searches can run at once.
         """
         text = self.text_lineEdit.text()
         lon = self.lon_lineEdit.text()
@@ -43,20 +75,115 @@ class PlacesUi(QDialog):
                 "All fields (Text, Longitude, Latitude) must be filled in.",
             )
             return
+        self._cancel_suggestions()
+        SearchTextTask(text, lon, lat, self._on_search_failed).start()
+        self.close()
+
+    def _bias_position(self) -> Tuple[float, float]:
+        """
+        Returns the position suggestions are biased towards: the entered
+        coordinates, or the center of the map when they are empty.
+
+        Returns:
+            Tuple[float, float]: Longitude and latitude.
+        """
         try:
-            result = self.places.search_text(text, lon, lat)
-            self.places.add_point_layer(result)
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Search Error", f"Failed to search places: {e!r}"
+            return float(self.lon_lineEdit.text()), float(self.lat_lineEdit.text())
+        except ValueError:
+            center = Wgs84Transformer.transform_point(
+                self.canvas.center(), QgsProject.instance().crs()
             )
-        finally:
-            self.close()
+            return center.x(), center.y()
+
+    def _on_text_edited(self, text: str) -> None:
+        """
+        Shows cached suggestions for the typed text right away and schedules
+        a request for the rest once typing pauses. A request still in flight
+        for earlier text is cancelled.
+
+        Args:
+            text (str): The current query text.
+        """
+        self._cancel_suggestions()
+        if len(text.strip()) < self.places.SUGGEST_MIN_CHARS:
+            self._show_suggestions([])
+            return
+        lon, lat = self._bias_position()
+        cached = self.places.cached_suggestions(text, lon, lat)
+        if cached is not None:
+            items, complete = cached
+            self._show_suggestions(items)
+            if complete:
+                return
+        debounce_ms = self.places.configuration_handler.get_int_setting(
+            self.KEY_SUGGEST_DEBOUNCE
+        )
+        self._suggest_timer.start(max(0, debounce_ms))
+
+    def _request_suggestions(self) -> None:
+        """
+        Requests suggestions for the text typed when the debounce timer
+        fired.
+        """
+        text = self.text_lineEdit.text()
+        lon, lat = self._bias_position()
+        self._suggest_request = self.places.suggest_async(
+            text,
+            lon,
+            lat,
+            lambda items: self._on_suggestions(text, items),
+            lambda error: None,
+        )
+
+    def _on_suggestions(self, text: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Shows the suggestions of a reply unless the text changed meanwhile.
+
+        Args:
+            text (str): The text the suggestions were requested for.
+            items (List[Dict[str, Any]]): The suggestion items.
+        """
+        self._suggest_request = None
+        if text == self.text_lineEdit.text():
+            self._show_suggestions(items)
+
+    def _show_suggestions(self, items: List[Dict[str, Any]]) -> None:
+        """
+        Replaces the entries of the completer popup.
+
+        Args:
+            items (List[Dict[str, Any]]): The suggestion items.
+        """
+        titles = list(dict.fromkeys(self.places.suggestion_title(i) for i in items))
+        self._suggest_model.setStringList([title for title in titles if title])
+        if titles and self.text_lineEdit.hasFocus():
+            self._completer.complete()
+
+    def _cancel_suggestions(self) -> None:
+        """
+        Stops the debounce timer and cancels a suggest request in flight.
+        """
+        self._suggest_timer.stop()
+        if self._suggest_request is not None:
+            self.places.api_handler.cancel_request(self._suggest_request)
+            self._suggest_request = None
+
+    def _on_search_failed(self, error: Exception) -> None:
+        """
+        Reports a failed search to the user.
+
+        Args:
+            error (Exception): The failure raised by the request.
+        """
+        QMessageBox.critical(
+            self, "Search Error", f"Failed to search places: {error!r}"
+        )
 
     def _cancel(self) -> None:
         """
         Closes the dialog without making changes.
         """
+        self._cancel_suggestions()
         self.close()
 
     def _click(self) -> None:
@@ -1,11 +1,13 @@
 import os
 
+from PyQt5.QtGui import QShowEvent
 from PyQt5.QtWidgets import QDialog, QMessageBox
-from qgis.PyQt import uic
 from qgis.utils import iface
 
-from ...functions.routes import RoutesFunctions
+from ...functions.layer_tasks import CalculateRoutesTask
 from ...utils.click_handler import MapClickCoordinateUpdater
+from ...utils.request_factory import ApiRequestFactory
+from ...utils.ui_loader import load_ui
 
 
 class RoutesUi(QDialog):
@@ -21,31 +23,48 @@ class RoutesUi(QDialog):
         the routes options.
         """
         super().__init__()
-        self.ui = uic.loadUi(self.UI_PATH, self)
+        self.ui = load_ui(self.UI_PATH, self)
         self.canvas = iface.mapCanvas()
         self.st_button_click.clicked.connect(self._st_click)
         self.ed_button_click.clicked.connect(self._ed_click)
         self.button_search.clicked.connect(self._search)
         self.button_cancel.clicked.connect(self._cancel)
         self.routes_comboBox.addItem("CalculateRoutes")
-        self.routes = RoutesFunctions()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """
+        Opens connections to the API endpoints while the user fills in the
+        dialog.
+
+        Args:
+            event (QShowEvent): The show event.
+        """
+        super().showEvent(event)
+        ApiRequestFactory().preconnect()
 
     def _search(self) -> None:
         """
-        Retrieves coordinates from the UI, performs a route calculation,
-        and visualizes the result as a line layer on the map.
+        Retrieves coordinates from the UI and starts a background route
+        calculation. The route is added to the map as a line layer when the
+        task finishes.
         """
         st_lon = self.st_lon_lineEdit.text()
         st_lat = self.st_lat_lineEdit.text()
         ed_lon = self.ed_lon_lineEdit.text()
         ed_lat = self.ed_lat_lineEdit.text()
-        try:
-            result = self.routes.calculate_routes(st_lon, st_lat, ed_lon, ed_lat)
-            self.routes.add_line_layer(result)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to calculate routes: {e!r}")
-        finally:
-            self.close()
+        CalculateRoutesTask(
+            st_lon, st_lat, ed_lon, ed_lat, self._on_search_failed
+        ).start()
+        self.close()
+
+    def _on_search_failed(self, error: Exception) -> None:
+        """
+        Reports a failed route calculation to the user.
+
+        Args:
+            error (Exception): The failure raised by the request.
+        """
+        QMessageBox.critical(self, "Error", f"Failed to calculate routes: {error!r}")
 
     def _cancel(self) -> None:
         """
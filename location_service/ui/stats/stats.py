@@ -0,0 +1,109 @@
+import os
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (
+    QDockWidget,
+    QFileDialog,
+    QMessageBox,
+    QTableWidgetItem,
+)
+
+from ...utils.external_api_handler import ExternalApiHandler
+from ...utils.instrumentation import Instrumentation
+from ...utils.ui_loader import load_ui
+
+
+class StatsDock(QDockWidget):
+    """
+    A dockable panel showing per-phase timings of the recent API calls and
+    layer builds.
+    """
+
+    UI_PATH = os.path.join(os.path.dirname(__file__), "stats.ui")
+    REFRESH_INTERVAL_MS = 1000
+    COLUMNS = (
+        ("operation", "Operation"),
+        ("phase", "Phase"),
+        ("count", "Count"),
+        ("mean_ms", "Mean (ms)"),
+        ("p50_ms", "P50 (ms)"),
+        ("p95_ms", "P95 (ms)"),
+        ("max_ms", "Max (ms)"),
+    )
+    EXPORT_FILTER = "JSON Lines (*.jsonl)"
+
+    def __init__(self) -> None:
+        """
+        Initializes the panel, loads the UI components and starts the
+        periodic refresh while the panel is visible.
+        """
+        super().__init__()
+        self.ui = load_ui(self.UI_PATH, self)
+        self.stats_table.setColumnCount(len(self.COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([label for _, label in self.COLUMNS])
+        self.button_clear.clicked.connect(self._clear)
+        self.button_export.clicked.connect(self._export)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+
+    def refresh(self) -> None:
+        """
+        Reloads the summary table from the instrumentation ring buffer.
+        """
+        rows = Instrumentation.summary()
+        self.stats_table.setSortingEnabled(False)
+        self.stats_table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, (key, _) in enumerate(self.COLUMNS):
+                value = row[key]
+                item = QTableWidgetItem()
+                if isinstance(value, float):
+                    item.setData(Qt.DisplayRole, round(value, 1))
+                else:
+                    item.setData(Qt.DisplayRole, value)
+                self.stats_table.setItem(row_index, column_index, item)
+        self.stats_table.setSortingEnabled(True)
+        counters = ExternalApiHandler.coalescing_stats()
+        self.summary_label.setText(
+            f"{len(Instrumentation.records())} records, "
+            f"{counters['requests']} requests, "
+            f"{counters['network_requests']} sent, "
+            f"{counters['coalesced']} coalesced"
+        )
+
+    def _on_visibility_changed(self, visible: bool) -> None:
+        """
+        Refreshes only while the panel is shown.
+
+        Args:
+            visible (bool): Whether the panel became visible.
+        """
+        if visible:
+            self.refresh()
+            self.refresh_timer.start(self.REFRESH_INTERVAL_MS)
+        else:
+            self.refresh_timer.stop()
+
+    def _clear(self) -> None:
+        """
+        Drops the recorded timings.
+        """
+        Instrumentation.clear()
+        self.refresh()
+
+    def _export(self) -> None:
+        """
+        Appends the recorded timings to a JSON-lines file chosen by the user.
+        """
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export timings", "", self.EXPORT_FILTER
+        )
+        if not path:
+            return
+        try:
+            count = Instrumentation.export_jsonl(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export timings: {e!r}")
+            return
+        QMessageBox.information(self, "Export", f"Exported {count} records.")
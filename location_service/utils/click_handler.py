@@ -1,13 +1,10 @@
 from typing import Any
 
-from qgis.core import (
-    QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
-    QgsPointXY,
-    QgsProject,
-)
+from qgis.core import QgsPointXY, QgsProject
 from qgis.gui import QgsMapCanvas, QgsMapMouseEvent, QgsMapTool
 
+from .transform_cache import Wgs84Transformer
+
 
 class MapClickCoordinateUpdater(QgsMapTool):
     """
@@ -77,7 +74,4 @@ class MapClickCoordinateUpdater(QgsMapTool):
             QgsPointXY: The transformed point in WGS84 coordinates, suitable for
                         global mapping applications.
         """
-        canvas_crs = QgsProject.instance().crs()
-        wgs84_crs = QgsCoordinateReferenceSystem(self.WGS84_CRS)
-        transform = QgsCoordinateTransform(canvas_crs, wgs84_crs, QgsProject.instance())
-        return transform.transform(map_point)
+        return Wgs84Transformer.transform_point(map_point, QgsProject.instance().crs())
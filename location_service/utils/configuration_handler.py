@@ -1,4 +1,4 @@
-from typing import Any, ClassVar, Dict
+from typing import Any, Callable, ClassVar, Dict, List
 
 from PyQt5.QtCore import QSettings
 
@@ -11,10 +11,31 @@ class ConfigurationHandler:
 
     _instance: ClassVar[None] = None
     _settings: ClassVar[Dict[str, Any]] = {}
+    _listeners: ClassVar[List[Callable[[str], None]]] = []
     SETTING_GROUP: ClassVar[str] = "/location-service"
     DEFAULT_SETTINGS: ClassVar[Dict[str, str]] = {
         "region_value": "",
         "apikey_value": "",
+        "cache_enabled": "true",
+        "cache_ttl_seconds": "86400",
+        "cache_max_size_mb": "100",
+        "cache_coordinate_precision": "5",
+        "coalesce_requests": "true",
+        "rate_limit_places_rps": "10",
+        "rate_limit_routes_rps": "10",
+        "rate_limit_burst": "10",
+        "adaptive_concurrency_max": "32",
+        "retry_base_delay_ms": "500",
+        "retry_max_delay_ms": "30000",
+        "tile_offline_mode": "false",
+        "tile_cache_max_size_mb": "500",
+        "memo_enabled": "true",
+        "memo_radius_m": "25",
+        "memo_max_entries": "1000",
+        "suggest_enabled": "true",
+        "suggest_debounce_ms": "250",
+        "http2_enabled": "true",
+        "preconnect_enabled": "true",
     }
 
     def __new__(cls) -> "ConfigurationHandler":
@@ -48,15 +69,33 @@ class ConfigurationHandler:
             self._settings[key] = qsettings.value(key, default)
         qsettings.endGroup()
 
+    @classmethod
+    def add_listener(cls, callback: Callable[[str], None]) -> None:
+        """
+        Registers a callback invoked with the key of every setting whose
+        value is changed through store_setting, so that readers can cache
+        settings instead of looking them up for every use.
+
+        Args:
+            callback (Callable[[str], None]): Called with the changed key.
+        """
+        if callback not in cls._listeners:
+            cls._listeners.append(callback)
+
     def store_setting(self, key: str, value: Any) -> None:
         """
-        Stores a single setting value in persistent storage.
+        Stores a single setting value in persistent storage and notifies the
+        listeners if the value changed.
         """
+        previous = self._settings.get(key)
         qsettings = QSettings()
         qsettings.beginGroup(self.SETTING_GROUP)
         qsettings.setValue(key, value)
         qsettings.endGroup()
         self._settings[key] = qsettings.value(key, value)
+        if self._settings[key] != previous:
+            for callback in list(self._listeners):
+                callback(key)
 
     def get_setting(self, key: str) -> Any:
         """
@@ -70,6 +109,37 @@ class ConfigurationHandler:
         """
         return self._settings.get(key, None)
 
+    def get_int_setting(self, key: str) -> int:
+        """
+        Retrieves a setting value converted to an integer.
+
+        Args:
+            key (str): The key of the setting to retrieve.
+
+        Returns:
+            int: The stored value, or the default value if the stored one
+            is not a valid integer.
+        """
+        try:
+            return int(self._settings.get(key))
+        except (TypeError, ValueError):
+            return int(self.DEFAULT_SETTINGS[key])
+
+    def get_bool_setting(self, key: str) -> bool:
+        """
+        Retrieves a setting value converted to a boolean.
+
+        Args:
+            key (str): The key of the setting to retrieve.
+
+        Returns:
+            bool: True if the stored value is a true-like string or boolean.
+        """
+        value = self._settings.get(key, self.DEFAULT_SETTINGS.get(key))
+        if isinstance(value, bool):
+            return value
+        return str(value).lower() in ("1", "true", "yes", "on")
+
     def get_settings(self) -> Dict[str, Any]:
         """
         Retrieves all settings as a dictionary.
@@ -1,9 +1,247 @@
+import contextlib
+import hashlib
 import json
-from typing import Any, Dict, Optional
+import os
+import sqlite3
+import threading
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-from PyQt5.QtCore import QEventLoop, QUrl
+from PyQt5.QtCore import QEventLoop, QTimer
 from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
-from qgis.core import QgsNetworkAccessManager
+from qgis.core import QgsApplication, QgsNetworkAccessManager
+
+from .configuration_handler import ConfigurationHandler
+from .instrumentation import Instrumentation, OperationTimer
+from .request_factory import ApiRequestFactory
+from .response_cache import ResponseCache
+from .result_models import FieldSet, decode_json
+
+SuccessCallback = Callable[[Dict[str, Any]], None]
+ErrorCallback = Callable[[Exception], None]
+
+
+class ApiRequestError(RuntimeError):
+    """
+    Raised when an API request fails at the network or HTTP level.
+    """
+
+    TRANSIENT_ERROR_CODES: ClassVar[FrozenSet[int]] = frozenset(
+        {
+            QNetworkReply.TimeoutError,
+            QNetworkReply.RemoteHostClosedError,
+            QNetworkReply.TemporaryNetworkFailureError,
+            QNetworkReply.NetworkSessionFailedError,
+            QNetworkReply.ProxyTimeoutError,
+            QNetworkReply.InternalServerError,
+            QNetworkReply.ServiceUnavailableError,
+            QNetworkReply.UnknownServerError,
+        }
+    )
+    TRANSIENT_HTTP_STATUSES: ClassVar[FrozenSet[int]] = frozenset(
+        {429, 500, 502, 503, 504}
+    )
+
+    def __init__(
+        self,
+        message: str,
+        error_code: int = QNetworkReply.UnknownNetworkError,
+        http_status: Optional[int] = None,
+        retry_after_ms: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes the error with the Qt network error code and HTTP status.
+
+        Args:
+            message (str): Human readable description of the failure.
+            error_code (int): The QNetworkReply.NetworkError value.
+            http_status (Optional[int]): The HTTP status code, if one was received.
+            retry_after_ms (Optional[int]): Delay requested by a Retry-After
+                header, if the response carried one.
+        """
+        super().__init__(message)
+        self.error_code = error_code
+        self.http_status = http_status
+        self.retry_after_ms = retry_after_ms
+
+    @property
+    def is_transient(self) -> bool:
+        """
+        Tells whether retrying the same request may succeed.
+
+        Returns:
+            bool: True for timeouts, dropped connections, throttling and
+            server-side errors.
+        """
+        if self.http_status in self.TRANSIENT_HTTP_STATUSES:
+            return True
+        return self.error_code in self.TRANSIENT_ERROR_CODES
+
+
+class ApiRequest:
+    """
+    A handle for an asynchronous API request that is queued or in flight.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback],
+        timeout_ms: int,
+        use_cache: bool = True,
+        fields: Optional[FieldSet] = None,
+    ) -> None:
+        """
+        Initializes the request handle.
+
+        Args:
+            url (str): The URL the request is posted to.
+            data (Dict[str, Any]): The JSON body of the request.
+            on_success (SuccessCallback): Called with the decoded response.
+            on_error (Optional[ErrorCallback]): Called with the failure.
+            timeout_ms (int): Milliseconds before the request is aborted.
+            use_cache (bool): Serve and store the response through the
+                response cache.
+            fields (Optional[FieldSet]): Object keys kept when decoding the
+                reply, or None to keep everything.
+        """
+        self.url = url
+        self.data = data
+        self.on_success = on_success
+        self.on_error = on_error
+        self.timeout_ms = timeout_ms
+        self.use_cache = use_cache
+        self.fields = fields
+        self.from_cache = False
+        self.reply: Optional[QNetworkReply] = None
+        self.timer: Optional[QTimer] = None
+        self.timing: Optional[OperationTimer] = None
+        self.timed_out = False
+        self.cancelled = False
+        self.finished = False
+        self.handler: Optional[ExternalApiHandler] = None
+        self.key: Optional[Tuple[int, str]] = None
+        self.leader: Optional[ApiRequest] = None
+        self.followers: List[ApiRequest] = []
+
+    def has_active_followers(self) -> bool:
+        """
+        Tells whether other callers are still waiting on this request's reply.
+
+        Returns:
+            bool: True if at least one coalesced request is not cancelled.
+        """
+        return any(not follower.cancelled for follower in self.followers)
+
+
+class PendingResponse:
+    """
+    A request started ahead of time whose reply is collected later by
+    blocking, e.g. the next page of results prefetched while the current
+    one is being written.
+    """
+
+    CANCEL_POLL_MS = 100
+
+    def __init__(
+        self,
+        handler: "ExternalApiHandler",
+        url: str,
+        data: Dict[str, Any],
+        use_cache: bool = True,
+        fields: Optional[FieldSet] = None,
+    ) -> None:
+        """
+        Starts the request.
+
+        Args:
+            handler (ExternalApiHandler): The handler sending the request.
+            url (str): The URL the request is posted to.
+            data (Dict[str, Any]): The JSON body of the request.
+            use_cache (bool): Serve and store the response through the
+                response cache.
+            fields (Optional[FieldSet]): Object keys kept when decoding the
+                reply, or None to keep everything.
+        """
+        self.handler = handler
+        self._outcome: Dict[str, Any] = {}
+        self._event_loop: Optional[QEventLoop] = None
+        self.request = handler.send_json_post_request_async(
+            url,
+            data,
+            lambda result: self._finish("result", result),
+            lambda error: self._finish("error", error),
+            use_cache=use_cache,
+            fields=fields,
+        )
+
+    def _finish(self, key: str, value: Any) -> None:
+        """
+        Stores the outcome and wakes up a waiting caller.
+
+        Args:
+            key (str): "result" or "error".
+            value (Any): The decoded response or the failure.
+        """
+        self._outcome[key] = value
+        if self._event_loop is not None:
+            self._event_loop.quit()
+
+    def done(self) -> bool:
+        """
+        Tells whether the reply has arrived.
+
+        Returns:
+            bool: True once the request succeeded or failed.
+        """
+        return bool(self._outcome)
+
+    def result(
+        self, is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the reply while processing events.
+
+        Args:
+            is_cancelled (Optional[Callable[[], bool]]): Polled while
+                waiting. The request is cancelled once it returns True.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded response, or None if the
+            wait was cancelled.
+
+        Raises:
+            Exception: The failure reported by the request.
+        """
+        if not self.done():
+            self._event_loop = QEventLoop()
+            timer = QTimer()
+            if is_cancelled is not None:
+
+                def check_cancelled() -> None:
+                    if is_cancelled():
+                        self.cancel()
+                        self._event_loop.quit()
+
+                timer.timeout.connect(check_cancelled)
+                timer.start(self.CANCEL_POLL_MS)
+            self._event_loop.exec_()
+            timer.stop()
+            self._event_loop = None
+        if "error" in self._outcome:
+            raise self._outcome["error"]
+        return self._outcome.get("result")
+
+    def cancel(self) -> None:
+        """
+        Cancels the request if it has not finished.
+        """
+        self.handler.cancel_request(self.request)
 
 
 class ExternalApiHandler:
@@ -11,60 +249,577 @@ class ExternalApiHandler:
     A utility class for handling external API requests using the QGIS network manager.
     """
 
-    JSON_CONTENT_TYPE = "application/json"
+    JSON_CONTENT_TYPE = ApiRequestFactory.JSON_CONTENT_TYPE
     UTF8_ENCODING = "utf-8"
+    REQUEST_TIMEOUT_MS = 30000
+    CACHE_DIRECTORY = "location_service"
+    CACHE_FILE_NAME = "response_cache.sqlite"
+    KEY_CACHE_ENABLED = "cache_enabled"
+    KEY_CACHE_TTL = "cache_ttl_seconds"
+    KEY_CACHE_MAX_SIZE = "cache_max_size_mb"
+    KEY_CACHE_PRECISION = "cache_coordinate_precision"
+    KEY_COALESCE_ENABLED = "coalesce_requests"
+
+    _response_cache: ClassVar[Optional[ResponseCache]] = None
+    _in_flight: ClassVar[Dict[Tuple[int, str], ApiRequest]] = {}
+    _in_flight_lock: ClassVar[threading.Lock] = threading.Lock()
+    _request_count: ClassVar[int] = 0
+    _network_request_count: ClassVar[int] = 0
+    _coalesced_count: ClassVar[int] = 0
+    _handlers: ClassVar["weakref.WeakSet[ExternalApiHandler]"] = weakref.WeakSet()
+    _handlers_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self) -> None:
         """
         Initializes the network manager instance from QGIS core libraries.
         """
         self.network_manager = QgsNetworkAccessManager.instance()
+        self.configuration_handler = ConfigurationHandler()
+        self.request_factory = ApiRequestFactory(self.configuration_handler)
+        self._pending_requests: List[ApiRequest] = []
+        self._thread_id = threading.get_ident()
+        with ExternalApiHandler._handlers_lock:
+            ExternalApiHandler._handlers.add(self)
+
+    def response_cache(self) -> Optional[ResponseCache]:
+        """
+        Returns the response cache shared by all handlers, configured from
+        the current settings.
+
+        Returns:
+            Optional[ResponseCache]: The cache, or None if caching is disabled.
+        """
+        settings = self.configuration_handler
+        if not settings.get_bool_setting(self.KEY_CACHE_ENABLED):
+            return None
+        cache = ExternalApiHandler._response_cache
+        if cache is None:
+            path = os.path.join(
+                QgsApplication.qgisSettingsDirPath(),
+                self.CACHE_DIRECTORY,
+                self.CACHE_FILE_NAME,
+            )
+            cache = ResponseCache(path)
+            ExternalApiHandler._response_cache = cache
+        cache.ttl_seconds = settings.get_int_setting(self.KEY_CACHE_TTL)
+        cache.max_size_bytes = (
+            settings.get_int_setting(self.KEY_CACHE_MAX_SIZE) * 1024 * 1024
+        )
+        cache.precision = settings.get_int_setting(self.KEY_CACHE_PRECISION)
+        return cache
+
+    def _cache_lookup(self, url: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Reads a response from the cache, treating database errors as misses.
+
+        Args:
+            url: The request URL.
+            data: The JSON body of the request.
+
+        Returns:
+            The cached response, or None.
+        """
+        cache = self.response_cache()
+        if cache is None:
+            return None
+        try:
+            return cache.get(url, data)
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def _cache_store(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        result: Optional[Dict[str, Any]],
+        payload: Optional[bytes] = None,
+    ) -> None:
+        """
+        Writes a response to the cache, ignoring database errors.
+
+        Args:
+            url: The request URL.
+            data: The JSON body of the request.
+            result: The decoded response.
+            payload: The raw reply body. It is stored instead of encoding
+                result again, and keeps the fields a filtered decode dropped.
+        """
+        cache = self.response_cache()
+        if cache is None or result is None:
+            return
+        with contextlib.suppress(sqlite3.Error):
+            cache.put(url, data, result, payload)
+
+    def build_json_post_request(self, url: str) -> QNetworkRequest:
+        """
+        Builds a network request carrying a JSON body, with the transport
+        attributes shared by all API requests.
+
+        Args:
+            url: The URL to which the POST request should be sent.
+
+        Returns:
+            The configured network request.
+        """
+        return self.request_factory.build_json_post_request(url)
 
     def send_json_post_request(
-        self, url: str, data: Dict[str, Any]
+        self, url: str, data: Dict[str, Any], use_cache: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Sends a POST request to the specified URL with the provided data and
         handles the network response.
 
+        This call blocks in a local event loop until the reply arrives or
+        the request is aborted after REQUEST_TIMEOUT_MS. Interactive code
+        should use send_json_post_request_async instead.
+
         Args:
             url: The URL to which the POST request should be sent.
             data: The data to be sent in the POST request, as a dictionary.
+            use_cache: Serve and store the response through the response cache.
 
         Returns:
-            A dictionary parsed from the JSON response of the server, or None
-            if an error occurs.
+            A dictionary parsed from the JSON response of the server.
+
+        Raises:
+            ApiRequestError: If the request fails or times out.
+            ValueError: If the response body is not JSON.
+        """
+        return PendingResponse(self, url, data, use_cache).result()
+
+    def send_json_post_request_async(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback] = None,
+        timeout_ms: Optional[int] = None,
+        use_cache: bool = True,
+        fields: Optional[FieldSet] = None,
+    ) -> ApiRequest:
         """
-        request = QNetworkRequest(QUrl(url))
-        request.setHeader(QNetworkRequest.ContentTypeHeader, self.JSON_CONTENT_TYPE)
-        encoded_data = json.dumps(data).encode(self.UTF8_ENCODING)
-        event_loop = QEventLoop()
+        Sends a POST request without blocking and reports the outcome through
+        callbacks once the network manager signals that the reply finished.
+
+        Any number of requests may be in flight at once. A request identical
+        to one already in flight on the same network manager is attached to
+        it instead of being sent again.
+
+        Args:
+            url: The URL to which the POST request should be sent.
+            data: The data to be sent in the POST request, as a dictionary.
+            on_success: Called with the decoded JSON response.
+            on_error: Called with an ApiRequestError if the request fails or
+                times out, or a ValueError if the body is not JSON. Cancelled requests invoke neither callback.
+            timeout_ms: Milliseconds before the request is aborted. Defaults
+                to REQUEST_TIMEOUT_MS.
+            use_cache: Serve and store the response through the response
+                cache. Cache hits are still delivered asynchronously.
+            fields: Object keys to keep when decoding the reply, e.g.
+                PlaceItem.FIELDS. Unused parts of large replies are dropped
+                while parsing. The cache still stores the full reply.
+
+        Returns:
+            A handle that can be passed to cancel_request.
+        """
+        api_request = ApiRequest(
+            url,
+            data,
+            on_success,
+            on_error,
+            self.REQUEST_TIMEOUT_MS if timeout_ms is None else timeout_ms,
+            use_cache,
+            fields,
+        )
+        timing = Instrumentation.start(self.operation_name(url))
+        api_request.timing = timing
+        cached = None
+        if use_cache:
+            cached = self._cache_lookup(url, data)
+            timing.lap("cache_lookup")
+        if cached is not None:
+            api_request.from_cache = True
+            api_request.handler = self
+            ExternalApiHandler._count_request(network=False)
+            timing.finish(cached=True)
+            QTimer.singleShot(0, lambda: self._deliver_cached(api_request, cached))
+            return api_request
+        self._submit(api_request)
+        return api_request
+
+    def deliver_async(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        result: Dict[str, Any],
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> ApiRequest:
+        """
+        Completes a request with a response already known to the caller,
+        such as one remembered for a nearby position, without sending it.
+        The callback still runs asynchronously, like a cache hit.
+
+        Args:
+            url: The URL the request would have been sent to.
+            data: The JSON body of the request.
+            result: The response to deliver.
+            on_success: Called with the response.
+            on_error: Unused, accepted for symmetry with the other calls.
+
+        Returns:
+            A handle that can be passed to cancel_request.
+        """
+        api_request = ApiRequest(url, data, on_success, on_error, 0, False)
+        api_request.from_cache = True
+        api_request.handler = self
+        ExternalApiHandler._count_request(network=False)
+        QTimer.singleShot(0, lambda: self._deliver_cached(api_request, result))
+        return api_request
+
+    @staticmethod
+    def operation_name(url: str) -> str:
+        """
+        Names the API operation of a URL for the timing records.
+
+        Args:
+            url: The request URL.
+
+        Returns:
+            The service and the last path segment, e.g. "places.search-text".
+        """
+        parts = urlsplit(url)
+        service = (parts.hostname or "").split(".")[0]
+        return f"{service}.{parts.path.rstrip('/').rsplit('/', 1)[-1]}"
+
+    @staticmethod
+    def request_key(url: str, data: Dict[str, Any]) -> str:
+        """
+        Identifies a request by its URL and a hash of its normalized body.
+
+        Args:
+            url: The request URL.
+            data: The JSON body of the request.
+
+        Returns:
+            A SHA-256 hex digest that is equal for identical requests.
+        """
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{url}\n{body}".encode()).hexdigest()
+
+    @staticmethod
+    def fields_key(fields: Optional[FieldSet]) -> str:
+        """
+        Builds the suffix that keeps requests decoded with different field
+        sets from being coalesced.
+
+        Args:
+            fields: The kept object keys, or None.
+
+        Returns:
+            An empty string for full decoding, otherwise the sorted keys.
+        """
+        if fields is None:
+            return ""
+        return "|" + ",".join(sorted(fields))
+
+    @classmethod
+    def _count_request(cls, network: bool) -> None:
+        """
+        Updates the request counters.
+
+        Args:
+            network: Whether the call went to the network rather than being
+                served from the cache.
+        """
+        with cls._in_flight_lock:
+            cls._request_count += 1
+            if network:
+                cls._network_request_count += 1
+
+    @classmethod
+    def coalescing_stats(cls) -> Dict[str, int]:
+        """
+        Reports how many calls were made, how many went to the network and
+        how many were collapsed onto an identical request already in flight.
+
+        Returns:
+            Counters keyed by "requests", "network_requests", "coalesced" and
+            "in_flight".
+        """
+        with cls._in_flight_lock:
+            return {
+                "requests": cls._request_count,
+                "network_requests": cls._network_request_count,
+                "coalesced": cls._coalesced_count,
+                "in_flight": len(cls._in_flight),
+            }
+
+    def _submit(self, api_request: ApiRequest) -> None:
+        """
+        Attaches a request to an identical one in flight, or sends it.
+
+        Args:
+            api_request: The request to send.
+        """
+        api_request.handler = self
+        self._pending_requests.append(api_request)
+        if not self.configuration_handler.get_bool_setting(self.KEY_COALESCE_ENABLED):
+            ExternalApiHandler._count_request(network=True)
+            self._start_request(api_request)
+            return
+        key = (
+            id(self.network_manager),
+            self.request_key(api_request.url, api_request.data)
+            + self.fields_key(api_request.fields),
+        )
+        with ExternalApiHandler._in_flight_lock:
+            leader = ExternalApiHandler._in_flight.get(key)
+            if leader is not None and not leader.finished:
+                api_request.leader = leader
+                leader.followers.append(api_request)
+                ExternalApiHandler._request_count += 1
+                ExternalApiHandler._coalesced_count += 1
+                return
+            api_request.key = key
+            ExternalApiHandler._in_flight[key] = api_request
+        ExternalApiHandler._count_request(network=True)
+        self._start_request(api_request)
+
+    def _deliver_cached(self, api_request: ApiRequest, result: Dict[str, Any]) -> None:
+        """
+        Completes a request from a cached response.
+
+        Args:
+            api_request: The request served from the cache.
+            result: The cached response.
+        """
+        if api_request.finished or api_request.cancelled:
+            return
+        api_request.finished = True
+        api_request.on_success(result)
+
+    def _start_request(self, api_request: ApiRequest) -> None:
+        """
+        Posts the request and arms its timeout timer.
+
+        Args:
+            api_request: The request to send.
+        """
+        request = self.build_json_post_request(api_request.url)
+        encoded_data = json.dumps(api_request.data).encode(self.UTF8_ENCODING)
+        if api_request.timing is None:
+            api_request.timing = Instrumentation.start(
+                self.operation_name(api_request.url)
+            )
         reply = self.network_manager.post(request, encoded_data)
-        reply.finished.connect(event_loop.quit)
-        event_loop.exec_()
-        return self.handle_network_reply(reply)
+        api_request.reply = reply
+        reply.metaDataChanged.connect(lambda: self._on_reply_headers(api_request))
+        reply.finished.connect(lambda: self._on_reply_finished(api_request))
+        if api_request.timeout_ms > 0:
+            timer = QTimer()
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._on_request_timeout(api_request))
+            timer.start(api_request.timeout_ms)
+            api_request.timer = timer
+
+    def _on_reply_headers(self, api_request: ApiRequest) -> None:
+        """
+        Records the time to the response headers. Qt does not report name
+        lookup and connection setup separately, so this phase covers them
+        together with the server time.
+
+        Args:
+            api_request: The request whose headers arrived.
+        """
+        timing = api_request.timing
+        if timing is not None and "ttfb" not in timing.phases:
+            timing.lap("ttfb")
+
+    def _on_request_timeout(self, api_request: ApiRequest) -> None:
+        """
+        Aborts a request that exceeded its timeout.
+
+        Args:
+            api_request: The request that timed out.
+        """
+        if api_request.finished or api_request.reply is None:
+            return
+        api_request.timed_out = True
+        api_request.reply.abort()
+
+    def _on_reply_finished(self, api_request: ApiRequest) -> None:
+        """
+        Decodes a finished reply and dispatches the matching callback to the
+        request and every request coalesced onto it.
+
+        Args:
+            api_request: The request whose reply finished.
+        """
+        if api_request.finished:
+            return
+        if api_request.timer is not None:
+            api_request.timer.stop()
+        with ExternalApiHandler._in_flight_lock:
+            if ExternalApiHandler._in_flight.get(api_request.key) is api_request:
+                del ExternalApiHandler._in_flight[api_request.key]
+        timing = api_request.timing or Instrumentation.start(
+            self.operation_name(api_request.url)
+        )
+        timing.lap("download" if "ttfb" in timing.phases else "network")
+        reply = api_request.reply
+        response_bytes = reply.bytesAvailable()
+        http_status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        result: Optional[Dict[str, Any]] = None
+        error: Optional[Exception] = None
+        body = b""
+        try:
+            body = self.read_reply(reply)
+            with timing.phase("decode"):
+                result = decode_json(
+                    body.decode(self.UTF8_ENCODING), api_request.fields
+                )
+        except (ApiRequestError, ValueError) as e:
+            error = e
+            if api_request.timed_out:
+                error = ApiRequestError(
+                    f"Request timed out after {api_request.timeout_ms} ms",
+                    QNetworkReply.TimeoutError,
+                )
+        timing.finish(
+            status=http_status,
+            bytes=response_bytes,
+            coalesced=len(api_request.followers),
+            error=type(error).__name__ if error is not None else None,
+        )
+        if error is None and api_request.use_cache:
+            self._cache_store(api_request.url, api_request.data, result, body)
+        for request in [api_request, *api_request.followers]:
+            request.handler._complete(request, result, error)
+
+    def _complete(
+        self,
+        api_request: ApiRequest,
+        result: Optional[Dict[str, Any]],
+        error: Optional[Exception],
+    ) -> None:
+        """
+        Marks a request as finished and invokes its callback unless it was
+        cancelled.
+
+        Args:
+            api_request: The finished request.
+            result: The decoded response, if the request succeeded.
+            error: The failure, if the request failed.
+        """
+        if api_request.finished:
+            return
+        api_request.finished = True
+        if api_request in self._pending_requests:
+            self._pending_requests.remove(api_request)
+        if api_request.cancelled:
+            return
+        if error is None:
+            api_request.on_success(result)
+        elif api_request.on_error is not None:
+            api_request.on_error(error)
+
+    def cancel_request(self, api_request: ApiRequest) -> None:
+        """
+        Cancels a request. Neither of its callbacks will be invoked.
+
+        A reply shared by coalesced requests is only aborted once none of
+        them is still waiting for it.
+
+        Args:
+            api_request: The handle returned by send_json_post_request_async.
+        """
+        if api_request.finished:
+            return
+        api_request.cancelled = True
+        leader = api_request.leader or api_request
+        if (
+            leader.cancelled
+            and not leader.has_active_followers()
+            and leader.reply is not None
+        ):
+            with ExternalApiHandler._in_flight_lock:
+                if ExternalApiHandler._in_flight.get(leader.key) is leader:
+                    del ExternalApiHandler._in_flight[leader.key]
+            leader.reply.abort()
+
+    def cancel_all_requests(self) -> None:
+        """
+        Cancels every request this handler still has in flight.
+        """
+        for api_request in list(self._pending_requests):
+            self.cancel_request(api_request)
+
+    @classmethod
+    def cancel_all_handlers(cls) -> None:
+        """
+        Cancels the requests in flight of every handler created on the
+        calling thread, so that no reply is delivered after the plugin is
+        unloaded. Handlers of worker threads are cancelled by their tasks.
+        """
+        thread_id = threading.get_ident()
+        with cls._handlers_lock:
+            handlers = [
+                handler for handler in cls._handlers if handler._thread_id == thread_id
+            ]
+        for handler in handlers:
+            handler.cancel_all_requests()
+
+    @staticmethod
+    def parse_retry_after(reply: QNetworkReply) -> Optional[int]:
+        """
+        Reads the Retry-After header of a reply.
+
+        Args:
+            reply: The network reply object.
+
+        Returns:
+            The requested delay in milliseconds, or None if the header is
+            missing or malformed.
+        """
+        if not reply.hasRawHeader(b"Retry-After"):
+            return None
+        value = bytes(reply.rawHeader(b"Retry-After")).decode("latin-1").strip()
+        if value.isdigit():
+            return int(value) * 1000
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+        return max(0, int(delay * 1000))
 
-    def handle_network_reply(self, reply: QNetworkReply) -> Optional[Dict[str, Any]]:
+    def read_reply(self, reply: QNetworkReply) -> bytes:
         """
-        Processes the network reply, checking for errors and decoding the JSON response.
+        Checks the network reply for errors and reads its body.
 
         Args:
             reply: The network reply object.
 
         Returns:
-            The decoded JSON object if no network errors occurred, or None if an error
-            is encountered.
+            The raw response body.
 
         Raises:
-            RuntimeError: If a network error occurs or the response cannot be decoded
-            as JSON.
+            ApiRequestError: If a network error occurs.
         """
         try:
             if reply.error() == QNetworkReply.NoError:  # type: ignore
-                response_data = reply.readAll().data().decode(self.UTF8_ENCODING)
-                return json.loads(response_data)
+                return reply.readAll().data()
             else:
                 error_msg = f"Network error occurred: {reply.errorString()}"
-                raise RuntimeError(error_msg)
+                raise ApiRequestError(
+                    error_msg,
+                    reply.error(),
+                    reply.attribute(QNetworkRequest.HttpStatusCodeAttribute),
+                    self.parse_retry_after(reply),
+                )
         finally:
             reply.deleteLater()
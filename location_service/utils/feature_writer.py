@@ -0,0 +1,181 @@
+import os
+from typing import ClassVar, Dict, Iterable, List, Optional
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsFeatureSink,
+    QgsFields,
+    QgsProcessingException,
+    QgsProject,
+    QgsVectorFileWriter,
+    QgsVectorLayer,
+)
+
+
+class StreamingFeatureWriter:
+    """
+    Writes features to a sink in fixed-size chunks as they are produced,
+    instead of collecting every feature before a single addFeatures call.
+
+    The sink can be a layer's data provider, a vector file writer or a
+    processing sink. When a layer is attached it is repainted after every
+    chunk so results show up while they are still arriving.
+    """
+
+    DEFAULT_CHUNK_SIZE = 500
+    FILE_DRIVERS: ClassVar[Dict[str, str]] = {
+        ".gpkg": "GPKG",
+        ".fgb": "FlatGeobuf",
+    }
+    UPDATABLE_DRIVERS: ClassVar[frozenset] = frozenset({"GPKG"})
+
+    def __init__(
+        self,
+        sink: QgsFeatureSink,
+        layer: Optional[QgsVectorLayer] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            sink (QgsFeatureSink): Destination of the features.
+            layer (Optional[QgsVectorLayer]): Layer to repaint after each chunk.
+            chunk_size (int): Number of features buffered before a write.
+        """
+        self.sink = sink
+        self.layer = layer
+        self.chunk_size = max(1, chunk_size)
+        self.features_written = 0
+        self.path: Optional[str] = None
+        self.layer_name: Optional[str] = None
+        self._buffer: List[QgsFeature] = []
+        self._file_writer: Optional[QgsVectorFileWriter] = None
+
+    @classmethod
+    def for_layer(
+        cls, layer: QgsVectorLayer, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> "StreamingFeatureWriter":
+        """
+        Creates a writer that appends to an existing layer.
+
+        Args:
+            layer (QgsVectorLayer): The target layer.
+            chunk_size (int): Number of features buffered before a write.
+
+        Returns:
+            StreamingFeatureWriter: The writer.
+        """
+        return cls(layer.dataProvider(), layer, chunk_size)
+
+    @classmethod
+    def for_file(
+        cls,
+        path: str,
+        layer_name: str,
+        fields: QgsFields,
+        wkb_type: int,
+        crs: QgsCoordinateReferenceSystem,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> "StreamingFeatureWriter":
+        """
+        Creates a writer that streams into a new GeoPackage or FlatGeobuf file.
+
+        GeoPackage output is opened as a layer right away, so it can be added
+        to the project and repainted while it fills. FlatGeobuf files can
+        only be written sequentially and are opened once the writer is closed.
+
+        Args:
+            path (str): Output path ending in .gpkg or .fgb.
+            layer_name (str): Name of the layer inside the file.
+            fields (QgsFields): Attribute schema.
+            wkb_type (int): Geometry type of the features.
+            crs (QgsCoordinateReferenceSystem): CRS of the features.
+            chunk_size (int): Number of features buffered before a write.
+
+        Returns:
+            StreamingFeatureWriter: The writer.
+
+        Raises:
+            ValueError: If the file extension is not supported.
+            OSError: If the file cannot be created.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        driver = cls.FILE_DRIVERS.get(extension)
+        if driver is None:
+            raise ValueError(f"Unsupported output format: {extension!r}")
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = driver
+        options.layerName = layer_name
+        file_writer = QgsVectorFileWriter.create(
+            path,
+            fields,
+            wkb_type,
+            crs,
+            QgsProject.instance().transformContext(),
+            options,
+        )
+        if file_writer.hasError() != QgsVectorFileWriter.NoError:
+            raise OSError(f"Failed to create {path}: {file_writer.errorMessage()}")
+        if driver in cls.UPDATABLE_DRIVERS:
+            del file_writer
+            layer = QgsVectorLayer(f"{path}|layername={layer_name}", layer_name, "ogr")
+            writer = cls.for_layer(layer, chunk_size)
+        else:
+            writer = cls(file_writer, None, chunk_size)
+            writer._file_writer = file_writer
+        writer.path = path
+        writer.layer_name = layer_name
+        return writer
+
+    def add_features(self, features: Iterable[QgsFeature]) -> None:
+        """
+        Buffers features and writes every full chunk.
+
+        Args:
+            features (Iterable[QgsFeature]): Features to write, possibly lazily
+                produced.
+        """
+        for feature in features:
+            self._buffer.append(feature)
+            if len(self._buffer) >= self.chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered features and repaints the attached layer.
+
+        Raises:
+            QgsProcessingException: If the sink rejected the features, e.g.
+                because the output file could not be written.
+        """
+        if not self._buffer:
+            return
+        if not self.sink.addFeatures(self._buffer, QgsFeatureSink.FastInsert):
+            last_error = getattr(self.sink, "lastError", None)
+            error = last_error() if last_error is not None else ""
+            raise QgsProcessingException(
+                f"Could not write {len(self._buffer)} features"
+                + (f": {error}" if error else "")
+            )
+        self.features_written += len(self._buffer)
+        self._buffer = []
+        if self.layer is not None:
+            self.layer.updateExtents()
+            self.layer.triggerRepaint()
+
+    def close(self) -> Optional[QgsVectorLayer]:
+        """
+        Flushes the remaining features and finalizes file output.
+
+        Returns:
+            Optional[QgsVectorLayer]: The layer holding the written features,
+            or None for a plain sink.
+        """
+        self.flush()
+        if self._file_writer is not None:
+            self._file_writer = None
+            self.sink = None
+            self.layer = QgsVectorLayer(self.path, self.layer_name, "ogr")
+        return self.layer
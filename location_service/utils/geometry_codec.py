@@ -0,0 +1,214 @@
+import struct
+import sys
+from array import array
+from typing import Iterable, List, Sequence
+
+FLEXIBLE_POLYLINE_ALPHABET = (
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+)
+FLEXIBLE_POLYLINE_VERSION = 1
+WKB_LITTLE_ENDIAN = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+WKB_MULTIPOLYGON = 6
+
+_DECODING_TABLE = {char: index for index, char in enumerate(FLEXIBLE_POLYLINE_ALPHABET)}
+
+
+def flatten_coordinates(coordinates: Iterable[Sequence[float]]) -> array:
+    """
+    Packs a sequence of [lon, lat, ...] positions into a flat coordinate buffer.
+
+    Args:
+        coordinates (Iterable[Sequence[float]]): Positions as returned in a
+            GeoJSON-like LineString. Extra dimensions are dropped.
+
+    Returns:
+        array: Interleaved x and y values as doubles.
+    """
+    flat = array("d")
+    for coordinate in coordinates:
+        flat.append(coordinate[0])
+        flat.append(coordinate[1])
+    return flat
+
+
+def _decode_unsigned_values(encoded: str) -> array:
+    """
+    Decodes the variable-length unsigned integers of a flexible polyline.
+
+    Args:
+        encoded (str): The encoded polyline.
+
+    Returns:
+        array: The decoded unsigned integers.
+
+    Raises:
+        ValueError: If the string contains an invalid character or ends in
+            the middle of a value.
+    """
+    values = array("Q")
+    result = 0
+    shift = 0
+    for char in encoded:
+        value = _DECODING_TABLE.get(char)
+        if value is None:
+            raise ValueError(f"Invalid flexible polyline character: {char!r}")
+        result |= (value & 0x1F) << shift
+        if value & 0x20:
+            shift += 5
+        else:
+            values.append(result)
+            result = 0
+            shift = 0
+    if shift:
+        raise ValueError("Truncated flexible polyline")
+    return values
+
+
+def decode_flexible_polyline(encoded: str) -> array:
+    """
+    Decodes a flexible polyline into a flat coordinate buffer.
+
+    The flexible polyline format stores latitude and longitude deltas as
+    zig-zag encoded variable-length integers, optionally followed by a
+    third dimension, which is dropped here.
+
+    Args:
+        encoded (str): The encoded polyline.
+
+    Returns:
+        array: Interleaved longitude and latitude values as doubles.
+
+    Raises:
+        ValueError: If the polyline is malformed or of an unknown version.
+    """
+    values = _decode_unsigned_values(encoded)
+    if len(values) < 2:
+        raise ValueError("Flexible polyline is missing its header")
+    if values[0] != FLEXIBLE_POLYLINE_VERSION:
+        raise ValueError(f"Unsupported flexible polyline version: {values[0]}")
+    header = values[1]
+    factor = 10.0 ** (header & 0x0F)
+    stride = 3 if (header >> 4) & 0x07 else 2
+    if (len(values) - 2) % stride:
+        raise ValueError("Truncated flexible polyline")
+    flat = array("d", bytes(8 * 2 * ((len(values) - 2) // stride)))
+    lat = 0
+    lon = 0
+    index = 0
+    for position in range(2, len(values), stride):
+        delta = values[position]
+        lat += -((delta + 1) >> 1) if delta & 1 else delta >> 1
+        delta = values[position + 1]
+        lon += -((delta + 1) >> 1) if delta & 1 else delta >> 1
+        flat[index] = lon / factor
+        flat[index + 1] = lat / factor
+        index += 2
+    return flat
+
+
+def linestring_wkb(flat: array) -> bytes:
+    """
+    Encodes a flat coordinate buffer as a little-endian WKB LineString.
+
+    Args:
+        flat (array): Interleaved x and y values as doubles.
+
+    Returns:
+        bytes: The WKB geometry.
+    """
+    header = struct.pack("<BII", WKB_LITTLE_ENDIAN, WKB_LINESTRING, len(flat) // 2)
+    return header + _little_endian_bytes(flat)
+
+
+def _little_endian_bytes(flat: array) -> bytes:
+    """
+    Returns the raw bytes of a coordinate buffer in little-endian order.
+
+    Args:
+        flat (array): Interleaved x and y values as doubles.
+
+    Returns:
+        bytes: The values as little-endian doubles.
+    """
+    if sys.byteorder != "little":
+        flat = array("d", flat)
+        flat.byteswap()
+    return flat.tobytes()
+
+
+def close_ring(flat: array) -> array:
+    """
+    Repeats the first vertex of a ring at its end if it is not closed yet.
+
+    Args:
+        flat (array): Interleaved x and y values of the ring.
+
+    Returns:
+        array: The closed ring.
+    """
+    if len(flat) >= 2 and (flat[0] != flat[-2] or flat[1] != flat[-1]):
+        flat = array("d", flat)
+        flat.append(flat[0])
+        flat.append(flat[1])
+    return flat
+
+
+def polygon_wkb(rings: Sequence[array]) -> bytes:
+    """
+    Encodes flat coordinate rings as a little-endian WKB Polygon.
+
+    Args:
+        rings (Sequence[array]): The exterior ring followed by any holes,
+            each as interleaved x and y values. Open rings are closed.
+
+    Returns:
+        bytes: The WKB geometry.
+    """
+    parts: List[bytes] = [
+        struct.pack("<BII", WKB_LITTLE_ENDIAN, WKB_POLYGON, len(rings))
+    ]
+    for ring in rings:
+        ring = close_ring(ring)
+        parts.append(struct.pack("<I", len(ring) // 2))
+        parts.append(_little_endian_bytes(ring))
+    return b"".join(parts)
+
+
+def multipolygon_wkb(polygons: Sequence[Sequence[array]]) -> bytes:
+    """
+    Encodes several polygons as a little-endian WKB MultiPolygon.
+
+    Args:
+        polygons (Sequence[Sequence[array]]): The rings of each polygon.
+
+    Returns:
+        bytes: The WKB geometry.
+    """
+    header = struct.pack("<BII", WKB_LITTLE_ENDIAN, WKB_MULTIPOLYGON, len(polygons))
+    return header + b"".join(polygon_wkb(rings) for rings in polygons)
+
+
+def linestring_coordinates(wkb: bytes) -> array:
+    """
+    Decodes a two-dimensional WKB LineString into a flat coordinate buffer.
+
+    Args:
+        wkb (bytes): The WKB geometry, in either byte order.
+
+    Returns:
+        array: Interleaved x and y values as doubles.
+
+    Raises:
+        ValueError: If the geometry is not a two-dimensional LineString.
+    """
+    byte_order = "<" if wkb[0] == WKB_LITTLE_ENDIAN else ">"
+    geometry_type, count = struct.unpack_from(f"{byte_order}II", wkb, 1)
+    if geometry_type != WKB_LINESTRING:
+        raise ValueError(f"Expected a WKB LineString, got type {geometry_type}")
+    flat = array("d")
+    flat.frombytes(wkb[9 : 9 + count * 16])
+    if (byte_order == "<") != (sys.byteorder == "little"):
+        flat.byteswap()
+    return flat
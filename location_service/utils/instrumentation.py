@@ -0,0 +1,276 @@
+import contextlib
+import json
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, ClassVar, Deque, Dict, Iterator, List, Optional
+
+
+class TimingRecord:
+    """
+    Timings of the phases of one operation, such as an API request or a
+    layer build.
+    """
+
+    __slots__ = ("attributes", "operation", "phases", "timestamp")
+
+    def __init__(
+        self,
+        operation: str,
+        phases: Dict[str, float],
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Initializes the record.
+
+        Args:
+            operation (str): Name of the operation, e.g. "places.search-text".
+            phases (Dict[str, float]): Milliseconds spent in each phase.
+            attributes (Optional[Dict[str, Any]]): Extra details such as the
+                HTTP status or the number of features.
+        """
+        self.operation = operation
+        self.phases = phases
+        self.attributes = attributes or {}
+        self.timestamp = time.time()
+
+    def total_ms(self) -> float:
+        """
+        Returns the time spent in all phases.
+
+        Returns:
+            float: Milliseconds.
+        """
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the record to a JSON-serializable dictionary.
+
+        Returns:
+            Dict[str, Any]: The record.
+        """
+        return {
+            "timestamp": self.timestamp,
+            "operation": self.operation,
+            "phases_ms": self.phases,
+            "total_ms": self.total_ms(),
+            **self.attributes,
+        }
+
+
+class OperationTimer:
+    """
+    Measures consecutive phases of one operation and stores the result in
+    the Instrumentation ring buffer when finished.
+    """
+
+    def __init__(self, operation: str) -> None:
+        """
+        Starts timing an operation.
+
+        Args:
+            operation (str): Name of the operation.
+        """
+        self.operation = operation
+        self.phases: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+        self._mark = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as a phase, adding to earlier time spent in
+        the same phase.
+
+        Args:
+            name (str): Name of the phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, (time.perf_counter() - started) * 1000.0)
+
+    def add_phase(self, name: str, milliseconds: float) -> None:
+        """
+        Adds time measured elsewhere to a phase.
+
+        Args:
+            name (str): Name of the phase.
+            milliseconds (float): Time spent.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + milliseconds
+
+    def lap(self, name: str) -> None:
+        """
+        Attributes the time since the previous lap, or since the timer was
+        started, to a phase.
+
+        Args:
+            name (str): Name of the phase.
+        """
+        now = time.perf_counter()
+        self.add_phase(name, (now - self._mark) * 1000.0)
+        self._mark = now
+
+    def finish(self, **attributes: Any) -> TimingRecord:
+        """
+        Stores the timings.
+
+        Args:
+            **attributes: Extra details recorded with the timings.
+
+        Returns:
+            TimingRecord: The stored record.
+        """
+        self.attributes.update(attributes)
+        return Instrumentation.record(self.operation, self.phases, self.attributes)
+
+
+class Instrumentation:
+    """
+    Keeps the most recent timing records of the plugin in a thread-safe ring
+    buffer, summarizes them and exports them as JSON lines.
+    """
+
+    DEFAULT_CAPACITY = 1000
+
+    _records: ClassVar[Deque[TimingRecord]] = deque(maxlen=DEFAULT_CAPACITY)
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    enabled: ClassVar[bool] = True
+
+    @classmethod
+    def start(cls, operation: str) -> OperationTimer:
+        """
+        Starts timing an operation.
+
+        Args:
+            operation (str): Name of the operation.
+
+        Returns:
+            OperationTimer: The timer to record phases with.
+        """
+        return OperationTimer(operation)
+
+    @classmethod
+    def record(
+        cls,
+        operation: str,
+        phases: Dict[str, float],
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> TimingRecord:
+        """
+        Stores a timing record, dropping the oldest one when the buffer is full.
+
+        Args:
+            operation (str): Name of the operation.
+            phases (Dict[str, float]): Milliseconds spent in each phase.
+            attributes (Optional[Dict[str, Any]]): Extra details.
+
+        Returns:
+            TimingRecord: The record.
+        """
+        record = TimingRecord(operation, phases, attributes)
+        if cls.enabled:
+            with cls._lock:
+                cls._records.append(record)
+        return record
+
+    @classmethod
+    def set_capacity(cls, capacity: int) -> None:
+        """
+        Resizes the ring buffer, keeping the newest records.
+
+        Args:
+            capacity (int): Maximum number of records kept.
+        """
+        with cls._lock:
+            cls._records = deque(cls._records, maxlen=max(1, capacity))
+
+    @classmethod
+    def records(cls) -> List[TimingRecord]:
+        """
+        Returns a snapshot of the stored records, oldest first.
+
+        Returns:
+            List[TimingRecord]: The records.
+        """
+        with cls._lock:
+            return list(cls._records)
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Drops every stored record.
+        """
+        with cls._lock:
+            cls._records.clear()
+
+    @staticmethod
+    def percentile(values: List[float], fraction: float) -> float:
+        """
+        Returns a percentile of sorted values using the nearest-rank method.
+
+        Args:
+            values (List[float]): Values in ascending order.
+            fraction (float): Percentile between 0 and 1.
+
+        Returns:
+            float: The percentile, or 0 for no values.
+        """
+        if not values:
+            return 0.0
+        rank = max(1, math.ceil(fraction * len(values)))
+        return values[rank - 1]
+
+    @classmethod
+    def summary(cls) -> List[Dict[str, Any]]:
+        """
+        Aggregates the stored records by operation and phase.
+
+        Returns:
+            List[Dict[str, Any]]: One row per operation and phase with the
+            count, mean, median, 95th percentile and maximum in milliseconds.
+        """
+        samples: Dict[tuple, List[float]] = {}
+        for record in cls.records():
+            for phase, milliseconds in record.phases.items():
+                samples.setdefault((record.operation, phase), []).append(milliseconds)
+            samples.setdefault((record.operation, "total"), []).append(
+                record.total_ms()
+            )
+        rows = []
+        for (operation, phase), values in sorted(samples.items()):
+            values.sort()
+            rows.append(
+                {
+                    "operation": operation,
+                    "phase": phase,
+                    "count": len(values),
+                    "mean_ms": sum(values) / len(values),
+                    "p50_ms": cls.percentile(values, 0.5),
+                    "p95_ms": cls.percentile(values, 0.95),
+                    "max_ms": values[-1],
+                }
+            )
+        return rows
+
+    @classmethod
+    def export_jsonl(cls, path: str) -> int:
+        """
+        Appends the stored records to a JSON-lines file.
+
+        Args:
+            path (str): Output file path.
+
+        Returns:
+            int: Number of records written.
+        """
+        records = cls.records()
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record.to_dict(), ensure_ascii=False))
+                f.write("\n")
+        return len(records)
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .response_cache import ResponseCache
+
+JournalRow = Tuple[str, str, Optional[bytes], Optional[str], float]
+
+
+class JobJournal:
+    """
+    A write-ahead journal of the requests of a long batch run, stored in
+    SQLite.
+
+    Each request is recorded as pending when it is sent, then as done with
+    its decoded response or as failed with its error. A run restarted with
+    the same journal replays the responses of done requests instead of
+    sending them again, so only pending and failed requests cost an API
+    call. Records are buffered and written in one transaction per batch.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_DONE = "done"
+    STATE_FAILED = "failed"
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_FLUSH_INTERVAL_S = 1.0
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+    ) -> None:
+        """
+        Opens or creates the journal database.
+
+        Args:
+            path (str): Path to the SQLite file.
+            batch_size (int): Number of buffered records that triggers a
+                write.
+            flush_interval_s (float): Longest time a record stays buffered
+                while records keep arriving.
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.replayed = 0
+        self._buffer: List[JournalRow] = []
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "key TEXT PRIMARY KEY, state TEXT NOT NULL, payload BLOB, "
+            "error TEXT, updated REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def request_key(url: str, data: Dict[str, Any]) -> str:
+        """
+        Builds the journal key of a request from its URL, without the API
+        key, and its exact body.
+
+        Args:
+            url (str): The request URL.
+            data (Dict[str, Any]): The JSON body of the request.
+
+        Returns:
+            str: A SHA-256 hex digest identifying the request.
+        """
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        public_url = ResponseCache.public_url(url)
+        return hashlib.sha256(f"{public_url}\n{body}".encode()).hexdigest()
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the response of a request that finished in an earlier run.
+
+        Args:
+            key (str): The journal key of the request.
+
+        Returns:
+            Optional[Dict[str, Any]]: The recorded response, or None if the
+            request is not done.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM jobs WHERE key = ? AND state = ?",
+                (key, self.STATE_DONE),
+            ).fetchone()
+        if row is None:
+            return None
+        self.replayed += 1
+        return json.loads(row[0])
+
+    def record_pending(self, key: str) -> None:
+        """
+        Records that a request is being sent.
+
+        Args:
+            key (str): The journal key of the request.
+        """
+        self._record(key, self.STATE_PENDING, None, None)
+
+    def record_done(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Records the response of a request.
+
+        Args:
+            key (str): The journal key of the request.
+            response (Dict[str, Any]): The decoded response.
+        """
+        payload = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        self._record(key, self.STATE_DONE, payload, None)
+
+    def record_failed(self, key: str, error: Exception) -> None:
+        """
+        Records a request that failed after its retries.
+
+        Args:
+            key (str): The journal key of the request.
+            error (Exception): The failure.
+        """
+        self._record(key, self.STATE_FAILED, None, str(error))
+
+    def _record(
+        self, key: str, state: str, payload: Optional[bytes], error: Optional[str]
+    ) -> None:
+        """
+        Buffers a record and writes the buffer if it is full or old.
+
+        Args:
+            key (str): The journal key of the request.
+            state (str): The new state of the request.
+            payload (Optional[bytes]): The UTF-8 JSON response, if done.
+            error (Optional[str]): The error message, if failed.
+        """
+        with self._lock:
+            self._buffer.append((key, state, payload, error, time.time()))
+            if (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._flushed_at >= self.flush_interval_s
+            ):
+                self._write_buffer()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered records.
+        """
+        with self._lock:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        """
+        Writes the buffered records in one transaction. Must be called with
+        the lock held.
+        """
+        self._flushed_at = time.monotonic()
+        if not self._buffer:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO jobs (key, state, payload, error, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                self._buffer,
+            )
+        self._buffer = []
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Counts the recorded requests by state, including buffered records.
+
+        Returns:
+            Dict[str, int]: Number of pending, done and failed requests.
+        """
+        self.flush()
+        counts = dict.fromkeys(
+            (self.STATE_PENDING, self.STATE_DONE, self.STATE_FAILED), 0
+        )
+        with self._lock:
+            for state, count in self._connection.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def close(self) -> None:
+        """
+        Writes the buffered records and closes the database connection.
+        """
+        with self._lock:
+            self._write_buffer()
+            self._connection.close()
@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ItemMatcher = Callable[[Any, str], bool]
+
+
+class TrieNode:
+    """
+    One character of a cached prefix.
+    """
+
+    __slots__ = ("children", "complete", "items")
+
+    def __init__(self) -> None:
+        """
+        Initializes a node without cached items.
+        """
+        self.children: Dict[str, TrieNode] = {}
+        self.items: Optional[List[Any]] = None
+        self.complete = False
+
+
+class PrefixTrie:
+    """
+    Caches suggestion results by query prefix.
+
+    A prefix that was never requested is answered from its longest cached
+    ancestor by filtering the ancestor's items. When the ancestor reply held
+    every match (fewer items than the result limit), the filtered items are
+    final and no request is needed; otherwise they are only a provisional
+    answer shown while the request for the longer prefix is in flight.
+    """
+
+    def __init__(self, max_entries: int = 500) -> None:
+        """
+        Initializes an empty trie.
+
+        Args:
+            max_entries (int): Number of prefixes kept, the oldest are
+                dropped first.
+        """
+        self.max_entries = max(1, max_entries)
+        self._root = TrieNode()
+        self._order: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalizes a prefix so that case and repeated spaces do not matter.
+        A trailing space is kept since it ends the last word.
+
+        Args:
+            text (str): The typed text.
+
+        Returns:
+            str: The normalized prefix.
+        """
+        normalized = " ".join(text.split()).casefold()
+        if normalized and text[-1:].isspace():
+            normalized += " "
+        return normalized
+
+    @staticmethod
+    def matches_words(title: str, prefix: str) -> bool:
+        """
+        Tells whether every word of a prefix starts a word of a title.
+
+        Args:
+            title (str): The suggested text.
+            prefix (str): A normalized prefix.
+
+        Returns:
+            bool: True if the title still matches the prefix.
+        """
+        words = title.casefold().replace(",", " ").split()
+        return all(
+            any(word.startswith(token) for word in words) for token in prefix.split()
+        )
+
+    def put(self, prefix: str, items: List[Any], complete: bool) -> None:
+        """
+        Stores the items returned for a prefix.
+
+        Args:
+            prefix (str): The typed text.
+            items (List[Any]): The suggestions.
+            complete (bool): True if the reply held every match, so that
+                longer prefixes can be answered by filtering.
+        """
+        key = self.normalize(prefix)
+        if not key:
+            return
+        with self._lock:
+            node = self._root
+            for char in key:
+                node = node.children.setdefault(char, TrieNode())
+            node.items = list(items)
+            node.complete = complete
+            self._order.pop(key, None)
+            self._order[key] = None
+            while len(self._order) > self.max_entries:
+                oldest, _ = self._order.popitem(last=False)
+                self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        """
+        Drops the items of a prefix and prunes the nodes left empty.
+
+        Args:
+            key (str): A normalized prefix.
+        """
+        path = [self._root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].items = None
+        path[-1].complete = False
+        for index in range(len(key) - 1, -1, -1):
+            node = path[index + 1]
+            if node.items is not None or node.children:
+                break
+            del path[index].children[key[index]]
+
+    def lookup(
+        self, prefix: str, matcher: ItemMatcher
+    ) -> Optional[Tuple[List[Any], bool]]:
+        """
+        Answers a prefix from the cache.
+
+        Args:
+            prefix (str): The typed text.
+            matcher (ItemMatcher): Tells whether an item of an ancestor
+                prefix still matches the longer normalized prefix.
+
+        Returns:
+            Optional[Tuple[List[Any], bool]]: The items and whether they are
+            final, or None if no ancestor of the prefix is cached.
+        """
+        key = self.normalize(prefix)
+        if not key:
+            return None
+        with self._lock:
+            node = self._root
+            ancestor: Optional[TrieNode] = None
+            for char in key:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                if node.items is not None:
+                    ancestor = node
+            else:
+                if node is not None and node.items is not None:
+                    self.hits += 1
+                    return list(node.items), True
+            if ancestor is None:
+                self.misses += 1
+                return None
+            items = [item for item in ancestor.items if matcher(item, key)]
+            complete = ancestor.complete and bool(items)
+            if complete:
+                self.hits += 1
+            else:
+                self.partial_hits += 1
+            return items, complete
+
+    def clear(self) -> None:
+        """
+        Drops every cached prefix.
+        """
+        with self._lock:
+            self._root = TrieNode()
+            self._order.clear()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached prefixes.
+        """
+        return len(self._order)
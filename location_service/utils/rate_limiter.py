@@ -0,0 +1,327 @@
+import random
+import threading
+import time
+from typing import ClassVar, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .configuration_handler import ConfigurationHandler
+
+LimiterSettings = Tuple[float, int, int, int, int]
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that admits requests at a sustained rate
+    with bursts of up to a fixed number of requests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Tokens added per second. Zero or less disables the
+                limit.
+            burst (int): Maximum number of tokens held.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: Zero if a token was taken, otherwise the seconds to wait
+            before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._tokens = min(
+                float(self.burst), self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for a while, e.g. as asked by a Retry-After
+        header.
+
+        Args:
+            seconds (float): Length of the pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AimdController:
+    """
+    Adapts a concurrency limit with additive increase and multiplicative
+    decrease: the limit grows by about one per window of successful
+    requests and is cut when the service throttles.
+    """
+
+    DECREASE_FACTOR = 0.5
+    DECREASE_COOLDOWN_SECONDS = 1.0
+
+    def __init__(self, maximum: int, minimum: int = 1) -> None:
+        """
+        Initializes the controller at its maximum limit.
+
+        Args:
+            maximum (int): Upper bound of the concurrency limit.
+            minimum (int): Lower bound of the concurrency limit.
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self._limit = float(self.maximum)
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """
+        Returns the current concurrency limit.
+
+        Returns:
+            int: Number of requests allowed in flight.
+        """
+        return int(self._limit)
+
+    def on_success(self) -> None:
+        """
+        Raises the limit after a successful request.
+        """
+        with self._lock:
+            self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+
+    def on_throttle(self) -> None:
+        """
+        Cuts the limit after a throttled request. Throttles arriving within
+        the cooldown of the previous cut count as the same congestion event.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.DECREASE_COOLDOWN_SECONDS:
+                return
+            self._last_decrease = now
+            self._limit = max(float(self.minimum), self._limit * self.DECREASE_FACTOR)
+
+
+class EndpointLimiter:
+    """
+    Rate limit, adaptive concurrency limit and retry policy shared by every
+    request sent to one API endpoint host.
+    """
+
+    KEY_RATE_PREFIX = "rate_limit_"
+    KEY_RATE_SUFFIX = "_rps"
+    KEY_BURST = "rate_limit_burst"
+    KEY_MAX_CONCURRENCY = "adaptive_concurrency_max"
+    KEY_RETRY_BASE_DELAY = "retry_base_delay_ms"
+    KEY_RETRY_MAX_DELAY = "retry_max_delay_ms"
+    THROTTLE_HTTP_STATUSES: ClassVar[frozenset] = frozenset({429, 503})
+
+    _limiters: ClassVar[Dict[str, "EndpointLimiter"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        retry_base_delay_ms: int,
+        retry_max_delay_ms: int,
+    ) -> None:
+        """
+        Initializes the limiter.
+
+        Args:
+            rate (float): Sustained requests per second; zero for no limit.
+            burst (int): Requests that may start back to back.
+            max_concurrency (int): Upper bound of the adaptive concurrency.
+            retry_base_delay_ms (int): Back-off before the first retry.
+            retry_max_delay_ms (int): Upper bound of a back-off.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.controller = AimdController(max_concurrency)
+        self.retry_base_delay_ms = retry_base_delay_ms
+        self.retry_max_delay_ms = retry_max_delay_ms
+        self.settings: LimiterSettings = (
+            rate,
+            burst,
+            max_concurrency,
+            retry_base_delay_ms,
+            retry_max_delay_ms,
+        )
+        self.throttled = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def service_name(url: str) -> str:
+        """
+        Extracts the service name, such as "places" or "routes", from an
+        Amazon Location Service URL.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            str: The first label of the host name.
+        """
+        return (urlsplit(url).hostname or "").split(".")[0]
+
+    @classmethod
+    def for_url(cls, url: str) -> "EndpointLimiter":
+        """
+        Returns the limiter shared by every request to the URL's host,
+        creating it from the current settings on first use. Limiters are
+        kept until a limiter setting changes, which drops them all through
+        reset. Requests already in flight keep counting against the limiter
+        they were sent with.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            EndpointLimiter: The limiter of the endpoint.
+        """
+        host = urlsplit(url).hostname or ""
+        with cls._registry_lock:
+            limiter = cls._limiters.get(host)
+        if limiter is not None:
+            return limiter
+        settings = cls.read_settings(cls.service_name(url))
+        with cls._registry_lock:
+            return cls._limiters.setdefault(host, cls(*settings))
+
+    @classmethod
+    def read_settings(cls, service: str) -> LimiterSettings:
+        """
+        Reads the limiter configuration of a service from the plugin settings.
+
+        Args:
+            service (str): Service name used to look up the rate setting.
+
+        Returns:
+            LimiterSettings: The rate, burst, maximum concurrency and retry
+            delays, in the order taken by the constructor.
+        """
+        settings = ConfigurationHandler()
+        rate_key = f"{cls.KEY_RATE_PREFIX}{service}{cls.KEY_RATE_SUFFIX}"
+        try:
+            rate = float(settings.get_setting(rate_key) or 0.0)
+        except (TypeError, ValueError):
+            rate = 0.0
+        return (
+            rate,
+            settings.get_int_setting(cls.KEY_BURST),
+            settings.get_int_setting(cls.KEY_MAX_CONCURRENCY),
+            settings.get_int_setting(cls.KEY_RETRY_BASE_DELAY),
+            settings.get_int_setting(cls.KEY_RETRY_MAX_DELAY),
+        )
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drops every limiter so the next requests pick up changed settings.
+        """
+        with cls._registry_lock:
+            cls._limiters.clear()
+
+    @classmethod
+    def on_setting_changed(cls, key: str) -> None:
+        """
+        Resets the limiters when one of their settings was changed.
+
+        Args:
+            key (str): The key of the changed setting.
+        """
+        if key.startswith(cls.KEY_RATE_PREFIX) or key in (
+            cls.KEY_MAX_CONCURRENCY,
+            cls.KEY_RETRY_BASE_DELAY,
+            cls.KEY_RETRY_MAX_DELAY,
+        ):
+            cls.reset()
+
+    def begin_request(self) -> None:
+        """
+        Counts a request sent to the endpoint.
+        """
+        with self._lock:
+            self.in_flight += 1
+
+    def end_request(self) -> None:
+        """
+        Counts a request to the endpoint that finished or was cancelled.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def has_capacity(self) -> bool:
+        """
+        Tells whether another request may be sent to the endpoint, counting
+        the requests in flight from every pool.
+
+        Returns:
+            bool: True if the adaptive concurrency limit is not reached.
+        """
+        return self.in_flight < self.controller.limit
+
+    def on_success(self) -> None:
+        """
+        Records a successful request.
+        """
+        self.controller.on_success()
+
+    def on_failure(
+        self, http_status: Optional[int], retry_after_ms: Optional[int]
+    ) -> None:
+        """
+        Records a failed request, backing off if the service throttled it.
+
+        Args:
+            http_status (Optional[int]): HTTP status of the failure.
+            retry_after_ms (Optional[int]): Delay requested by the service.
+        """
+        if http_status in self.THROTTLE_HTTP_STATUSES:
+            self.throttled += 1
+            self.controller.on_throttle()
+        if retry_after_ms:
+            self.bucket.pause(retry_after_ms / 1000.0)
+
+    def retry_delay_ms(self, attempt: int, retry_after_ms: Optional[int] = None) -> int:
+        """
+        Computes the back-off before a retry using exponential growth with
+        full jitter, never shorter than the delay requested by the service.
+
+        Args:
+            attempt (int): Number of attempts made so far, starting at 1.
+            retry_after_ms (Optional[int]): Delay from a Retry-After header.
+
+        Returns:
+            int: Milliseconds to wait.
+        """
+        ceiling = min(
+            self.retry_max_delay_ms,
+            self.retry_base_delay_ms * 2 ** max(0, attempt - 1),
+        )
+        delay = int(random.uniform(0, ceiling))
+        return max(delay, retry_after_ms or 0)
+
+
+ConfigurationHandler.add_listener(EndpointLimiter.on_setting_changed)
@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import ClassVar, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QSslConfiguration
+from qgis.core import QgsNetworkAccessManager
+
+from .configuration_handler import ConfigurationHandler
+
+
+class ApiRequestFactory:
+    """
+    Builds the network requests sent to Amazon Location Service and keeps
+    connections to the regional endpoints warm.
+
+    Requests allow HTTP/2, so concurrent requests to one endpoint are
+    multiplexed over a single TLS connection instead of queueing on at most
+    six HTTP/1.1 connections. Connections are kept alive by Qt between
+    requests and can be opened ahead of the first request with preconnect.
+
+    Accept-Encoding is left to Qt on purpose: Qt advertises gzip and deflate
+    by itself and decompresses the reply transparently only when the header
+    was not set by the caller.
+    """
+
+    JSON_CONTENT_TYPE = "application/json"
+    HTTPS_PORT = 443
+    ENDPOINT_SERVICES = ("places", "routes")
+    WARM_INTERVAL_S = 60.0
+    KEY_REGION = "region_value"
+    KEY_HTTP2_ENABLED = "http2_enabled"
+    KEY_PRECONNECT_ENABLED = "preconnect_enabled"
+    ALPN_PROTOCOLS = (b"h2", b"http/1.1")
+
+    _warmed: ClassVar[Dict[Tuple[int, str], float]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self, configuration_handler: Optional[ConfigurationHandler] = None
+    ) -> None:
+        """
+        Initializes the factory.
+
+        Args:
+            configuration_handler (Optional[ConfigurationHandler]): Settings
+                source. The shared handler is used when omitted.
+        """
+        self.configuration_handler = configuration_handler or ConfigurationHandler()
+
+    def http2_enabled(self) -> bool:
+        """
+        Tells whether requests may use HTTP/2.
+
+        Returns:
+            bool: The http2_enabled setting.
+        """
+        return self.configuration_handler.get_bool_setting(self.KEY_HTTP2_ENABLED)
+
+    def build_request(self, url: str) -> QNetworkRequest:
+        """
+        Builds a request with the shared transport attributes.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            QNetworkRequest: The configured request.
+        """
+        request = QNetworkRequest(QUrl(url))
+        request.setAttribute(
+            QNetworkRequest.Http2AllowedAttribute, self.http2_enabled()
+        )
+        return request
+
+    def build_json_post_request(self, url: str) -> QNetworkRequest:
+        """
+        Builds a request carrying a JSON body.
+
+        Args:
+            url (str): The URL to which the POST request should be sent.
+
+        Returns:
+            QNetworkRequest: The configured request.
+        """
+        request = self.build_request(url)
+        request.setHeader(QNetworkRequest.ContentTypeHeader, self.JSON_CONTENT_TYPE)
+        return request
+
+    @classmethod
+    def endpoint_hosts(cls, region: str) -> List[str]:
+        """
+        Returns the Places and Routes hosts of a region.
+
+        Args:
+            region (str): The AWS region, e.g. "ap-northeast-1".
+
+        Returns:
+            List[str]: One host name per service.
+        """
+        return [
+            f"{service}.geo.{region}.amazonaws.com" for service in cls.ENDPOINT_SERVICES
+        ]
+
+    def preconnect(
+        self, network_manager: Optional[QNetworkAccessManager] = None
+    ) -> List[str]:
+        """
+        Opens TLS connections to the endpoints of the configured region, so
+        that the first request skips the name lookup and handshakes. A host
+        is not connected again within WARM_INTERVAL_S, while Qt still keeps
+        the previous connection open.
+
+        Args:
+            network_manager (Optional[QNetworkAccessManager]): Manager whose
+                connection pool is warmed. Defaults to the QGIS manager of
+                the calling thread.
+
+        Returns:
+            List[str]: The hosts a connection was started to.
+        """
+        settings = self.configuration_handler
+        region = settings.get_setting(self.KEY_REGION)
+        if not region or not settings.get_bool_setting(self.KEY_PRECONNECT_ENABLED):
+            return []
+        manager = network_manager or QgsNetworkAccessManager.instance()
+        now = time.monotonic()
+        hosts = []
+        for host in self.endpoint_hosts(region):
+            key = (id(manager), host)
+            with self._lock:
+                warmed_at = self._warmed.get(key)
+                if warmed_at is not None and now - warmed_at < self.WARM_INTERVAL_S:
+                    continue
+                self._warmed[key] = now
+            self._connect(manager, host)
+            hosts.append(host)
+        return hosts
+
+    def _connect(self, manager: QNetworkAccessManager, host: str) -> None:
+        """
+        Starts an encrypted connection to a host, offering HTTP/2 during the
+        TLS handshake when it is enabled and supported by the Qt version.
+
+        Args:
+            manager (QNetworkAccessManager): Manager owning the connection.
+            host (str): The host name.
+        """
+        if self.http2_enabled():
+            configuration = QSslConfiguration.defaultConfiguration()
+            configuration.setAllowedNextProtocols(list(self.ALPN_PROTOCOLS))
+            try:
+                manager.connectToHostEncrypted(host, self.HTTPS_PORT, configuration)
+                return
+            except TypeError:
+                pass
+        manager.connectToHostEncrypted(host, self.HTTPS_PORT)
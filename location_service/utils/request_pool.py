@@ -0,0 +1,433 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from PyQt5.QtCore import QEventLoop, QTimer
+
+from .external_api_handler import (
+    ApiRequest,
+    ApiRequestError,
+    ErrorCallback,
+    ExternalApiHandler,
+    SuccessCallback,
+)
+from .job_journal import JobJournal
+from .rate_limiter import EndpointLimiter, TokenBucket
+from .result_models import FieldSet
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class PoolJob:
+    """
+    A single request queued in a RequestPool.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback],
+        fields: Optional[FieldSet] = None,
+    ) -> None:
+        """
+        Initializes the job.
+
+        Args:
+            url (str): The URL the request is posted to.
+            data (Dict[str, Any]): The JSON body of the request.
+            on_success (SuccessCallback): Called with the decoded response.
+            on_error (Optional[ErrorCallback]): Called once retries are exhausted.
+            fields (Optional[FieldSet]): Object keys kept when decoding the
+                reply, or None to keep everything.
+        """
+        self.url = url
+        self.data = data
+        self.on_success = on_success
+        self.on_error = on_error
+        self.fields = fields
+        self.key: Optional[str] = None
+        self.attempts = 0
+        self.request: Optional[ApiRequest] = None
+        self.limiter: Optional[EndpointLimiter] = None
+
+
+class RequestPool:
+    """
+    Runs asynchronous API requests with bounded concurrency and an optional
+    request rate limit, and retries transient failures with jittered
+    exponential back-off.
+
+    Every request also goes through the EndpointLimiter of its host, which
+    applies the configured per-endpoint rate, lowers the concurrency when
+    the service throttles and honours Retry-After headers.
+
+    With a JobJournal attached, every request is journaled as it is sent
+    and finishes, and requests already done in an earlier run are answered
+    from the journal without a slot or an API call.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+    DEFAULT_MAX_RETRIES = 3
+    CAPACITY_POLL_SECONDS = 0.05
+
+    def __init__(
+        self,
+        api_handler: Optional[ExternalApiHandler] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        requests_per_second: float = 0.0,
+    ) -> None:
+        """
+        Initializes the pool.
+
+        Args:
+            api_handler (Optional[ExternalApiHandler]): Handler used to send
+                requests. A new one is created when omitted.
+            concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Retries allowed for a transient failure.
+            requests_per_second (float): Maximum rate at which this pool
+                starts new requests, on top of the endpoint limit. Zero
+                disables the limit.
+        """
+        self.api_handler = api_handler or ExternalApiHandler()
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.rate_limit = (
+            TokenBucket(requests_per_second) if requests_per_second > 0 else None
+        )
+        self.on_progress: Optional[ProgressCallback] = None
+        self.on_finished: Optional[Callable[[], None]] = None
+        self.journal: Optional[JobJournal] = None
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self._queue: Deque[PoolJob] = deque()
+        self._sources: Deque[Iterator[PoolJob]] = deque()
+        self._active: List[PoolJob] = []
+        self._backing_off: List[PoolJob] = []
+        self._cancelled = False
+        self._fill_scheduled = False
+        self._finished_notified = False
+
+    def submit(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        on_success: SuccessCallback,
+        on_error: Optional[ErrorCallback] = None,
+        fields: Optional[FieldSet] = None,
+    ) -> None:
+        """
+        Queues a request. It is sent as soon as a slot is free.
+
+        Args:
+            url (str): The URL the request is posted to.
+            data (Dict[str, Any]): The JSON body of the request.
+            on_success (SuccessCallback): Called with the decoded response.
+            on_error (Optional[ErrorCallback]): Called once retries are exhausted.
+            fields (Optional[FieldSet]): Object keys kept when decoding the
+                reply, or None to keep everything.
+        """
+        self._queue.append(PoolJob(url, data, on_success, on_error, fields))
+        self.total += 1
+        self._finished_notified = False
+        self._fill_slots()
+
+    def extend(self, jobs: Iterable[PoolJob], count: int) -> None:
+        """
+        Queues jobs that are pulled from an iterable only when a slot frees
+        up, so large job sets are never materialized at once.
+
+        Args:
+            jobs (Iterable[PoolJob]): The jobs to run, typically a generator.
+            count (int): Number of jobs the iterable yields, used for progress.
+        """
+        self._sources.append(iter(jobs))
+        self.total += count
+        self._finished_notified = False
+        self._fill_slots()
+
+    def completed(self) -> int:
+        """
+        Returns the number of jobs that finished, successfully or not.
+
+        Returns:
+            int: Finished job count.
+        """
+        return self.succeeded + self.failed
+
+    def is_finished(self) -> bool:
+        """
+        Tells whether every submitted job has finished or the pool was cancelled.
+
+        Returns:
+            bool: True when nothing is queued, in flight or waiting to retry.
+        """
+        return (
+            not self._queue
+            and not self._sources
+            and not self._active
+            and not self._backing_off
+        )
+
+    def cancel(self) -> None:
+        """
+        Drops queued jobs and cancels the requests still in flight.
+        """
+        self._cancelled = True
+        self._queue.clear()
+        self._sources.clear()
+        for job in list(self._active):
+            if job.request is not None:
+                self.api_handler.cancel_request(job.request)
+            self._end_flight(job)
+        self._active.clear()
+        self._backing_off.clear()
+        self._notify_finished()
+
+    def wait(self) -> None:
+        """
+        Blocks in a local event loop until the pool is finished. Intended for
+        scripts and worker threads, not for the GUI thread.
+        """
+        if self.is_finished():
+            return
+        event_loop = QEventLoop()
+        previous = self.on_finished
+
+        def quit_loop() -> None:
+            if previous is not None:
+                previous()
+            event_loop.quit()
+
+        self.on_finished = quit_loop
+        event_loop.exec_()
+        self.on_finished = previous
+
+    def _next_job(self) -> Optional[PoolJob]:
+        """
+        Takes the next job from the queue or from the lazy job sources.
+
+        Returns:
+            Optional[PoolJob]: The next job, or None if there is none left.
+        """
+        if self._queue:
+            return self._queue.popleft()
+        while self._sources:
+            job = next(self._sources[0], None)
+            if job is not None:
+                return job
+            self._sources.popleft()
+        return None
+
+    def _fill_slots(self) -> None:
+        """
+        Starts queued jobs until the pool or endpoint concurrency limit is
+        reached, spacing them out to honour the rate limits.
+        """
+        self._fill_scheduled = False
+        while len(self._active) < self.concurrency and not self._cancelled:
+            job = self._next_job()
+            if job is None:
+                return
+            if self._replay(job):
+                continue
+            limiter = EndpointLimiter.for_url(job.url)
+            if not limiter.has_capacity():
+                self._queue.appendleft(job)
+                self._schedule_fill(self.CAPACITY_POLL_SECONDS)
+                return
+            delay = self.rate_limit.try_acquire() if self.rate_limit else 0.0
+            if delay <= 0:
+                delay = limiter.bucket.try_acquire()
+            if delay > 0:
+                self._queue.appendleft(job)
+                self._schedule_fill(delay)
+                return
+            self._active.append(job)
+            if job.key is not None and job.attempts == 0:
+                self.journal.record_pending(job.key)
+            self._dispatch(job)
+
+    def _replay(self, job: PoolJob) -> bool:
+        """
+        Answers a job from the journal if it finished in an earlier run.
+        Replays are reported on the next event loop pass when they leave
+        nothing in flight, so that callers queueing more jobs are not told
+        the pool has finished.
+
+        Args:
+            job (PoolJob): The job taken from the queue.
+
+        Returns:
+            bool: True if the job was answered.
+        """
+        if self.journal is None:
+            return False
+        if job.key is None:
+            job.key = JobJournal.request_key(job.url, job.data)
+        result = self.journal.result(job.key)
+        if result is None:
+            return False
+        self.succeeded += 1
+        try:
+            job.on_success(result)
+        finally:
+            if self.on_progress is not None:
+                self.on_progress(self.completed(), self.total)
+            if not self._active:
+                self._schedule_fill(0.0)
+        return True
+
+    def _schedule_fill(self, delay: float) -> None:
+        """
+        Arranges for _fill_slots to run again once the rate limit allows it.
+
+        Args:
+            delay (float): Seconds to wait.
+        """
+        if self._fill_scheduled:
+            return
+        self._fill_scheduled = True
+        QTimer.singleShot(max(1, int(delay * 1000)), self._on_fill_timer)
+
+    def _on_fill_timer(self) -> None:
+        """
+        Resumes dispatching after a rate limit pause.
+        """
+        self._fill_slots()
+        if self.is_finished():
+            self._notify_finished()
+
+    def _dispatch(self, job: PoolJob) -> None:
+        """
+        Sends a job's request.
+
+        Args:
+            job (PoolJob): The job to send.
+        """
+        if self._cancelled:
+            return
+        job.attempts += 1
+        job.limiter = EndpointLimiter.for_url(job.url)
+        job.limiter.begin_request()
+        job.request = self.api_handler.send_json_post_request_async(
+            job.url,
+            job.data,
+            lambda result: self._on_job_success(job, result),
+            lambda error: self._on_job_error(job, error),
+            fields=job.fields,
+        )
+
+    def _end_flight(self, job: PoolJob) -> None:
+        """
+        Removes a job's request from the in-flight count of its endpoint.
+
+        Args:
+            job (PoolJob): The job whose request finished or was cancelled.
+        """
+        if job.limiter is not None:
+            job.limiter.end_request()
+            job.limiter = None
+
+    def _on_job_success(self, job: PoolJob, result: Dict[str, Any]) -> None:
+        """
+        Hands a successful response to the job's callback.
+
+        Args:
+            job (PoolJob): The job that completed.
+            result (Dict[str, Any]): The decoded response.
+        """
+        limiter = job.limiter
+        self._end_flight(job)
+        self.succeeded += 1
+        if limiter is not None:
+            limiter.on_success()
+        if self.journal is not None and job.key is not None:
+            self.journal.record_done(job.key, result)
+        try:
+            job.on_success(result)
+        finally:
+            self._release(job)
+
+    def _on_job_error(self, job: PoolJob, error: Exception) -> None:
+        """
+        Retries a transient failure or reports the error to the job's callback.
+        The endpoint feedback goes to the limiter the request was sent with;
+        a job cancelled meanwhile has none and is not retried.
+
+        A retry gives up its slot while it backs off and then goes back to
+        the front of the queue, so it waits for a token and for endpoint
+        capacity like any other request.
+
+        Args:
+            job (PoolJob): The job that failed.
+            error (Exception): The failure raised by the request.
+        """
+        limiter = job.limiter
+        self._end_flight(job)
+        retry_after_ms = None
+        transient = False
+        if isinstance(error, ApiRequestError) and limiter is not None:
+            retry_after_ms = error.retry_after_ms
+            transient = error.is_transient
+            limiter.on_failure(error.http_status, retry_after_ms)
+        if transient and job.attempts <= self.max_retries and not self._cancelled:
+            self.retried += 1
+            delay_ms = limiter.retry_delay_ms(job.attempts, retry_after_ms)
+            if job in self._active:
+                self._active.remove(job)
+            self._backing_off.append(job)
+            QTimer.singleShot(delay_ms, lambda: self._requeue(job))
+            self._fill_slots()
+            return
+        self.failed += 1
+        if self.journal is not None and job.key is not None:
+            self.journal.record_failed(job.key, error)
+        try:
+            if job.on_error is not None:
+                job.on_error(error)
+        finally:
+            self._release(job)
+
+    def _requeue(self, job: PoolJob) -> None:
+        """
+        Puts a job back at the front of the queue once its back-off ended.
+
+        Args:
+            job (PoolJob): The job to retry.
+        """
+        if job not in self._backing_off:
+            return
+        self._backing_off.remove(job)
+        self._queue.appendleft(job)
+        self._fill_slots()
+
+    def _release(self, job: PoolJob) -> None:
+        """
+        Frees a job's slot, reports progress and starts the next job.
+
+        Args:
+            job (PoolJob): The job that finished.
+        """
+        if job in self._active:
+            self._active.remove(job)
+        if self.on_progress is not None:
+            self.on_progress(self.completed(), self.total)
+        self._fill_slots()
+        if self.is_finished():
+            self._notify_finished()
+
+    def _notify_finished(self) -> None:
+        """
+        Invokes the finished callback once per batch of submitted jobs.
+        """
+        if self._finished_notified:
+            return
+        self._finished_notified = True
+        if self.journal is not None:
+            self.journal.flush()
+        if self.on_finished is not None:
+            self.on_finished()
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+class ResponseCache:
+    """
+    A persistent, content-addressed cache of API responses stored in SQLite.
+
+    Entries are keyed on the request URL without its API key and on the
+    request body with coordinates rounded to a fixed precision. Expired
+    entries are dropped on read, and the least recently used entries are
+    evicted once the payloads exceed the size limit.
+
+    Access times are recorded at most once per ACCESS_UPDATE_INTERVAL_S for
+    each entry and are written in batches together with the next stored
+    response, so a cache hit does not cost a commit.
+    """
+
+    SECRET_QUERY_KEYS = frozenset({"key", "apikey"})
+    DEFAULT_TTL_SECONDS = 86400
+    DEFAULT_MAX_SIZE_BYTES = 100 * 1024 * 1024
+    DEFAULT_PRECISION = 5
+    ACCESS_UPDATE_INTERVAL_S = 60.0
+    ACCESS_BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        precision: int = DEFAULT_PRECISION,
+    ) -> None:
+        """
+        Opens or creates the cache database.
+
+        Args:
+            path (str): Path to the SQLite file.
+            ttl_seconds (int): Lifetime of an entry. Zero disables expiry.
+            max_size_bytes (int): Upper bound on the stored payload size.
+            precision (int): Decimal places kept when normalizing coordinates.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self._connection.commit()
+        self._entries, self._size = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def make_key(self, url: str, data: Dict[str, Any]) -> str:
+        """
+        Builds the cache key of a request.
+
+        Args:
+            url (str): The request URL. Secret query parameters are dropped.
+            data (Dict[str, Any]): The JSON body of the request.
+
+        Returns:
+            str: A SHA-256 hex digest identifying the request.
+        """
+        body = json.dumps(self.normalize(data), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{self.public_url(url)}\n{body}".encode()).hexdigest()
+
+    @classmethod
+    def public_url(cls, url: str) -> str:
+        """
+        Drops the secret query parameters of a URL and sorts the others.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            str: The URL without its API key.
+        """
+        parts = urlsplit(url)
+        query = sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if name.lower() not in cls.SECRET_QUERY_KEYS
+        )
+        return urlunsplit(
+            (parts.scheme, parts.netloc, parts.path, urlencode(query), "")
+        )
+
+    def normalize(self, value: Any) -> Any:
+        """
+        Rounds every float in a request body so nearby coordinates share a key.
+
+        Args:
+            value (Any): A JSON-compatible value.
+
+        Returns:
+            Any: The normalized value.
+        """
+        if isinstance(value, float):
+            return round(value, self.precision)
+        if isinstance(value, dict):
+            return {key: self.normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.normalize(item) for item in value]
+        return value
+
+    def get(self, url: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the cached response of a request.
+
+        Args:
+            url (str): The request URL.
+            data (Dict[str, Any]): The JSON body of the request.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached response, or None on a miss.
+        """
+        key = self.make_key(url, data)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload, size, created, accessed FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and self._is_expired(row[2], now):
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self._accessed.pop(key, None)
+                self._entries -= 1
+                self._size -= row[1]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            accessed = self._accessed.get(key, row[3])
+            if now - accessed >= self.ACCESS_UPDATE_INTERVAL_S:
+                self._accessed[key] = now
+                if len(self._accessed) >= self.ACCESS_BATCH_SIZE:
+                    self._write_access_times()
+                    self._connection.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        response: Dict[str, Any],
+        payload: Optional[bytes] = None,
+    ) -> None:
+        """
+        Stores the response of a request and evicts old entries if needed.
+
+        Args:
+            url (str): The request URL.
+            data (Dict[str, Any]): The JSON body of the request.
+            response (Dict[str, Any]): The decoded response to store.
+            payload (Optional[bytes]): The UTF-8 JSON body the response was
+                decoded from. Stored as is when given.
+        """
+        key = self.make_key(url, data)
+        if not payload:
+            payload = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.max_size_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, payload, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._accessed.pop(key, None)
+            if previous is None:
+                self._entries += 1
+            else:
+                self._size -= previous[0]
+            self._size += len(payload)
+            self._write_access_times()
+            self._evict()
+            self._connection.commit()
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+            self._accessed.clear()
+            self._entries = self._size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Reports the cache counters and current size.
+
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, entries and stored bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": self._entries,
+                "size_bytes": self._size,
+            }
+
+    def close(self) -> None:
+        """
+        Writes the pending access times and closes the database connection.
+        """
+        with self._lock:
+            self._write_access_times()
+            self._connection.commit()
+            self._connection.close()
+
+    def _write_access_times(self) -> None:
+        """
+        Writes the buffered access times without committing. Must be called
+        with the lock held.
+        """
+        if not self._accessed:
+            return
+        self._connection.executemany(
+            "UPDATE responses SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        """
+        Tells whether an entry outlived the TTL.
+
+        Args:
+            created (float): Creation timestamp of the entry.
+            now (float): Current timestamp.
+
+        Returns:
+            bool: True if the entry must not be served.
+        """
+        return self.ttl_seconds > 0 and now - created > self.ttl_seconds
+
+    def _evict(self) -> None:
+        """
+        Deletes least recently used entries until the size limit is met.
+        Must be called with the lock held.
+        """
+        while self._size > self.max_size_bytes:
+            row = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._size -= row[1]
+            self._entries -= 1
+            self.evictions += 1
@@ -0,0 +1,210 @@
+import json
+from array import array
+from typing import Any, Dict, FrozenSet, List, Optional, Union
+
+from .geometry_codec import decode_flexible_polyline, flatten_coordinates
+
+FieldSet = FrozenSet[str]
+
+
+def decode_json(body: Union[bytes, str], fields: Optional[FieldSet] = None) -> Any:
+    """
+    Decodes a JSON response, keeping only the object keys in fields.
+
+    This is not a streaming decoder: the whole body is parsed in one
+    json.loads call. An object_hook filters each object as it is decoded,
+    so the result holds only the kept keys and the values of dropped keys
+    can be freed once their enclosing object has been built.
+
+    Args:
+        body (Union[bytes, str]): The response body.
+        fields (Optional[FieldSet]): Object keys to keep at any depth, or
+            None to keep everything.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if fields is None:
+        return json.loads(body)
+    return json.loads(
+        body,
+        object_hook=lambda obj: {
+            key: value for key, value in obj.items() if key in fields
+        },
+    )
+
+
+class PlaceItem:
+    """
+    The attributes of one places result used by the plugin.
+    """
+
+    __slots__ = (
+        "distance",
+        "label",
+        "lat",
+        "locality",
+        "lon",
+        "place_id",
+        "region",
+        "title",
+    )
+
+    FIELDS: FieldSet = frozenset(
+        (
+            "ResultItems",
+            "Position",
+            "Title",
+            "PlaceId",
+            "Distance",
+            "Address",
+            "Label",
+            "Region",
+            "Name",
+            "Locality",
+        )
+    )
+
+    def __init__(
+        self,
+        lon: float,
+        lat: float,
+        title: str = "",
+        region: str = "",
+        locality: str = "",
+        label: str = "",
+        place_id: Optional[str] = None,
+        distance: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes the item.
+
+        Args:
+            lon (float): Longitude of the place.
+            lat (float): Latitude of the place.
+            title (str): Name of the place.
+            region (str): Region name of the address.
+            locality (str): Locality of the address.
+            label (str): Full address label.
+            place_id (Optional[str]): Id of the place.
+            distance (Optional[int]): Distance in meters from the query
+                position, when the API reports one.
+        """
+        self.lon = lon
+        self.lat = lat
+        self.title = title
+        self.region = region
+        self.locality = locality
+        self.label = label
+        self.place_id = place_id
+        self.distance = distance
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "PlaceItem":
+        """
+        Extracts the used attributes of a result item.
+
+        Args:
+            item (Dict[str, Any]): One entry of "ResultItems".
+
+        Returns:
+            PlaceItem: The item.
+        """
+        address = item.get("Address") or {}
+        position = item.get("Position") or (None, None)
+        return cls(
+            position[0],
+            position[1],
+            item.get("Title", ""),
+            (address.get("Region") or {}).get("Name", ""),
+            address.get("Locality", ""),
+            address.get("Label", ""),
+            item.get("PlaceId"),
+            item.get("Distance"),
+        )
+
+    @classmethod
+    def from_response(cls, result: Dict[str, Any]) -> List["PlaceItem"]:
+        """
+        Extracts the items of a search-text or reverse-geocode response.
+
+        Args:
+            result (Dict[str, Any]): The decoded response.
+
+        Returns:
+            List[PlaceItem]: One item per result.
+        """
+        return [cls.from_item(item) for item in result.get("ResultItems") or []]
+
+
+class RouteLeg:
+    """
+    The geometry and road name of one route leg.
+    """
+
+    __slots__ = ("coordinates", "road_name")
+
+    FIELDS: FieldSet = frozenset(
+        (
+            "Routes",
+            "Legs",
+            "Geometry",
+            "Polyline",
+            "LineString",
+            "MajorRoadLabels",
+            "RoadName",
+            "Value",
+            "Summary",
+            "Distance",
+            "Duration",
+        )
+    )
+
+    def __init__(self, coordinates: array, road_name: Optional[str] = None) -> None:
+        """
+        Initializes the leg.
+
+        Args:
+            coordinates (array): Interleaved longitude and latitude values.
+            road_name (Optional[str]): Name of the major road of the route.
+        """
+        self.coordinates = coordinates
+        self.road_name = road_name
+
+    @staticmethod
+    def coordinates_of(leg: Dict[str, Any]) -> array:
+        """
+        Decodes the geometry of a route leg into a flat coordinate buffer.
+
+        Args:
+            leg (Dict[str, Any]): A route leg with either a FlexiblePolyline
+                "Polyline" or a Simple "LineString" geometry.
+
+        Returns:
+            array: Interleaved longitude and latitude values.
+        """
+        leg_geometry = leg["Geometry"]
+        if "Polyline" in leg_geometry:
+            return decode_flexible_polyline(leg_geometry["Polyline"])
+        return flatten_coordinates(leg_geometry["LineString"])
+
+    @classmethod
+    def from_response(cls, result: Dict[str, Any]) -> List["RouteLeg"]:
+        """
+        Extracts the legs of a routes response. The road name of a route is
+        the last of its major road labels.
+
+        Args:
+            result (Dict[str, Any]): The decoded response.
+
+        Returns:
+            List[RouteLeg]: The legs of every route, in order.
+        """
+        legs = []
+        for route in result.get("Routes") or []:
+            road_name = None
+            for road in route.get("MajorRoadLabels") or []:
+                road_name = (road.get("RoadName") or {}).get("Value")
+            for leg in route.get("Legs") or []:
+                legs.append(cls(cls.coordinates_of(leg), road_name))
+        return legs
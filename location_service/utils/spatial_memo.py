@@ -0,0 +1,271 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+GridCell = Tuple[int, int]
+
+
+class MemoEntry:
+    """
+    A response remembered together with the query and the position it was
+    requested for.
+    """
+
+    __slots__ = ("cell", "entry_id", "lat", "lon", "query_key", "result")
+
+    def __init__(
+        self,
+        entry_id: int,
+        query_key: str,
+        lon: float,
+        lat: float,
+        cell: GridCell,
+        result: Dict[str, Any],
+    ) -> None:
+        """
+        Initializes the entry.
+
+        Args:
+            entry_id (int): Insertion number, used as the eviction order.
+            query_key (str): The normalized query the response answers.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            cell (GridCell): Grid cell holding the position.
+            result (Dict[str, Any]): The decoded response.
+        """
+        self.entry_id = entry_id
+        self.query_key = query_key
+        self.lon = lon
+        self.lat = lat
+        self.cell = cell
+        self.result = result
+
+
+class SpatialMemoIndex:
+    """
+    An in-memory grid index of responses by the position they were
+    requested for.
+
+    A query repeated within the tolerance radius of a remembered one is
+    answered from memory. The oldest entries are evicted first once the
+    entry limit is reached.
+    """
+
+    EARTH_RADIUS_M = 6371008.8
+    METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+    MIN_COS_LATITUDE = 0.01
+
+    def __init__(self, radius_m: float = 25.0, max_entries: int = 1000) -> None:
+        """
+        Initializes an empty index.
+
+        Args:
+            radius_m (float): Distance within which a remembered response
+                answers the same query.
+            max_entries (int): Number of responses kept.
+        """
+        self.radius_m = max(0.1, float(radius_m))
+        self.max_entries = max(1, int(max_entries))
+        self.cell_degrees = self.radius_m / self.METERS_PER_DEGREE
+        self._entries: OrderedDict[int, MemoEntry] = OrderedDict()
+        self._cells: Dict[GridCell, List[MemoEntry]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of remembered responses.
+        """
+        return len(self._entries)
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """
+        Normalizes query text so that differences in case and spacing do not
+        count as different queries.
+
+        Args:
+            text (str): The query text.
+
+        Returns:
+            str: The normalized text.
+        """
+        return " ".join(text.split()).casefold()
+
+    @classmethod
+    def distance_m(cls, lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+        """
+        Computes the great-circle distance between two positions.
+
+        Args:
+            lon1 (float): Longitude of the first position.
+            lat1 (float): Latitude of the first position.
+            lon2 (float): Longitude of the second position.
+            lat2 (float): Latitude of the second position.
+
+        Returns:
+            float: Distance in meters.
+        """
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        half_dphi = (phi2 - phi1) / 2.0
+        half_dlambda = math.radians(lon2 - lon1) / 2.0
+        a = (
+            math.sin(half_dphi) ** 2
+            + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+        )
+        return 2.0 * cls.EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+    def cell_for(self, lon: float, lat: float) -> GridCell:
+        """
+        Returns the grid cell holding a position.
+
+        Args:
+            lon (float): Longitude.
+            lat (float): Latitude.
+
+        Returns:
+            GridCell: Column and row of the cell.
+        """
+        return (
+            math.floor(lon / self.cell_degrees),
+            math.floor(lat / self.cell_degrees),
+        )
+
+    def _cells_within(
+        self, lon: float, lat: float, radius_m: float
+    ) -> Iterator[GridCell]:
+        """
+        Yields the grid cells that may hold positions within a radius.
+
+        Args:
+            lon (float): Longitude of the center.
+            lat (float): Latitude of the center.
+            radius_m (float): Search radius.
+        """
+        column, row = self.cell_for(lon, lat)
+        rows = math.ceil(radius_m / self.radius_m)
+        cos_lat = max(
+            self.MIN_COS_LATITUDE,
+            math.cos(math.radians(min(89.9, abs(lat) + rows * self.cell_degrees))),
+        )
+        columns = math.ceil(rows / cos_lat)
+        for d_row in range(-rows, rows + 1):
+            for d_column in range(-columns, columns + 1):
+                yield (column + d_column, row + d_row)
+
+    def _nearby(
+        self, query_key: str, lon: float, lat: float, radius_m: float
+    ) -> List[Tuple[float, MemoEntry]]:
+        """
+        Finds remembered responses to a query within a radius.
+
+        Args:
+            query_key (str): The normalized query.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            radius_m (float): Search radius.
+
+        Returns:
+            List[Tuple[float, MemoEntry]]: Distances and entries, nearest first.
+        """
+        found = []
+        for cell in self._cells_within(lon, lat, radius_m):
+            for entry in self._cells.get(cell, ()):
+                if entry.query_key != query_key:
+                    continue
+                distance = self.distance_m(lon, lat, entry.lon, entry.lat)
+                if distance <= radius_m:
+                    found.append((distance, entry))
+        found.sort(key=lambda pair: (pair[0], -pair[1].entry_id))
+        return found
+
+    def lookup(
+        self, query_key: str, lon: float, lat: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the response remembered for the same query nearest to the
+        position, if it lies within the tolerance radius.
+
+        Args:
+            query_key (str): The normalized query.
+            lon (float): Longitude of the bias position. Numeric strings, as
+                typed into the dialogs, are accepted.
+            lat (float): Latitude of the bias position.
+
+        Returns:
+            Optional[Dict[str, Any]]: The remembered response, or None.
+        """
+        lon, lat = float(lon), float(lat)
+        with self._lock:
+            found = self._nearby(query_key, lon, lat, self.radius_m)
+            if not found:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return found[0][1].result
+
+    def put(
+        self, query_key: str, lon: float, lat: float, result: Dict[str, Any]
+    ) -> None:
+        """
+        Remembers a response, evicting the oldest ones beyond the entry limit.
+
+        Args:
+            query_key (str): The normalized query.
+            lon (float): Longitude of the bias position.
+            lat (float): Latitude of the bias position.
+            result (Dict[str, Any]): The decoded response.
+        """
+        lon, lat = float(lon), float(lat)
+        cell = self.cell_for(lon, lat)
+        with self._lock:
+            entry = MemoEntry(self._next_id, query_key, lon, lat, cell, result)
+            self._next_id += 1
+            self._entries[entry.entry_id] = entry
+            self._cells.setdefault(cell, []).append(entry)
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                self._remove_from_cell(oldest)
+                self.evictions += 1
+
+    def _remove_from_cell(self, entry: MemoEntry) -> None:
+        """
+        Drops an entry from its grid cell.
+
+        Args:
+            entry (MemoEntry): The entry to drop.
+        """
+        bucket = self._cells.get(entry.cell)
+        if bucket is None:
+            return
+        bucket.remove(entry)
+        if not bucket:
+            del self._cells[entry.cell]
+
+    def clear(self) -> None:
+        """
+        Forgets every remembered response.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._cells.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the lookup counters of the index.
+
+        Returns:
+            Dict[str, int]: Entries, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,103 @@
+from typing import Callable, List, Optional, Sequence
+
+CostFunction = Callable[[int, int], float]
+
+
+def path_cost(order: Sequence[int], cost: CostFunction) -> float:
+    """
+    Sums the cost of visiting stops in the given order.
+
+    Args:
+        order (Sequence[int]): Stop indices in visiting order.
+        cost (CostFunction): Cost of travelling from one stop to another.
+
+    Returns:
+        float: The total cost of the open path.
+    """
+    return sum(cost(order[i], order[i + 1]) for i in range(len(order) - 1))
+
+
+def nearest_neighbour_order(
+    count: int, cost: CostFunction, start: int = 0, end: Optional[int] = None
+) -> List[int]:
+    """
+    Builds a visiting order by always travelling to the cheapest unvisited
+    stop next.
+
+    Args:
+        count (int): Number of stops.
+        cost (CostFunction): Cost of travelling from one stop to another.
+        start (int): Index of the first stop.
+        end (Optional[int]): Index of a stop that must come last.
+
+    Returns:
+        List[int]: Every stop index exactly once.
+    """
+    if count == 0:
+        return []
+    remaining = set(range(count))
+    remaining.discard(start)
+    if end is not None:
+        remaining.discard(end)
+    order = [start]
+    while remaining:
+        current = order[-1]
+        following = min(remaining, key=lambda stop: (cost(current, stop), stop))
+        remaining.remove(following)
+        order.append(following)
+    if end is not None and end != start:
+        order.append(end)
+    return order
+
+
+def two_opt(
+    order: Sequence[int],
+    cost: CostFunction,
+    fixed_end: bool = False,
+    max_moves: int = 10000,
+) -> List[int]:
+    """
+    Improves a visiting order by reversing segments while that lowers the
+    total cost. The first stop always stays first.
+
+    Reversing a segment also reverses the direction of its inner edges, so
+    prefix sums of the forward and backward edge costs are kept to evaluate
+    each move in constant time even when the costs are asymmetric.
+
+    Args:
+        order (Sequence[int]): Initial visiting order.
+        cost (CostFunction): Cost of travelling from one stop to another.
+        fixed_end (bool): Keep the last stop last.
+        max_moves (int): Upper bound of segment reversals.
+
+    Returns:
+        List[int]: The improved order.
+    """
+    order = list(order)
+    count = len(order)
+    last = count - 2 if fixed_end else count - 1
+    for _ in range(max_moves):
+        forward = [0.0] * count
+        backward = [0.0] * count
+        for index in range(1, count):
+            forward[index] = forward[index - 1] + cost(order[index - 1], order[index])
+            backward[index] = backward[index - 1] + cost(order[index], order[index - 1])
+        improved = False
+        for i in range(1, last):
+            before = order[i - 1]
+            for k in range(i + 1, last + 1):
+                after = order[k + 1] if k + 1 < count else None
+                old = cost(before, order[i]) + forward[k] - forward[i]
+                new = cost(before, order[k]) + backward[k] - backward[i]
+                if after is not None:
+                    old += cost(order[k], after)
+                    new += cost(order[i], after)
+                if new < old - 1e-9:
+                    order[i : k + 1] = reversed(order[i : k + 1])
+                    improved = True
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+    return order
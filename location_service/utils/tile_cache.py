@@ -0,0 +1,330 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+BoundingBox = Tuple[float, float, float, float]
+TileKey = Tuple[int, int, int]
+
+
+class TileCache:
+    """
+    A size-bounded raster tile store in the MBTiles layout.
+
+    Tiles are addressed with XYZ coordinates and stored with the TMS row
+    order required by MBTiles, so the file can be opened directly by the
+    GDAL MBTiles driver for offline use. Once the stored data exceeds the
+    size limit, the tiles fetched first are evicted first (FIFO). Reads
+    are not tracked, because the offline layer is rendered by GDAL from
+    the file without going through this class; the accessed column holds
+    the time a tile was fetched.
+
+    Writes are committed in batches of COMMIT_BATCH_SIZE tiles, or after
+    COMMIT_INTERVAL_S, and by flush and close.
+    """
+
+    DEFAULT_MAX_SIZE_BYTES = 500 * 1024 * 1024
+    MAX_LATITUDE = 85.0511287798
+    COMMIT_BATCH_SIZE = 200
+    COMMIT_INTERVAL_S = 1.0
+
+    def __init__(self, path: str, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES) -> None:
+        """
+        Opens or creates the MBTiles file.
+
+        Args:
+            path (str): Path to the .mbtiles file.
+            max_size_bytes (int): Upper bound on the stored tile data.
+        """
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._uncommitted = 0
+        self._committed_at = time.monotonic()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tiles ("
+            "zoom_level INTEGER NOT NULL, tile_column INTEGER NOT NULL, "
+            "tile_row INTEGER NOT NULL, tile_data BLOB NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (zoom_level, tile_column, tile_row))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS tiles_accessed ON tiles (accessed)"
+        )
+        self._connection.commit()
+        self._tile_count, self._size = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tiles"
+        ).fetchone()
+
+    @staticmethod
+    def tms_row(zoom: int, y: int) -> int:
+        """
+        Converts an XYZ row to the TMS row used by MBTiles.
+
+        Args:
+            zoom (int): Zoom level.
+            y (int): XYZ row.
+
+        Returns:
+            int: TMS row.
+        """
+        return (1 << zoom) - 1 - y
+
+    @classmethod
+    def tile_for(cls, lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+        """
+        Returns the XYZ tile containing a WGS84 position.
+
+        Args:
+            lon (float): Longitude.
+            lat (float): Latitude.
+            zoom (int): Zoom level.
+
+        Returns:
+            Tuple[int, int]: Tile column and row.
+        """
+        lat = max(-cls.MAX_LATITUDE, min(cls.MAX_LATITUDE, lat))
+        count = 1 << zoom
+        x = int((lon + 180.0) / 360.0 * count)
+        lat_rad = math.radians(lat)
+        y = int(
+            (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi)
+            / 2.0
+            * count
+        )
+        return min(max(x, 0), count - 1), min(max(y, 0), count - 1)
+
+    @classmethod
+    def tile_range(cls, bbox: BoundingBox, zoom: int) -> Tuple[int, int, int, int]:
+        """
+        Returns the XYZ tile range covering a WGS84 bounding box.
+
+        Args:
+            bbox (BoundingBox): West, south, east and north bounds.
+            zoom (int): Zoom level.
+
+        Returns:
+            Tuple[int, int, int, int]: Minimum and maximum column, minimum
+            and maximum row.
+        """
+        west, south, east, north = bbox
+        min_x, min_y = cls.tile_for(west, north, zoom)
+        max_x, max_y = cls.tile_for(east, south, zoom)
+        return min_x, max_x, min_y, max_y
+
+    @classmethod
+    def count_tiles(cls, bbox: BoundingBox, min_zoom: int, max_zoom: int) -> int:
+        """
+        Counts the tiles covering a bounding box over a zoom range.
+
+        Args:
+            bbox (BoundingBox): West, south, east and north bounds.
+            min_zoom (int): First zoom level.
+            max_zoom (int): Last zoom level.
+
+        Returns:
+            int: Number of tiles.
+        """
+        total = 0
+        for zoom in range(min_zoom, max_zoom + 1):
+            min_x, max_x, min_y, max_y = cls.tile_range(bbox, zoom)
+            total += (max_x - min_x + 1) * (max_y - min_y + 1)
+        return total
+
+    @classmethod
+    def iter_tiles(
+        cls, bbox: BoundingBox, min_zoom: int, max_zoom: int
+    ) -> Iterator[TileKey]:
+        """
+        Iterates over the XYZ tiles covering a bounding box over a zoom range.
+
+        Args:
+            bbox (BoundingBox): West, south, east and north bounds.
+            min_zoom (int): First zoom level.
+            max_zoom (int): Last zoom level.
+
+        Yields:
+            TileKey: Zoom, column and row of each tile.
+        """
+        for zoom in range(min_zoom, max_zoom + 1):
+            min_x, max_x, min_y, max_y = cls.tile_range(bbox, zoom)
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    yield zoom, x, y
+
+    def contains(self, zoom: int, x: int, y: int) -> bool:
+        """
+        Tells whether a tile is stored.
+
+        Args:
+            zoom (int): Zoom level.
+            x (int): XYZ column.
+            y (int): XYZ row.
+
+        Returns:
+            bool: True if the tile is cached.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM tiles "
+                "WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (zoom, x, self.tms_row(zoom, y)),
+            ).fetchone()
+        return row is not None
+
+    def get(self, zoom: int, x: int, y: int) -> Optional[bytes]:
+        """
+        Reads a tile.
+
+        Args:
+            zoom (int): Zoom level.
+            x (int): XYZ column.
+            y (int): XYZ row.
+
+        Returns:
+            Optional[bytes]: The encoded tile image, or None on a miss.
+        """
+        with self._lock:
+            result = self._connection.execute(
+                "SELECT tile_data FROM tiles "
+                "WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (zoom, x, self.tms_row(zoom, y)),
+            ).fetchone()
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return bytes(result[0])
+
+    def put(self, zoom: int, x: int, y: int, data: bytes) -> None:
+        """
+        Stores a tile and evicts the oldest tiles if the size limit is
+        exceeded.
+
+        Args:
+            zoom (int): Zoom level.
+            x (int): XYZ column.
+            y (int): XYZ row.
+            data (bytes): The encoded tile image.
+        """
+        row = self.tms_row(zoom, y)
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM tiles "
+                "WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (zoom, x, row),
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO tiles "
+                "(zoom_level, tile_column, tile_row, tile_data, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (zoom, x, row, data, len(data), time.time()),
+            )
+            if previous is None:
+                self._tile_count += 1
+            else:
+                self._size -= previous[0]
+            self._size += len(data)
+            self._evict()
+            self._uncommitted += 1
+            if (
+                self._uncommitted >= self.COMMIT_BATCH_SIZE
+                or time.monotonic() - self._committed_at >= self.COMMIT_INTERVAL_S
+            ):
+                self._commit()
+
+    def flush(self) -> None:
+        """
+        Commits the tiles stored since the last commit, so that other
+        readers of the file such as GDAL see them.
+        """
+        with self._lock:
+            self._commit()
+
+    def average_tile_size(self) -> Optional[float]:
+        """
+        Returns the mean size of the stored tiles.
+
+        Returns:
+            Optional[float]: Bytes per tile, or None if the cache is empty.
+        """
+        with self._lock:
+            if not self._tile_count:
+                return None
+            return self._size / self._tile_count
+
+    def set_metadata(self, values: Dict[str, str]) -> None:
+        """
+        Writes MBTiles metadata entries such as name, format and bounds.
+
+        Args:
+            values (Dict[str, str]): Metadata names and values.
+        """
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                values.items(),
+            )
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Reports the cache counters and current size.
+
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, tiles and stored bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "tiles": self._tile_count,
+                "size_bytes": self._size,
+            }
+
+    def close(self) -> None:
+        """
+        Commits pending writes and closes the database connection.
+        """
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def _commit(self) -> None:
+        """
+        Commits pending writes. Must be called with the lock held.
+        """
+        self._committed_at = time.monotonic()
+        if not self._uncommitted:
+            return
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def _evict(self) -> None:
+        """
+        Deletes the tiles fetched first until the size limit is met.
+        Must be called with the lock held.
+        """
+        while self._size > self.max_size_bytes:
+            row = self._connection.execute(
+                "SELECT rowid, size FROM tiles ORDER BY accessed LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._connection.execute("DELETE FROM tiles WHERE rowid = ?", (row[0],))
+            self._size -= row[1]
+            self._tile_count -= 1
+            self.evictions += 1
@@ -0,0 +1,217 @@
+import math
+import threading
+from array import array
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCsException,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProject,
+    QgsVectorLayer,
+)
+
+from .geometry_codec import linestring_coordinates, linestring_wkb
+
+Position = Tuple[float, float]
+
+
+class Wgs84Transformer:
+    """
+    Transforms coordinates to WGS84 through transforms shared by source CRS.
+
+    Creating a QgsCoordinateTransform sets up a PROJ pipeline, which costs
+    far more than transforming a point with it. The transforms are created
+    once per source CRS and dropped when the project CRS or its transform
+    context changes. Coordinate buffers are transformed in one call by
+    passing them through a single line geometry.
+    """
+
+    WGS84_CRS = "EPSG:4326"
+    DEFAULT_CHUNK_SIZE = 1000
+
+    _transforms: ClassVar[Dict[str, QgsCoordinateTransform]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _watched_project: ClassVar[Optional[QgsProject]] = None
+
+    @classmethod
+    def transform_for(cls, crs: QgsCoordinateReferenceSystem) -> QgsCoordinateTransform:
+        """
+        Returns the transform from a CRS to WGS84.
+
+        Args:
+            crs (QgsCoordinateReferenceSystem): The source CRS.
+
+        Returns:
+            QgsCoordinateTransform: A copy of the shared transform, which is
+            cheap since transforms are implicitly shared.
+        """
+        cls._watch_project()
+        key = crs.authid() or crs.toWkt()
+        with cls._lock:
+            transform = cls._transforms.get(key)
+            if transform is None:
+                transform = QgsCoordinateTransform(
+                    crs,
+                    QgsCoordinateReferenceSystem(cls.WGS84_CRS),
+                    QgsProject.instance(),
+                )
+                cls._transforms[key] = transform
+        return QgsCoordinateTransform(transform)
+
+    @classmethod
+    def _watch_project(cls) -> None:
+        """
+        Connects the invalidation to the signals of the current project once.
+        """
+        project = QgsProject.instance()
+        if cls._watched_project is project:
+            return
+        cls._watched_project = project
+        project.crsChanged.connect(cls.invalidate)
+        project.transformContextChanged.connect(cls.invalidate)
+
+    @classmethod
+    def invalidate(cls, *_: Any) -> None:
+        """
+        Drops every cached transform.
+        """
+        with cls._lock:
+            cls._transforms.clear()
+
+    @classmethod
+    def transform_point(
+        cls, point: QgsPointXY, crs: QgsCoordinateReferenceSystem
+    ) -> QgsPointXY:
+        """
+        Transforms a single point to WGS84.
+
+        Args:
+            point (QgsPointXY): The point in the source CRS.
+            crs (QgsCoordinateReferenceSystem): The source CRS.
+
+        Returns:
+            QgsPointXY: The point in WGS84.
+        """
+        return cls.transform_for(crs).transform(point)
+
+    @classmethod
+    def transform_coordinates(
+        cls, flat: array, crs: QgsCoordinateReferenceSystem
+    ) -> array:
+        """
+        Transforms a flat coordinate buffer to WGS84 in one call.
+
+        If the batch cannot be transformed as a whole, the points are
+        transformed one by one and those that fail become NaN.
+
+        Args:
+            flat (array): Interleaved x and y values in the source CRS.
+            crs (QgsCoordinateReferenceSystem): The source CRS.
+
+        Returns:
+            array: Interleaved longitude and latitude values.
+        """
+        transform = cls.transform_for(crs)
+        if not flat or transform.isShortCircuited():
+            return array("d", flat)
+        geometry = QgsGeometry()
+        geometry.fromWkb(linestring_wkb(flat))
+        try:
+            geometry.transform(transform)
+            return linestring_coordinates(bytes(geometry.asWkb()))
+        except QgsCsException:
+            pass
+        result = array("d", flat)
+        for index in range(0, len(flat), 2):
+            try:
+                point = transform.transform(QgsPointXY(flat[index], flat[index + 1]))
+                result[index], result[index + 1] = point.x(), point.y()
+            except QgsCsException:
+                result[index] = result[index + 1] = float("nan")
+        return result
+
+    @classmethod
+    def iter_feature_positions(
+        cls,
+        features: Iterable[QgsFeature],
+        crs: QgsCoordinateReferenceSystem,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Tuple[QgsFeature, Optional[Position]]]:
+        """
+        Pairs features with their WGS84 position, transforming the positions
+        of each chunk of features in one call. Lines and polygons are
+        represented by their centroid.
+
+        Args:
+            features (Iterable[QgsFeature]): The source features.
+            crs (QgsCoordinateReferenceSystem): CRS of the feature geometries.
+            chunk_size (int): Number of features transformed together.
+
+        Yields:
+            Tuple[QgsFeature, Optional[Position]]: Each feature with its
+            longitude and latitude, or None if it has no geometry or could
+            not be transformed.
+        """
+        chunk: List[QgsFeature] = []
+        flat = array("d")
+        has_position: List[bool] = []
+
+        def flush() -> Iterator[Tuple[QgsFeature, Optional[Position]]]:
+            transformed = cls.transform_coordinates(flat, crs)
+            index = 0
+            for feature, present in zip(chunk, has_position):
+                position = None
+                if present:
+                    lon, lat = transformed[index], transformed[index + 1]
+                    index += 2
+                    if not (math.isnan(lon) or math.isnan(lat)):
+                        position = (lon, lat)
+                yield feature, position
+
+        for feature in features:
+            geometry = feature.geometry()
+            present = geometry is not None and not geometry.isEmpty()
+            if present:
+                point = geometry.centroid().asPoint()
+                flat.append(point.x())
+                flat.append(point.y())
+            chunk.append(feature)
+            has_position.append(present)
+            if len(chunk) >= chunk_size:
+                yield from flush()
+                chunk, flat, has_position = [], array("d"), []
+        if chunk:
+            yield from flush()
+
+    @classmethod
+    def transform_layer(
+        cls, layer: QgsVectorLayer, request: Optional[QgsFeatureRequest] = None
+    ) -> Tuple[List[int], array]:
+        """
+        Reads the WGS84 position of every feature of a layer.
+
+        Args:
+            layer (QgsVectorLayer): The source layer.
+            request (Optional[QgsFeatureRequest]): Features to read. All
+                features without attributes by default.
+
+        Returns:
+            Tuple[List[int], array]: Ids of the features with a position and
+            their interleaved longitude and latitude values.
+        """
+        if request is None:
+            request = QgsFeatureRequest().setNoAttributes()
+        ids: List[int] = []
+        flat = array("d")
+        for feature, position in cls.iter_feature_positions(
+            layer.getFeatures(request), layer.crs()
+        ):
+            if position is not None:
+                ids.append(feature.id())
+                flat.extend(position)
+        return ids, flat
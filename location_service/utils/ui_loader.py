@@ -0,0 +1,85 @@
+import importlib.util
+import os
+from types import ModuleType
+from typing import Dict, Optional
+
+from PyQt5.QtWidgets import QWidget
+from qgis.PyQt import uic
+
+COMPILED_SUFFIX = "_ui.py"
+
+_compiled_modules: Dict[str, Optional[ModuleType]] = {}
+
+
+def compiled_ui_path(ui_path: str) -> str:
+    """
+    Returns the path of the Python module precompiled from a .ui file, e.g.
+    ui/config/config_ui.py for ui/config/config.ui.
+
+    Args:
+        ui_path (str): Path of the Qt Designer file.
+
+    Returns:
+        str: Path of the precompiled module, which may not exist.
+    """
+    return os.path.splitext(ui_path)[0] + COMPILED_SUFFIX
+
+
+def _load_compiled_module(ui_path: str) -> Optional[ModuleType]:
+    """
+    Imports the precompiled module of a .ui file if it exists and is not
+    older than the .ui file.
+
+    Args:
+        ui_path (str): Path of the Qt Designer file.
+
+    Returns:
+        Optional[ModuleType]: The module, or None to fall back to parsing
+        the .ui file.
+    """
+    if ui_path in _compiled_modules:
+        return _compiled_modules[ui_path]
+    module = None
+    module_path = compiled_ui_path(ui_path)
+    if os.path.exists(module_path) and os.path.getmtime(
+        module_path
+    ) >= os.path.getmtime(ui_path):
+        name = os.path.splitext(os.path.basename(module_path))[0]
+        spec = importlib.util.spec_from_file_location(name, module_path)
+        if spec is not None and spec.loader is not None:
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+    _compiled_modules[ui_path] = module
+    return module
+
+
+def load_ui(ui_path: str, widget: QWidget) -> QWidget:
+    """
+    Builds the widgets of a Qt Designer file into a widget.
+
+    A module generated with "make compile-ui" next to the .ui file is used
+    when present, which skips parsing the XML at runtime. Otherwise the
+    file is loaded with uic.loadUi. Either way the child widgets become
+    attributes of the widget.
+
+    Args:
+        ui_path (str): Path of the Qt Designer file.
+        widget (QWidget): The widget to populate.
+
+    Returns:
+        QWidget: The populated widget.
+    """
+    module = _load_compiled_module(ui_path)
+    form_class = None
+    if module is not None:
+        form_class = next(
+            (getattr(module, name) for name in dir(module) if name.startswith("Ui_")),
+            None,
+        )
+    if form_class is None:
+        return uic.loadUi(ui_path, widget)
+    form = form_class()
+    form.setupUi(widget)
+    for name, child in vars(form).items():
+        setattr(widget, name, child)
+    return widget
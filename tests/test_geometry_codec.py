@@ -0,0 +1,82 @@
+import struct
+from array import array
+
+import pytest
+
+from location_service.utils.geometry_codec import (
+    WKB_LINESTRING,
+    WKB_MULTIPOLYGON,
+    WKB_POLYGON,
+    close_ring,
+    decode_flexible_polyline,
+    flatten_coordinates,
+    linestring_coordinates,
+    linestring_wkb,
+    multipolygon_wkb,
+    polygon_wkb,
+)
+
+# Reference vectors of the flexible polyline specification, in 2D and with
+# a third dimension that is dropped.
+EXPECTED = [8.69821, 50.10228, 8.69567, 50.10201, 8.6915, 50.10063, 8.68752, 50.09878]
+
+
+@pytest.mark.parametrize(
+    "encoded", ["BFoz5xJ67i1B1B7PzIhaxL7Y", "BlBoz5xJ67i1BU1B7PUzIhaUxL7YU"]
+)
+def test_decode_flexible_polyline(encoded):
+    assert list(decode_flexible_polyline(encoded)) == pytest.approx(EXPECTED)
+
+
+@pytest.mark.parametrize(
+    ("encoded", "message"),
+    [
+        ("", "header"),
+        ("CF", "version"),
+        ("BFoz5xJ67i1B1B7PzIhaxL7", "Truncated"),
+        ("BFoz5xJ!", "character"),
+    ],
+)
+def test_decode_rejects_malformed_polylines(encoded, message):
+    with pytest.raises(ValueError, match=message):
+        decode_flexible_polyline(encoded)
+
+
+def test_flatten_coordinates_drops_extra_dimensions():
+    flat = flatten_coordinates([[1.0, 2.0, 9.0], [3.0, 4.0]])
+    assert flat == array("d", [1.0, 2.0, 3.0, 4.0])
+
+
+def test_linestring_wkb_round_trip():
+    flat = array("d", EXPECTED)
+    wkb = linestring_wkb(flat)
+    assert struct.unpack_from("<BII", wkb) == (1, WKB_LINESTRING, 4)
+    assert linestring_coordinates(wkb) == flat
+
+
+def test_linestring_coordinates_reads_big_endian():
+    wkb = struct.pack(">BII4d", 0, WKB_LINESTRING, 2, 1.0, 2.0, 3.0, 4.0)
+    assert linestring_coordinates(wkb) == array("d", [1.0, 2.0, 3.0, 4.0])
+
+
+def test_linestring_coordinates_rejects_other_types():
+    with pytest.raises(ValueError, match="LineString"):
+        linestring_coordinates(polygon_wkb([array("d", [0, 0, 1, 0, 1, 1])]))
+
+
+def test_close_ring_only_when_open():
+    ring = array("d", [0.0, 0.0, 1.0, 0.0, 1.0, 1.0])
+    closed = close_ring(ring)
+    assert closed[-2:] == array("d", [0.0, 0.0])
+    assert close_ring(closed) is closed
+    assert len(ring) == 6
+
+
+def test_polygon_and_multipolygon_headers():
+    ring = array("d", [0.0, 0.0, 1.0, 0.0, 1.0, 1.0])
+    polygon = polygon_wkb([ring])
+    assert struct.unpack_from("<BIII", polygon) == (1, WKB_POLYGON, 1, 4)
+    assert len(polygon) == 13 + 4 * 16
+    multipolygon = multipolygon_wkb([[ring], [ring]])
+    assert struct.unpack_from("<BII", multipolygon) == (1, WKB_MULTIPOLYGON, 2)
+    assert multipolygon[9:] == polygon + polygon
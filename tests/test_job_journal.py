@@ -0,0 +1,66 @@
+import pytest
+
+from location_service.utils.job_journal import JobJournal
+
+URL = "https://routes.geo.us-east-1.amazonaws.com/v2/routes?key=secret"
+DATA = {"Origin": [139.7, 35.6], "Destination": [139.8, 35.7]}
+RESPONSE = {"Routes": [{"Legs": []}]}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "journal.sqlite")
+
+
+def test_request_key_ignores_the_api_key_and_key_order():
+    key = JobJournal.request_key(URL, DATA)
+    reordered = {"Destination": DATA["Destination"], "Origin": DATA["Origin"]}
+    assert JobJournal.request_key(URL.replace("secret", "other"), reordered) == key
+    moved = {"Origin": [139.7, 35.6000001], "Destination": DATA["Destination"]}
+    assert JobJournal.request_key(URL, moved) != key
+
+
+def test_done_requests_are_replayed_after_reopening(path):
+    key = JobJournal.request_key(URL, DATA)
+    journal = JobJournal(path)
+    journal.record_pending(key)
+    journal.record_done(key, RESPONSE)
+    journal.close()
+
+    reopened = JobJournal(path)
+    assert reopened.result(key) == RESPONSE
+    assert reopened.replayed == 1
+    reopened.close()
+
+
+def test_pending_and_failed_requests_are_not_replayed(path):
+    journal = JobJournal(path)
+    journal.record_pending("pending")
+    journal.record_pending("failed")
+    journal.record_failed("failed", RuntimeError("timeout"))
+    journal.flush()
+    assert journal.result("pending") is None
+    assert journal.result("failed") is None
+    assert journal.counts() == {
+        JobJournal.STATE_PENDING: 1,
+        JobJournal.STATE_DONE: 0,
+        JobJournal.STATE_FAILED: 1,
+    }
+    journal.close()
+
+
+def test_records_are_buffered_until_the_batch_is_full(path):
+    journal = JobJournal(path, batch_size=3, flush_interval_s=3600)
+    journal.record_done("a", RESPONSE)
+    journal.record_done("b", RESPONSE)
+    assert journal.result("a") is None
+    journal.record_done("c", RESPONSE)
+    assert journal.result("a") == RESPONSE
+    journal.close()
+
+
+def test_counts_include_buffered_records(path):
+    journal = JobJournal(path, batch_size=100, flush_interval_s=3600)
+    journal.record_done("a", RESPONSE)
+    assert journal.counts()[JobJournal.STATE_DONE] == 1
+    journal.close()
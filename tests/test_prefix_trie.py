@@ -0,0 +1,70 @@
+from location_service.utils.prefix_trie import PrefixTrie
+
+TITLES = ["Tokyo Station", "Tokyo Tower", "Kyoto Tower"]
+
+
+def matcher(title, prefix):
+    return PrefixTrie.matches_words(title, prefix)
+
+
+def test_normalize_keeps_a_trailing_space():
+    assert PrefixTrie.normalize("  Tokyo   To") == "tokyo to"
+    assert PrefixTrie.normalize("Tokyo ") == "tokyo "
+    assert PrefixTrie.normalize("   ") == ""
+
+
+def test_matches_words_checks_every_token():
+    assert PrefixTrie.matches_words("Tokyo Tower, Minato", "tow tok")
+    assert not PrefixTrie.matches_words("Tokyo Station", "tokyo tow")
+
+
+def test_exact_prefix_is_a_final_hit():
+    trie = PrefixTrie()
+    trie.put("tok", TITLES[:2], complete=False)
+    assert trie.lookup("TOK", matcher) == (TITLES[:2], True)
+    assert trie.hits == 1
+
+
+def test_complete_ancestor_answers_longer_prefix():
+    trie = PrefixTrie()
+    trie.put("to", TITLES, complete=True)
+    assert trie.lookup("tokyo tow", matcher) == (["Tokyo Tower"], True)
+
+
+def test_incomplete_ancestor_gives_provisional_items():
+    trie = PrefixTrie()
+    trie.put("to", TITLES, complete=False)
+    assert trie.lookup("tokyo tow", matcher) == (["Tokyo Tower"], False)
+    assert trie.partial_hits == 1
+
+
+def test_empty_filter_result_is_not_final():
+    trie = PrefixTrie()
+    trie.put("to", TITLES, complete=True)
+    assert trie.lookup("tox", matcher) == ([], False)
+
+
+def test_unknown_prefix_is_a_miss():
+    trie = PrefixTrie()
+    trie.put("tok", TITLES, complete=True)
+    assert trie.lookup("osa", matcher) is None
+    assert trie.lookup("", matcher) is None
+    assert trie.misses == 1
+
+
+def test_oldest_prefixes_are_dropped():
+    trie = PrefixTrie(max_entries=2)
+    trie.put("a", ["A"], complete=True)
+    trie.put("ab", ["AB"], complete=True)
+    trie.put("b", ["B"], complete=True)
+    assert len(trie) == 2
+    assert trie.lookup("ab", matcher) == (["AB"], True)
+    assert trie.lookup("a", matcher) is None
+
+
+def test_clear_drops_every_prefix():
+    trie = PrefixTrie()
+    trie.put("tok", TITLES, complete=True)
+    trie.clear()
+    assert len(trie) == 0
+    assert trie.lookup("tok", matcher) is None
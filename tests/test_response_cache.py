@@ -0,0 +1,74 @@
+import pytest
+
+from location_service.utils.response_cache import ResponseCache
+
+URL = "https://places.geo.us-east-1.amazonaws.com/v2/search-text?key=secret"
+DATA = {"QueryText": "Tokyo", "BiasPosition": [139.767125, 35.681236]}
+RESPONSE = {"ResultItems": [{"Title": "Tokyo Station"}]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_public_url_drops_the_api_key_and_sorts_parameters():
+    url = "https://example.com/path?b=2&key=secret&a=1"
+    assert ResponseCache.public_url(url) == "https://example.com/path?a=1&b=2"
+
+
+def test_nearby_coordinates_share_a_key(cache):
+    nearby = {"QueryText": "Tokyo", "BiasPosition": [139.7671249, 35.6812361]}
+    assert cache.make_key(URL, DATA) == cache.make_key(URL, nearby)
+    other_key = URL.replace("secret", "other")
+    assert cache.make_key(URL, DATA) == cache.make_key(other_key, DATA)
+
+
+def test_put_then_get_round_trips(cache):
+    assert cache.get(URL, DATA) is None
+    cache.put(URL, DATA, RESPONSE)
+    assert cache.get(URL, DATA) == RESPONSE
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=1)
+    cache.put(URL, DATA, RESPONSE)
+    cache._connection.execute("UPDATE responses SET created = created - 10")
+    assert cache.get(URL, DATA) is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    payload = b'{"ResultItems":[]}'
+    cache = ResponseCache(
+        str(tmp_path / "cache.sqlite"), max_size_bytes=2 * len(payload)
+    )
+    first = {"QueryText": "first"}
+    second = {"QueryText": "second"}
+    cache.put(URL, first, {}, payload)
+    cache.put(URL, second, {}, payload)
+    cache._connection.execute(
+        "UPDATE responses SET accessed = accessed - 100 WHERE key = ?",
+        (cache.make_key(URL, first),),
+    )
+    cache.put(URL, {"QueryText": "third"}, {}, payload)
+    assert cache.get(URL, first) is None
+    assert cache.get(URL, second) == {"ResultItems": []}
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.put(URL, DATA, RESPONSE)
+    cache.close()
+    reopened = ResponseCache(path)
+    assert reopened.stats()["entries"] == 1
+    assert reopened.get(URL, DATA) == RESPONSE
+    reopened.close()
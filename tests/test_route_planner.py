@@ -0,0 +1,51 @@
+from array import array
+
+import pytest
+
+pytest.importorskip("qgis.core")
+
+from location_service.functions.route_planner import (  # noqa: E402
+    StitchedRoute,
+    plan_chunks,
+)
+from location_service.functions.routes import RoutesFunctions  # noqa: E402
+
+MAX_WAYPOINTS = RoutesFunctions.MAX_WAYPOINTS
+
+
+def test_single_stop_needs_no_route():
+    assert plan_chunks(1, MAX_WAYPOINTS) == []
+
+
+def test_two_stops_are_one_chunk():
+    assert plan_chunks(2, MAX_WAYPOINTS) == [(0, 1)]
+
+
+def test_chunk_holds_max_waypoints_between_its_ends():
+    assert plan_chunks(MAX_WAYPOINTS + 2, MAX_WAYPOINTS) == [(0, MAX_WAYPOINTS + 1)]
+
+
+def test_one_more_stop_starts_a_chunk_at_the_shared_boundary():
+    chunks = plan_chunks(MAX_WAYPOINTS + 3, MAX_WAYPOINTS)
+    assert chunks == [(0, MAX_WAYPOINTS + 1), (MAX_WAYPOINTS + 1, MAX_WAYPOINTS + 2)]
+
+
+@pytest.mark.parametrize("stop_count", [3, 24, 25, 26, 49, 50, 100])
+def test_chunks_cover_every_stop_once(stop_count):
+    chunks = plan_chunks(stop_count, MAX_WAYPOINTS)
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == stop_count - 1
+    for (_, last), (first, _) in zip(chunks, chunks[1:]):
+        assert first == last
+    for first, last in chunks:
+        assert 1 <= last - first <= MAX_WAYPOINTS + 1
+
+
+def test_stitching_drops_the_repeated_boundary_vertex():
+    route = StitchedRoute([0, 1, 2])
+    route.append_leg(array("d", [0.0, 0.0, 1.0, 1.0]))
+    route.append_leg(array("d", [1.0, 1.0, 2.0, 2.0]))
+    route.append_leg(array("d"))
+    assert list(route.coordinates) == [0.0, 0.0, 1.0, 1.0, 2.0, 2.0]
+    assert route.legs == 2
+    assert route.complete
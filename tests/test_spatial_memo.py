@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from location_service.utils.spatial_memo import SpatialMemoIndex
+
+LON, LAT = 139.767125, 35.681236
+RESULT = {"ResultItems": [{"Title": "Tokyo Station"}]}
+
+
+def offset_east(lon, lat, meters):
+    cos_lat = math.cos(math.radians(lat))
+    return lon + meters / (SpatialMemoIndex.METERS_PER_DEGREE * cos_lat), lat
+
+
+def test_normalize_query_ignores_case_and_spacing():
+    assert SpatialMemoIndex.normalize_query("  Tokyo   STATION ") == "tokyo station"
+
+
+def test_distance_of_one_degree_of_latitude():
+    distance = SpatialMemoIndex.distance_m(0.0, 0.0, 0.0, 1.0)
+    assert distance == pytest.approx(SpatialMemoIndex.METERS_PER_DEGREE)
+
+
+def test_lookup_within_radius_across_cells():
+    memo = SpatialMemoIndex(radius_m=25.0)
+    memo.put("tokyo", LON, LAT, RESULT)
+    lon, lat = offset_east(LON, LAT, 20.0)
+    assert SpatialMemoIndex.distance_m(LON, LAT, lon, lat) < 25.0
+    assert memo.lookup("tokyo", lon, lat) is RESULT
+    lon, lat = offset_east(LON, LAT, 40.0)
+    assert memo.lookup("tokyo", lon, lat) is None
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 1
+
+
+def test_lookup_requires_the_same_query():
+    memo = SpatialMemoIndex()
+    memo.put("tokyo", LON, LAT, RESULT)
+    assert memo.lookup("osaka", LON, LAT) is None
+
+
+def test_lookup_returns_the_nearest_entry():
+    memo = SpatialMemoIndex(radius_m=50.0)
+    far = {"ResultItems": []}
+    memo.put("tokyo", *offset_east(LON, LAT, 30.0), far)
+    memo.put("tokyo", *offset_east(LON, LAT, 5.0), RESULT)
+    assert memo.lookup("tokyo", LON, LAT) is RESULT
+
+
+def test_lookup_accepts_numeric_strings():
+    memo = SpatialMemoIndex()
+    memo.put("tokyo", str(LON), str(LAT), RESULT)
+    assert memo.lookup("tokyo", str(LON), str(LAT)) is RESULT
+
+
+def test_oldest_entries_are_evicted():
+    memo = SpatialMemoIndex(max_entries=2)
+    for index in range(3):
+        memo.put(f"query {index}", LON, LAT, {"index": index})
+    assert len(memo) == 2
+    assert memo.lookup("query 0", LON, LAT) is None
+    assert memo.lookup("query 2", LON, LAT) == {"index": 2}
+    assert memo.stats()["evictions"] == 1
+
+
+def test_clear_forgets_everything():
+    memo = SpatialMemoIndex()
+    memo.put("tokyo", LON, LAT, RESULT)
+    memo.clear()
+    assert len(memo) == 0
+    assert memo.lookup("tokyo", LON, LAT) is None
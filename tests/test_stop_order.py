@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from location_service.utils.stop_order import (
+    nearest_neighbour_order,
+    path_cost,
+    two_opt,
+)
+
+# Travelling "forward" around the ring is cheap, travelling back is not, so
+# every reversal has to be costed in the direction it is driven.
+ASYMMETRIC = [
+    [0, 1, 10, 10],
+    [10, 0, 1, 10],
+    [10, 10, 0, 1],
+    [1, 10, 10, 0],
+]
+
+
+def matrix_cost(matrix):
+    return lambda origin, destination: matrix[origin][destination]
+
+
+def random_matrix(size, seed):
+    rng = random.Random(seed)
+    return [
+        [0 if row == column else rng.randint(1, 100) for column in range(size)]
+        for row in range(size)
+    ]
+
+
+def best_single_reversal(order, cost, fixed_end):
+    last = len(order) - 2 if fixed_end else len(order) - 1
+    best = path_cost(order, cost)
+    for i in range(1, last):
+        for k in range(i + 1, last + 1):
+            candidate = order[:i] + order[i : k + 1][::-1] + order[k + 1 :]
+            best = min(best, path_cost(candidate, cost))
+    return best
+
+
+def test_path_cost_sums_directed_edges():
+    cost = matrix_cost(ASYMMETRIC)
+    assert path_cost([0, 1, 2, 3], cost) == 3
+    assert path_cost([0, 3, 2, 1], cost) == 30
+    assert path_cost([2], cost) == 0
+
+
+def test_nearest_neighbour_follows_cheap_direction():
+    assert nearest_neighbour_order(4, matrix_cost(ASYMMETRIC)) == [0, 1, 2, 3]
+
+
+def test_nearest_neighbour_keeps_fixed_end_last():
+    order = nearest_neighbour_order(4, matrix_cost(ASYMMETRIC), end=1)
+    assert order == [0, 2, 3, 1]
+
+
+def test_two_opt_reverses_using_backward_costs():
+    cost = matrix_cost(ASYMMETRIC)
+    assert two_opt([0, 2, 1, 3], cost) == [0, 1, 2, 3]
+
+
+def test_two_opt_keeps_first_and_fixed_last_stop():
+    cost = matrix_cost(ASYMMETRIC)
+    order = two_opt([0, 3, 2, 1], cost, fixed_end=True)
+    assert order[0] == 0
+    assert order[-1] == 1
+    assert sorted(order) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("fixed_end", [False, True])
+def test_two_opt_reaches_a_local_optimum(seed, fixed_end):
+    matrix = random_matrix(7, seed)
+    cost = matrix_cost(matrix)
+    start = nearest_neighbour_order(7, cost, end=6 if fixed_end else None)
+    order = two_opt(start, cost, fixed_end)
+    assert sorted(order) == list(range(7))
+    assert path_cost(order, cost) <= path_cost(start, cost)
+    assert best_single_reversal(order, cost, fixed_end) == path_cost(order, cost)
+
+
+@pytest.mark.parametrize(
+    ("count", "end", "expected"),
+    [(0, None, []), (1, None, [0]), (2, None, [0, 1]), (2, 1, [0, 1])],
+)
+def test_few_stops(count, end, expected):
+    cost = matrix_cost(ASYMMETRIC)
+    order = nearest_neighbour_order(count, cost, end=end)
+    assert order == expected
+    assert two_opt(order, cost, fixed_end=end is not None) == expected